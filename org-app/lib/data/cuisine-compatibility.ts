@@ -1,5 +1,5 @@
 // エクセルファイルの料理シートから抽出した相性データ
-import { dishCompatibilityData } from './dish-compatibility-matrix';
+import { cuisineAggregates, getDishCompatibility } from './dish-compatibility-matrix';
 import { judgeSweetnessByMatrix, isKarakuchi as isKarakuchiMatrix, isAmakuchi as isAmakuchiMatrix } from '@/lib/utils/sake-sweetness-calculator';
 import { convertSweetnessToNihonshuDegree } from '@/lib/data/sake-data';
 
@@ -16,47 +16,19 @@ export interface CuisineCompatibility {
   matchBonus: number;   // マッチボーナススコア
 }
 
-export const cuisineCompatibilityData: CuisineCompatibility[] = [
-  // 和食系の相性データ（平均値を計算）
-  {
-    cuisineType: 'japanese',
-    sakeMinLevel: -1, // (0-3+0+0)/4の平均
-    sakeMaxLevel: 10, // (5+5+15+15)/4の平均
-    acidityMin: 0.5,  // (0+0+1+1)/4の平均
-    acidityMax: 1.75, // (2+1+2+2)/4の平均
-    alcoholMin: 12.5, // (10+10+15+10)/4の平均
-    alcoholMax: 17.5, // (16+16+20+18)/4の平均
-    typeClass1: 'A',
-    typeClass2: 'B',
-    matchBonus: 2.0
-  },
-  // 中華系の相性データ
-  {
-    cuisineType: 'chinese',
-    sakeMinLevel: -2, // (-5-5+0+2)/4の平均
-    sakeMaxLevel: 8.75, // (5+5+10+15)/4の平均
-    acidityMin: 0,    // (0+0+0+0)/4の平均
-    acidityMax: 1.75, // (2+3+1+1)/4の平均
-    alcoholMin: 10,   // (10+10+10+10)/4の平均
-    alcoholMax: 16,   // (15+18+15+16)/4の平均
-    typeClass1: 'B',
-    typeClass2: 'C',
-    matchBonus: 1.5
-  },
-  // 洋食系の相性データ
-  {
-    cuisineType: 'western',
-    sakeMinLevel: 0.5,  // (2+0+2-2)/4の平均
-    sakeMaxLevel: 14,   // (15+18+18+5)/4の平均
-    acidityMin: 0.5,    // (1+0+0+1)/4の平均
-    acidityMax: 2.5,    // (3+2+2+3)/4の平均
-    alcoholMin: 13.5,   // (12+12+15+15)/4の平均
-    alcoholMax: 17,     // (18+16+16+18)/4の平均
-    typeClass1: 'A',
-    typeClass2: 'B',
-    matchBonus: 1.8
-  }
-];
+// 料理タイプごとの相性範囲は料理データの平均（extract-cuisine-data.py が cuisineAggregates として出力する）
+// dish-compatibility-matrix.ts とは循環して import しているため、読み込み時ではなく呼び出し時に参照する
+export function getCuisineCompatibility(cuisineType: string): CuisineCompatibility | undefined {
+  const aggregate = cuisineAggregates[cuisineType as keyof typeof cuisineAggregates];
+  if (!aggregate) return undefined;
+  return {
+    cuisineType: cuisineType as CuisineCompatibility['cuisineType'],
+    ...aggregate.mean,
+    typeClass1: aggregate.typeClass1,
+    typeClass2: aggregate.typeClass2,
+    matchBonus: aggregate.matchBonus
+  };
+}
 
 // 正確な日本酒度・酸度マトリックス判定を使用
 export function isKarakuchi(sakeDegree: number, acidity: number): boolean {
@@ -95,7 +67,7 @@ export function calculateSpecificDishCompatibility(
   sake: { sweetness: number; acidity: number; alcoholContent: number; nihonshuDegree?: number; realAcidity?: number }
 ): number {
   // マトリックスデータから該当料理を検索
-  const dishData = dishCompatibilityData.find(dish => dish.id === dishType);
+  const dishData = getDishCompatibility(dishType);
   if (!dishData) return 0;
   
   const compatibility = dishData.compatibility;
@@ -155,7 +127,7 @@ export function calculateCuisineCompatibility(
   cuisineType: string,
   sake: { sweetness: number; acidity: number; alcoholContent: number; nihonshuDegree?: number; realAcidity?: number }
 ): number {
-  const compatibility = cuisineCompatibilityData.find(c => c.cuisineType === cuisineType);
+  const compatibility = getCuisineCompatibility(cuisineType);
   if (!compatibility) return 0;
 
   let score = 0;
@@ -20,11 +20,31 @@ export interface DishCompatibilityDetail {
   matchBonus: number;
 }
 
+export interface CuisineRangeBounds {
+  sakeMinLevel: number;
+  sakeMaxLevel: number;
+  acidityMin: number;
+  acidityMax: number;
+  alcoholMin: number;
+  alcoholMax: number;
+}
+
+// 料理タイプごとの集計（料理データから自動で求めた値）
+export interface CuisineAggregate {
+  dishCount: number;
+  mean: CuisineRangeBounds;          // 各下限・上限の平均（料理カテゴリでの絞り込みに使う）
+  envelope: CuisineRangeBounds;      // 全料理の範囲を含む範囲
+  intersection: CuisineRangeBounds | null;  // 全料理に共通する範囲（共通部分がなければ null）
+  typeClass1: string;
+  typeClass2: string;
+  matchBonus: number;
+}
+
 /**
  * 料理の推奨4タイプ分類を取得
  */
 export function getDishRecommendedSakeTypes(dishId: string): string[] {
-  const dish = dishCompatibilityData.find(d => d.id === dishId);
+  const dish = getDishCompatibility(dishId);
   if (!dish) return [];
   
   const types = [];
@@ -235,32 +255,94 @@ export const dishCompatibilityData: DishCompatibilityDetail[] = [
   }
 ];
 
-// CSVマトリックスデータ要約
-export const matrixDataSummary = {
+// 料理ID → dishCompatibilityData の位置
+export const dishIndexById: ReadonlyMap<string, number> = new Map<string, number>([
+  ["sashimi_sushi", 0],
+  ["nimono", 1],
+  ["yakimono", 2],
+  ["agemono", 3],
+  ["tenshin", 4],
+  ["strong_taste", 5],
+  ["light_taste", 6],
+  ["chinese_fried", 7],
+  ["carpaccio_oyster", 8],
+  ["meat_dish", 9],
+  ["fish_dish", 10],
+  ["gibier", 11],
+]);
+
+// 料理タイプ → 料理IDの一覧（dishCompatibilityData の並び順）
+export const dishIdsByCuisineType: Record<'japanese' | 'chinese' | 'western', string[]> = {
+  japanese: ["sashimi_sushi", "nimono", "yakimono", "agemono"],
+  chinese: ["tenshin", "strong_taste", "light_taste", "chinese_fried"],
+  western: ["carpaccio_oyster", "meat_dish", "fish_dish", "gibier"],
+};
+
+// 料理タイプ → 集計（料理データの平均・全体の範囲・共通の範囲・主な4タイプ分類）
+export const cuisineAggregates: Partial<Record<'japanese' | 'chinese' | 'western', CuisineAggregate>> = {
   japanese: {
-    sakeRange: { min: -3, max: 15 },
-    acidityRange: { min: 0, max: 2 },
-    alcoholRange: { min: 10, max: 20 }
+    dishCount: 4,
+    mean: { sakeMinLevel: -0.75, sakeMaxLevel: 10, acidityMin: 0.5, acidityMax: 1.75, alcoholMin: 11.25, alcoholMax: 17.5 },
+    envelope: { sakeMinLevel: -3, sakeMaxLevel: 15, acidityMin: 0, acidityMax: 2, alcoholMin: 10, alcoholMax: 20 },
+    intersection: { sakeMinLevel: 0, sakeMaxLevel: 5, acidityMin: 1, acidityMax: 1, alcoholMin: 15, alcoholMax: 16 },
+    typeClass1: "A",
+    typeClass2: "B",
+    matchBonus: 2.0
   },
   chinese: {
-    sakeRange: { min: -5, max: 15 },
-    acidityRange: { min: 0, max: 3 },
-    alcoholRange: { min: 10, max: 18 }
+    dishCount: 4,
+    mean: { sakeMinLevel: -2, sakeMaxLevel: 8.75, acidityMin: 0, acidityMax: 1.75, alcoholMin: 10, alcoholMax: 16 },
+    envelope: { sakeMinLevel: -5, sakeMaxLevel: 15, acidityMin: 0, acidityMax: 3, alcoholMin: 10, alcoholMax: 18 },
+    intersection: { sakeMinLevel: 2, sakeMaxLevel: 5, acidityMin: 0, acidityMax: 1, alcoholMin: 10, alcoholMax: 15 },
+    typeClass1: "B",
+    typeClass2: "C",
+    matchBonus: 1.5
   },
   western: {
-    sakeRange: { min: -2, max: 18 },
-    acidityRange: { min: 0, max: 3 },
-    alcoholRange: { min: 12, max: 18 }
-  }
+    dishCount: 4,
+    mean: { sakeMinLevel: 0.5, sakeMaxLevel: 14, acidityMin: 0.5, acidityMax: 2.5, alcoholMin: 13.5, alcoholMax: 17 },
+    envelope: { sakeMinLevel: -2, sakeMaxLevel: 18, acidityMin: 0, acidityMax: 3, alcoholMin: 12, alcoholMax: 18 },
+    intersection: { sakeMinLevel: 2, sakeMaxLevel: 5, acidityMin: 1, acidityMax: 2, alcoholMin: 15, alcoholMax: 16 },
+    typeClass1: "A",
+    typeClass2: "B",
+    matchBonus: 1.8
+  },
+};
+
+const dishesByCuisineType: Record<'japanese' | 'chinese' | 'western', DishCompatibilityDetail[]> = {
+  japanese: dishCompatibilityData.filter(d => d.cuisineType === 'japanese'),
+  chinese: dishCompatibilityData.filter(d => d.cuisineType === 'chinese'),
+  western: dishCompatibilityData.filter(d => d.cuisineType === 'western'),
 };
 
+// CSVマトリックスデータ要約（料理タイプごとの全料理の範囲。cuisineAggregates の envelope から求める）
+function summarizeEnvelope(envelope: CuisineRangeBounds | undefined) {
+  return envelope && {
+    sakeRange: { min: envelope.sakeMinLevel, max: envelope.sakeMaxLevel },
+    acidityRange: { min: envelope.acidityMin, max: envelope.acidityMax },
+    alcoholRange: { min: envelope.alcoholMin, max: envelope.alcoholMax },
+  };
+}
+
+export const matrixDataSummary = {
+  japanese: summarizeEnvelope(cuisineAggregates.japanese?.envelope),
+  chinese: summarizeEnvelope(cuisineAggregates.chinese?.envelope),
+  western: summarizeEnvelope(cuisineAggregates.western?.envelope),
+};
+
+// 料理IDから料理データを取得
+export function getDishCompatibility(dishId: string): DishCompatibilityDetail | undefined {
+  const index = dishIndexById.get(dishId);
+  return index === undefined ? undefined : dishCompatibilityData[index];
+}
+
 // 料理IDから表示名を取得
 export function getDishDisplayName(dishId: string): string {
-  const dish = dishCompatibilityData.find(d => d.id === dishId);
+  const dish = getDishCompatibility(dishId);
   return dish ? dish.name : dishId;
 }
 
-// 料理タイプから該当料理一覧を取得  
+// 料理タイプから該当料理一覧を取得（読み込み時に作成した配列を返すので変更しないこと）
 export function getDishesByCuisineType(cuisineType: 'japanese' | 'chinese' | 'western'): DishCompatibilityDetail[] {
-  return dishCompatibilityData.filter(d => d.cuisineType === cuisineType);
+  return dishesByCuisineType[cuisineType] ?? [];
 }
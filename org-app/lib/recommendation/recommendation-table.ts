@@ -0,0 +1,88 @@
+import { DiagnosisAnswer, DiagnosisResult } from '@/lib/types/diagnosis';
+import { recommendSakes } from './sake-recommender';
+
+// scripts/build-recommendation-table.py が出力する、全回答パターンのおすすめ上位k件の表
+export interface RecommendationTableEntry {
+  diagnosis: [number, number, number, number]; // 甘辛, 濃淡, 酸味, 香り
+  cuisineType: string;
+  specificDish: string | null;
+  sakeIds: string[];
+  scores: number[];
+}
+
+export interface RecommendationTable {
+  version: number;
+  topK: number;
+  keyFormat: string;
+  entries: Record<string, RecommendationTableEntry>;
+}
+
+export interface RecommendationTableMismatch {
+  key: string;
+  expected: { sakeId: string; score: number }[];
+  actual: { sakeId: string; score: number }[];
+}
+
+/**
+ * 回答一覧から表のキー（"q1:q2:q3:q4"）を作る
+ */
+export function getRecommendationTableKey(answers: DiagnosisAnswer[]): string {
+  const find = (questionId: string) => answers.find(answer => answer.questionId === questionId);
+  const q1 = find('q1')?.selectedOptions?.[0] ?? '';
+  const q2 = find('q2')?.selectedOptions?.[0] ?? '';
+  const q3 = find('q3')?.selectedOptions?.[0] ?? '';
+  const q4 = find('q4')?.scaleValue || 5;
+  return `${q1}:${q2}:${q3}:${q4}`;
+}
+
+/**
+ * 事前計算した表からおすすめを引く（該当する回答パターンがなければ null）
+ */
+export function lookupRecommendations(
+  table: RecommendationTable,
+  answers: DiagnosisAnswer[]
+): RecommendationTableEntry | null {
+  return table.entries[getRecommendationTableKey(answers)] ?? null;
+}
+
+function answersFromKey(key: string): DiagnosisAnswer[] {
+  const [q1, q2, q3, q4] = key.split(':');
+  const answers: DiagnosisAnswer[] = [{ questionId: 'q1', selectedOptions: [q1] }];
+  if (q2) {
+    answers.push({ questionId: 'q2', selectedOptions: [q2] });
+  }
+  answers.push({ questionId: 'q3', selectedOptions: [q3] });
+  answers.push({ questionId: 'q4', selectedOptions: [], scaleValue: Number(q4) });
+  return answers;
+}
+
+/**
+ * 表の全回答パターンを recommendSakes で計算し直し、結果が一致するか確認する
+ * （表は sakeData と同じお酒一覧から作成したものを渡すこと）
+ */
+export function checkRecommendationTableParity(
+  table: RecommendationTable,
+  tolerance: number = 1e-9
+): RecommendationTableMismatch[] {
+  const mismatches: RecommendationTableMismatch[] = [];
+
+  for (const [key, entry] of Object.entries(table.entries)) {
+    const [sweetness, richness, acidity, aroma] = entry.diagnosis;
+    const diagnosis: DiagnosisResult & { answers: DiagnosisAnswer[] } = {
+      sweetness, richness, acidity, aroma,
+      answers: answersFromKey(key)
+    };
+    const recommendations = recommendSakes(diagnosis, table.topK, entry.cuisineType, entry.specificDish ?? undefined);
+
+    const expected = recommendations.map(r => ({ sakeId: r.sake.id, score: r.score }));
+    const actual = entry.sakeIds.map((sakeId, i) => ({ sakeId, score: entry.scores[i] }));
+    const isMatch = expected.length === actual.length && expected.every((e, i) =>
+      e.sakeId === actual[i].sakeId && Math.abs(e.score - actual[i].score) <= tolerance
+    );
+    if (!isMatch) {
+      mismatches.push({ key, expected, actual });
+    }
+  }
+
+  return mismatches;
+}
@@ -1,7 +1,7 @@
 import { DiagnosisResult } from '@/lib/types/diagnosis';
 import { SakeProfile, sakeData, convertSweetnessToNihonshuDegree } from '@/lib/data/sake-data';
 import { calculateCuisineCompatibility, calculateSpecificDishCompatibility, getCuisineDescription } from '@/lib/data/cuisine-compatibility';
-import { dishCompatibilityData, getDishDisplayName } from '@/lib/data/dish-compatibility-matrix';
+import { cuisineAggregates, getDishCompatibility, getDishDisplayName } from '@/lib/data/dish-compatibility-matrix';
 import { judgeSweetnessByMatrix } from '@/lib/utils/sake-sweetness-calculator';
 
 export interface RecommendationScore {
@@ -277,7 +277,7 @@ function calculateSakeCharacteristicScore(
 // ヘルパー関数群
 function getSpecificDishCompatibilityRange(dishType: string) {
   // マトリックスデータから該当料理を検索
-  const dishData = dishCompatibilityData.find(dish => dish.id === dishType);
+  const dishData = getDishCompatibility(dishType);
   if (!dishData) return null;
   
   return {
@@ -291,12 +291,8 @@ function getSpecificDishCompatibilityRange(dishType: string) {
 }
 
 function getCuisineCompatibilityRange(cuisineType: string) {
-  const cuisineRanges = {
-    'japanese': { sakeMinLevel: -1, sakeMaxLevel: 10, acidityMin: 0.5, acidityMax: 1.75, alcoholMin: 12.5, alcoholMax: 17.5 },
-    'chinese': { sakeMinLevel: -2, sakeMaxLevel: 8.75, acidityMin: 0, acidityMax: 1.75, alcoholMin: 10, alcoholMax: 16 },
-    'western': { sakeMinLevel: 0.5, sakeMaxLevel: 14, acidityMin: 0.5, acidityMax: 2.5, alcoholMin: 13.5, alcoholMax: 17 }
-  };
-  return cuisineRanges[cuisineType as keyof typeof cuisineRanges];
+  // 料理データから求めた平均の範囲（dish-compatibility-matrix.ts の cuisineAggregates）
+  return cuisineAggregates[cuisineType as keyof typeof cuisineAggregates]?.mean;
 }
 
 function calculateCompatibilityScore(
@@ -564,7 +560,7 @@ function calculateUserPreferenceScore(sake: SakeProfile, diagnosis: DiagnosisRes
  */
 function isMatchingTypeClass(dishType: string, sake: SakeProfile): boolean {
   // 料理の推奨タイプを取得
-  const dishData = dishCompatibilityData.find(dish => dish.id === dishType);
+  const dishData = getDishCompatibility(dishType);
   if (!dishData) {
     console.log(`    料理「${dishType}」のデータが見つかりません`);
     return true; // データがない場合は制限しない
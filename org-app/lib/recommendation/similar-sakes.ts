@@ -0,0 +1,46 @@
+import { SakeProfile } from '@/lib/data/sake-data';
+
+// scripts/build-similar-sakes.py が出力する、お酒ごとに味わいの近いお酒の上位k件の表
+export interface SimilarSakesEntry {
+  sakeIds: string[];
+  distances: number[];
+}
+
+export interface SimilarSakesTable {
+  version: number;
+  topK: number;
+  fields: string[]; // 距離を測る SakeProfile の項目
+  normalization: { mean: number[]; scale: number[] };
+  entries: Record<string, SimilarSakesEntry>;
+}
+
+export interface SimilarSake {
+  sake: SakeProfile;
+  distance: number;
+}
+
+/**
+ * 表から味わいの近いお酒を引く（近い順。表にないお酒の場合は空配列）
+ * sakes に含まれないIDは読み飛ばす
+ */
+export function getSimilarSakes(
+  table: SimilarSakesTable,
+  sakeId: string,
+  sakes: SakeProfile[],
+  limit: number = table.topK
+): SimilarSake[] {
+  const entry = table.entries[sakeId];
+  if (!entry) {
+    return [];
+  }
+
+  const sakeById = new Map(sakes.map(sake => [sake.id, sake]));
+  const similar: SimilarSake[] = [];
+  for (let i = 0; i < entry.sakeIds.length && similar.length < limit; i++) {
+    const sake = sakeById.get(entry.sakeIds[i]);
+    if (sake) {
+      similar.push({ sake, distance: entry.distances[i] });
+    }
+  }
+  return similar;
+}
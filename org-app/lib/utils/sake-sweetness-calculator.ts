@@ -3,32 +3,54 @@
  * 日本酒業界の標準的な判定基準を実装
  */
 
+import sweetnessTable from '@/lib/data/sweetness-table.json';
+
 export interface SweetnessJudgment {
   level: string;
   description: string;
   category: 'amakuchi' | 'neutral' | 'karakuchi';
 }
 
+/*
+ * 判定基準は lib/data/sweetness-rules.json で定義し、scripts/build-sweetness-table.py が
+ * (日本酒度, 酸度) の格子ごとの判定を sweetness-table.json に書き出す。
+ * ここでは値をマス目に切り捨てて表を1回引くだけにする（Pythonの変換スクリプトも同じ表を引く）。
+ */
+const UNITS_PER_POINT = sweetnessTable.unitsPerPoint;
+// マス目にする前に丸める桁数（scripts/sweetness_table.py の QUANTIZE_PRECISION と同じ）
+const QUANTIZE_PRECISION = 1000;
+
+const matrixLevels = (sweetnessTable.levels as SweetnessJudgment[]).map((entry) => Object.freeze(entry));
+const basicLevels = (sweetnessTable.basicLevels as SweetnessJudgment[]).map((entry) => Object.freeze(entry));
+
+function decodeCells(cells: string): Uint8Array {
+  const values = new Uint8Array(cells.length);
+  for (let i = 0; i < cells.length; i++) {
+    values[i] = cells.charCodeAt(i) - 48;
+  }
+  return values;
+}
+
+const { matrix, basic, acidityImpact } = sweetnessTable;
+const matrixCells = decodeCells(matrix.cells);
+const basicCells = decodeCells(basic.cells);
+
+/**
+ * 値を表のマス目の位置にする
+ * 浮動小数点の誤差を 1/1000 マス未満で丸めてから切り捨て、範囲外は端のマス目にする
+ * （NaN は最初のマス目 = 基準のどれにも当てはまらない場合と同じ判定）
+ */
+function cellIndex(value: number, minUnit: number, count: number): number {
+  const unit = Math.floor(Math.round(value * UNITS_PER_POINT * QUANTIZE_PRECISION) / QUANTIZE_PRECISION);
+  const index = unit - minUnit;
+  return index > 0 ? Math.min(index, count - 1) : 0;
+}
 
 /**
  * 日本酒度による基本的な甘辛判定
  */
 export function getBasicSweetnessByDegree(nihonshuDegree: number): SweetnessJudgment {
-  if (nihonshuDegree >= 6) {
-    return { level: '大辛口', description: '非常にドライで切れ味鋭い', category: 'karakuchi' };
-  } else if (nihonshuDegree >= 3.5) {
-    return { level: '辛口', description: 'すっきりとした辛口', category: 'karakuchi' };
-  } else if (nihonshuDegree >= 1.5) {
-    return { level: 'やや辛口', description: '軽やかな辛口感', category: 'karakuchi' };
-  } else if (nihonshuDegree >= -1.4) {
-    return { level: '普通', description: 'バランスの良い味わい', category: 'neutral' };
-  } else if (nihonshuDegree >= -3.4) {
-    return { level: 'やや甘口', description: 'ほのかな甘み', category: 'amakuchi' };
-  } else if (nihonshuDegree >= -5.9) {
-    return { level: '甘口', description: 'まろやかな甘口', category: 'amakuchi' };
-  } else {
-    return { level: '大甘口', description: '豊かで濃厚な甘み', category: 'amakuchi' };
-  }
+  return basicLevels[basicCells[cellIndex(nihonshuDegree, basic.degreeMinUnit, basic.degreeCount)]];
 }
 
 /**
@@ -36,11 +58,7 @@ export function getBasicSweetnessByDegree(nihonshuDegree: number): SweetnessJudg
  * 酸度が高いほど辛口感が増す
  */
 function getAcidityImpact(acidity: number): number {
-  if (acidity >= 1.9) return 5; // 超高酸度：大幅に辛口感増
-  if (acidity >= 1.6) return 3; // 高酸度：辛口感増
-  if (acidity >= 1.3) return 0; // 中酸度：影響なし
-  if (acidity >= 1.0) return -2; // 低酸度：甘口感増
-  return -3; // 極低酸度：甘口感大幅増
+  return acidityImpact.values[cellIndex(acidity, acidityImpact.acidityMinUnit, acidityImpact.acidityCount)];
 }
 
 /**
@@ -55,26 +73,9 @@ export function calculateRealSweetness(nihonshuDegree: number, acidity: number):
  * 日本酒度と酸度による最終的な辛甘判定
  */
 export function judgeSweetnessByMatrix(nihonshuDegree: number, acidity: number): SweetnessJudgment {
-  const realSweetness = calculateRealSweetness(nihonshuDegree, acidity);
-  
-  // 実感辛甘度による判定
-  if (realSweetness >= 8) {
-    return { level: '超辛口', description: '酸度の高さで非常にキレのある辛口', category: 'karakuchi' };
-  } else if (realSweetness >= 6) {
-    return { level: '大辛口', description: '力強くドライな味わい', category: 'karakuchi' };
-  } else if (realSweetness >= 3.5) {
-    return { level: '辛口', description: 'すっきりとした辛口', category: 'karakuchi' };
-  } else if (realSweetness >= 1.5) {
-    return { level: 'やや辛口', description: '軽やかな辛口感', category: 'karakuchi' };
-  } else if (realSweetness >= -1.4) {
-    return { level: '普通', description: 'バランスの良い味わい', category: 'neutral' };
-  } else if (realSweetness >= -3.4) {
-    return { level: 'やや甘口', description: 'ほのかな甘み', category: 'amakuchi' };
-  } else if (realSweetness >= -5.9) {
-    return { level: '甘口', description: 'まろやかな甘口', category: 'amakuchi' };
-  } else {
-    return { level: '大甘口', description: '豊かで濃厚な甘み', category: 'amakuchi' };
-  }
+  const row = cellIndex(acidity, matrix.acidityMinUnit, matrix.acidityCount);
+  const column = cellIndex(nihonshuDegree, matrix.degreeMinUnit, matrix.degreeCount);
+  return matrixLevels[matrixCells[row * matrix.degreeCount + column]];
 }
 
 /**
@@ -123,7 +124,7 @@ export function isAmakuchi(nihonshuDegree: number, acidity?: number): boolean {
     return judgment.category === 'amakuchi';
   }
   // 酸度情報がない場合は日本酒度のみで判定
-  return nihonshuDegree < -1.4;
+  return getBasicSweetnessByDegree(nihonshuDegree).category === 'amakuchi';
 }
 
 export function isNeutral(nihonshuDegree: number, acidity: number): boolean {
@@ -1,26 +1,27 @@
 #!/usr/bin/env python3
-import pandas as pd
+from workbook_loader import DEFAULT_EXCEL_FILE, get_workbook
 
 def analyze_cuisine_sheets(excel_file_path):
     try:
-        xl_file = pd.ExcelFile(excel_file_path)
-        print(f"利用可能なシート: {xl_file.sheet_names}")
+        workbook = get_workbook(excel_file_path)
+        print(f"利用可能なシート: {workbook.sheet_names}")
         
         cuisine_sheets = ["和食", "中華", "洋食"]
         
         for sheet_name in cuisine_sheets:
-            if sheet_name in xl_file.sheet_names:
+            if workbook.has_sheet(sheet_name):
                 print(f"\n=== {sheet_name}シートの分析 ===")
-                df = pd.read_excel(excel_file_path, sheet_name=sheet_name, header=None)
-                
-                print(f"サイズ: {df.shape}")
+                # 表示する先頭10行・先頭10列だけを取り出す（シートキャッシュがあれば全体を読み込まない）
+                print(f"サイズ: {workbook.sheet_shape(sheet_name)}")
                 print("\n生データ:")
-                for i in range(min(10, len(df))):
-                    print(f"行 {i}: {list(df.iloc[i])}")
+                head = workbook.preview_sheet(sheet_name, rows=10)
+                for i in range(len(head)):
+                    print(f"行 {i}: {list(head.iloc[i])}")
                 
                 print(f"\n{sheet_name}シートの詳細:")
-                for col in range(min(len(df.columns), 10)):
-                    values = df.iloc[:, col].dropna().tolist()
+                columns = workbook.preview_sheet(sheet_name, columns=10)
+                for col in range(len(columns.columns)):
+                    values = columns.iloc[:, col].dropna().tolist()
                     if values:
                         print(f"列 {col}: {values}")
             else:
@@ -30,5 +31,4 @@ def analyze_cuisine_sheets(excel_file_path):
         print(f"エラー: {e}")
 
 if __name__ == "__main__":
-    excel_file = "/workspaces/org-app/お酒とお料理相性マトリックス.xlsx"
-    analyze_cuisine_sheets(excel_file)
\ No newline at end of file
+    analyze_cuisine_sheets(DEFAULT_EXCEL_FILE)
\ No newline at end of file
@@ -1,25 +1,27 @@
 #!/usr/bin/env python3
-import pandas as pd
+from workbook_loader import DEFAULT_EXCEL_FILE, get_workbook
 
 def analyze_excel_structure(excel_file_path, sheet_name="お酒データ"):
     try:
         # Excelファイルを読み込み（ヘッダーを指定せずに）
-        df = pd.read_excel(excel_file_path, sheet_name=sheet_name, header=None)
+        # 表示する先頭10行・先頭10列だけを取り出す（シートキャッシュがあれば全体を読み込まない）
+        workbook = get_workbook(excel_file_path)
         
         print(f"シート '{sheet_name}' の詳細分析:")
-        print(f"全体のサイズ: {df.shape}")
+        print(f"全体のサイズ: {workbook.sheet_shape(sheet_name)}")
         print("\n=== 生データの表示 ===")
         
-        for i in range(min(10, len(df))):
-            print(f"行 {i}: {list(df.iloc[i])}")
+        head = workbook.preview_sheet(sheet_name, rows=10)
+        for i in range(len(head)):
+            print(f"行 {i}: {list(head.iloc[i])}")
         
         print("\n=== カラム別データ確認 ===")
-        for col in range(min(10, len(df.columns))):
-            print(f"列 {col}: {list(df.iloc[:, col].dropna())}")
+        columns = workbook.preview_sheet(sheet_name, columns=10)
+        for col in range(len(columns.columns)):
+            print(f"列 {col}: {list(columns.iloc[:, col].dropna())}")
             
     except Exception as e:
         print(f"エラーが発生しました: {e}")
 
 if __name__ == "__main__":
-    excel_file = "/workspaces/org-app/お酒とお料理相性マトリックス.xlsx"
-    analyze_excel_structure(excel_file)
\ No newline at end of file
+    analyze_excel_structure(DEFAULT_EXCEL_FILE)
\ No newline at end of file
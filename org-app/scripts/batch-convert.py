@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""卸ごとの複数ワークブックをまとめて変換する
+
+使い方:
+    python batch-convert.py <ディレクトリ|globパターン|ファイル>... [--workers N] [--vectorized] [--output-dir DIR]
+                            [--no-validate]
+
+お酒データ・料理データを統合し、convert-excel-proper.py / extract-cuisine-data.py と
+同じ形式のファイルを出力ディレクトリに書き出す。変換前にすべてのワークブックを検証し、
+検証エラーのあるワークブックが1つでもあれば変換しない（--no-validate で省略）。
+"""
+import json
+import os
+import sys
+
+from batch_conversion import convert_workbooks, expand_workbook_paths, unique_workbooks
+from matrix_validation import check_before_conversion
+from output_writers import atomic_output
+from run_instrumentation import get_logger, instrumented_run, parse_instrumentation_args, parse_options
+from script_loader import load_script
+from workbook_loader import clear_workbook_cache
+
+logger = get_logger('batch-convert')
+
+DEFAULT_OUTPUT_DIR = "/workspaces/org-app/org-app/lib/data"
+SAKE_OUTPUT_NAME = "sake-data-excel.json"
+DISH_JSON_OUTPUT_NAME = "dish-compatibility-matrix.json"
+DISH_TS_OUTPUT_NAME = "dish-compatibility-matrix.ts"
+
+
+def print_report(report):
+    logger.info(f"ワークブック: {len(report['workbooks'])}件")
+    for path, original in report['skipped_workbooks']:
+        logger.info(f"  内容が同一のためスキップ: {path} （{original} と同じ）")
+    for kind, label in (('sake', 'お酒'), ('dish', '料理')):
+        summary = report[kind]
+        logger.info(f"{label}: {summary['count']}件（重複 {summary['duplicates']}件を除外）")
+        for record_id, kept, dropped in summary['conflicts']:
+            logger.warning(f"  内容の衝突: {record_id} — {kept} を採用し、{dropped} の内容は除外しました")
+        for record_id, new_id, source in summary['renamed']:
+            logger.info(f"  ID付け替え: {source} の {record_id} → {new_id}")
+    for source, error in report['errors']:
+        logger.error(f"エラー: {source}: {error}")
+
+
+def validate_workbooks(patterns):
+    """変換前にすべてのワークブックを検証し、検証エラーのあるものがあれば False を返す"""
+    ok = True
+    paths, _ = unique_workbooks(expand_workbook_paths(patterns))
+    for path in paths:
+        logger.info(f"検証: {path}")
+        ok = check_before_conversion(path, None, logger) and ok
+        # 変換はワーカープロセスで行うので、検証に使ったワークブックは保持しない
+        clear_workbook_cache()
+    return ok
+
+
+def main(patterns, output_dir=DEFAULT_OUTPUT_DIR, max_workers=None, vectorized=False, validate=True):
+    if validate and not validate_workbooks(patterns):
+        return
+
+    sake_data, cuisine_data, report = convert_workbooks(patterns, max_workers=max_workers, vectorized=vectorized)
+    print_report(report)
+
+    if not report['workbooks']:
+        logger.error("変換するワークブックが見つかりません")
+        return
+
+    os.makedirs(output_dir, exist_ok=True)
+    sake_output_file = os.path.join(output_dir, SAKE_OUTPUT_NAME)
+    with atomic_output(sake_output_file) as f:
+        json.dump(sake_data, f, ensure_ascii=False, indent=2)
+    logger.info(f"お酒データを {sake_output_file} に保存しました")
+
+    dish_json_output_file = os.path.join(output_dir, DISH_JSON_OUTPUT_NAME)
+    with atomic_output(dish_json_output_file) as f:
+        json.dump(cuisine_data, f, ensure_ascii=False, indent=2)
+    logger.info(f"料理データを {dish_json_output_file} に保存しました")
+
+    dish_ts_output_file = os.path.join(output_dir, DISH_TS_OUTPUT_NAME)
+    load_script('extract-cuisine-data').write_typescript_module(cuisine_data, dish_ts_output_file)
+    logger.info(f"TypeScriptファイルを {dish_ts_output_file} に保存しました")
+
+
+def parse_args(args):
+    """コマンドライン引数を (パターン一覧, オプション) に分ける"""
+    return parse_options(args, {
+        '--workers': ('max_workers', int),
+        '--output-dir': ('output_dir', str),
+        '--vectorized': ('vectorized', True),
+        '--no-validate': ('validate', False),
+    }, {'output_dir': DEFAULT_OUTPUT_DIR, 'max_workers': None, 'vectorized': False, 'validate': True})
+
+
+if __name__ == "__main__":
+    # --log-level / --verbose / --profile / --trace-memory / --report FILE は run_instrumentation を参照
+    argv, instrumentation_options = parse_instrumentation_args(sys.argv[1:])
+    patterns, options = parse_args(argv)
+    if not patterns:
+        print(__doc__)
+        sys.exit(1)
+    with instrumented_run('batch-convert', **instrumentation_options):
+        main(patterns, **options)
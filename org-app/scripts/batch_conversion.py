@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""複数ワークブック（卸ごとのファイル）の一括変換
+
+ワークブック × シートを1つの作業単位とし、プロセスプールで並列に変換する。
+結果はワークブックのパス順・シート順に並べ直してから統合するので、
+どの作業が先に終わっても出力は同じになる。
+
+- 内容が同一のワークブック（SHA-256が一致）は1度だけ変換する
+- お酒は銘柄名+酒蔵名、料理はIDで同じレコードかを判定し、内容ハッシュが一致すれば重複として1件にまとめる
+- 同じレコードで内容が異なる場合は先に現れた方を残し、衝突として報告する
+- お酒のIDはシートの行番号から作る（どの卸のワークブックも sake001 から始まる）ため、
+  別のお酒と同じIDになった場合は「ID-ワークブック名」に付け替える（ecUrl も合わせる）
+"""
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from conversion_manifest import file_sha256, hash_record
+from records import EC_URL_PREFIX
+from script_loader import load_script
+from workbook_loader import get_workbook
+
+SAKE_SHEET_NAME = "お酒データ"
+WORKBOOK_EXTENSIONS = ('.xlsx', '.xlsm')
+
+
+def expand_workbook_paths(patterns):
+    """ディレクトリ・globパターン・ファイルパスの並びからワークブックの一覧を作る（パス順）"""
+    paths = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            candidates = [os.path.join(pattern, name) for name in os.listdir(pattern)]
+        else:
+            candidates = glob.glob(pattern)
+        for path in candidates:
+            name = os.path.basename(path)
+            # Excelが作るロックファイル（~$ で始まる）は除く
+            if os.path.isfile(path) and name.lower().endswith(WORKBOOK_EXTENSIONS) and not name.startswith('~$'):
+                paths.add(os.path.abspath(path))
+    return sorted(paths)
+
+
+def unique_workbooks(paths):
+    """内容が同一のワークブックを除き、(変換するパス, 重複として除いたパス) を返す"""
+    seen = {}
+    skipped = []
+    for path in paths:
+        digest = file_sha256(path)
+        if digest in seen:
+            skipped.append((path, seen[digest]))
+        else:
+            seen[digest] = path
+    return list(seen.values()), skipped
+
+
+def plan_tasks(paths):
+    """(ワークブック, 種類, シート名, 料理タイプ) の作業一覧（統合する順）"""
+    cuisine_sheets = load_script('extract-cuisine-data').CUISINE_SHEETS
+    tasks = []
+    for path in paths:
+        tasks.append((path, 'sake', SAKE_SHEET_NAME, None))
+        for sheet_name, cuisine_key in cuisine_sheets.items():
+            tasks.append((path, 'dish', sheet_name, cuisine_key))
+    return tasks
+
+
+def convert_task(task, vectorized=False):
+    """1シート分を変換する（ワーカープロセスで実行）
+
+    (task, レコード一覧, エラーメッセージ) を返す。シートがなければレコードは None。
+    """
+    path, kind, sheet_name, cuisine_key = task
+    try:
+        if not get_workbook(path).has_sheet(sheet_name):
+            return task, None, None
+        if kind == 'sake':
+            records = list(load_script('convert-excel-proper').iter_sake_data(path, sheet_name, vectorized=vectorized))
+        else:
+            records = list(load_script('extract-cuisine-data').iter_dish_data(path, sheet_name, cuisine_key))
+        return task, records, None
+    except Exception as e:
+        return task, None, str(e)
+
+
+def _convert_task_vectorized(task):
+    return convert_task(task, vectorized=True)
+
+
+def run_tasks(tasks, max_workers=None, vectorized=False):
+    """作業をプロセスプールで実行し、結果を作業一覧と同じ順で返す"""
+    worker = _convert_task_vectorized if vectorized else convert_task
+    if max_workers == 1:
+        return [worker(task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(worker, tasks))
+
+
+def sake_identity(record):
+    """お酒の同一性の判定に使う値（銘柄名+酒蔵名）"""
+    return record['name'], record['brewery']
+
+
+def dish_identity(record):
+    return record['id']
+
+
+class RecordMerger:
+    """レコードを統合する
+
+    identity が同じレコードは、ignored_fields を除いた内容ハッシュが同じなら重複として除き、
+    異なれば衝突として報告する。identity が異なるのにIDが使用済みの場合はIDを付け替える。
+    """
+
+    def __init__(self, identity=dish_identity, ignored_fields=()):
+        self.identity = identity
+        self.ignored_fields = ignored_fields
+        self.records = {}
+        self.hashes = {}
+        self.sources = {}
+        self.ids = set()
+        self.duplicates = 0
+        self.conflicts = []
+        self.renamed = []
+
+    def _content_hash(self, record):
+        return hash_record({key: value for key, value in record.items() if key not in self.ignored_fields})
+
+    def _unique_id(self, record_id, namespace):
+        candidate = f"{record_id}-{namespace}"
+        suffix = 2
+        while candidate in self.ids:
+            candidate = f"{record_id}-{namespace}-{suffix}"
+            suffix += 1
+        return candidate
+
+    def add(self, record, source, namespace=None):
+        """レコードを追加する（採用したレコードを返す。重複・衝突の場合は None）"""
+        identity = self.identity(record)
+        digest = self._content_hash(record)
+        if identity in self.records:
+            if self.hashes[identity] == digest:
+                self.duplicates += 1
+            else:
+                self.conflicts.append((self.records[identity]['id'], self.sources[identity], source))
+            return None
+
+        record_id = record['id']
+        if record_id in self.ids:
+            new_id = self._unique_id(record_id, namespace or source)
+            record = dict(record, id=new_id)
+            if record.get('ecUrl') == EC_URL_PREFIX + record_id:
+                record['ecUrl'] = EC_URL_PREFIX + new_id
+            self.renamed.append((record_id, new_id, source))
+        self.ids.add(record['id'])
+        self.records[identity] = record
+        self.hashes[identity] = digest
+        self.sources[identity] = source
+        return record
+
+
+def merge_results(results):
+    """作業結果を (お酒データ一覧, 料理タイプ別の料理データ, 統合の報告) にまとめる"""
+    cuisine_sheets = load_script('extract-cuisine-data').CUISINE_SHEETS
+    # お酒は行番号由来のID・URLを除いた内容で重複を判定する
+    sake_merger = RecordMerger(sake_identity, ignored_fields=('id', 'ecUrl'))
+    dish_merger = RecordMerger()
+    cuisine_data = {cuisine_key: [] for cuisine_key in cuisine_sheets.values()}
+    errors = []
+
+    for (path, kind, sheet_name, cuisine_key), records, error in results:
+        source = f"{os.path.basename(path)}:{sheet_name}"
+        namespace = os.path.splitext(os.path.basename(path))[0]
+        if error is not None:
+            errors.append((source, error))
+            continue
+        for record in records or []:
+            if kind == 'sake':
+                sake_merger.add(record, source, namespace)
+            else:
+                record = dish_merger.add(record, source, namespace)
+                if record is not None:
+                    cuisine_data[cuisine_key].append(record)
+
+    report = {
+        'sake': {'count': len(sake_merger.records), 'duplicates': sake_merger.duplicates, 'conflicts': sake_merger.conflicts,
+                 'renamed': sake_merger.renamed},
+        'dish': {'count': len(dish_merger.records), 'duplicates': dish_merger.duplicates, 'conflicts': dish_merger.conflicts,
+                 'renamed': dish_merger.renamed},
+        'errors': errors,
+    }
+    return list(sake_merger.records.values()), cuisine_data, report
+
+
+def convert_workbooks(patterns, max_workers=None, vectorized=False):
+    """ワークブック群を並列に変換・統合する
+
+    戻り値は (お酒データ一覧, 料理タイプ別の料理データ, 統合の報告)。
+    """
+    paths, skipped = unique_workbooks(expand_workbook_paths(patterns))
+    sake_data, cuisine_data, report = merge_results(run_tasks(plan_tasks(paths), max_workers, vectorized))
+    report['workbooks'] = paths
+    report['skipped_workbooks'] = skipped
+    return sake_data, cuisine_data, report
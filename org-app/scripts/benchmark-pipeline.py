@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""変換パイプラインのベンチマークを実行する
+
+使い方:
+    python benchmark-pipeline.py [--sizes 1k,100k,1m] [--formats xlsx,csv] [--stage 段階名]...
+                                 [--work-dir DIR] [--check | --baseline FILE] [--save-baseline FILE]
+                                 [--threshold 0.2]
+
+合成データ（synthetic_matrix.py）を作成して各段階を計測し、結果を表示する。
+--baseline を指定すると基準値と比較し、悪化があれば終了コード1で終わる
+（--check は scripts/benchmark-baseline.json と比較する）。
+--save-baseline で今回の結果を基準値ファイルとして保存する。
+
+処理時間はマシンによって変わるため、基準値はリポジトリに含めず（.gitignore）、
+計測するマシンごとに --save-baseline で作る。基準値と違うマシン（ホスト名・CPU・Python など）で
+比較しようとした場合は比較せずに終了コード1で終わる。
+"""
+import os
+import sys
+import tempfile
+
+from pipeline_benchmark import (DEFAULT_SIZES, EnvironmentMismatch, compare_with_baseline, format_result,
+                                parse_size, run_benchmarks, save_baseline)
+from run_instrumentation import parse_options
+
+DEFAULT_BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark-baseline.json")
+DEFAULT_WORK_DIR = os.path.join(tempfile.gettempdir(), "org-app-benchmark")
+
+
+def main(sizes=DEFAULT_SIZES, formats=('xlsx', 'csv'), stages=None, work_dir=DEFAULT_WORK_DIR,
+         baseline_file=None, save_baseline_file=None, threshold=0.2):
+    results = run_benchmarks(sizes, work_dir, stages=stages, formats=formats)
+
+    if save_baseline_file:
+        save_baseline(results, save_baseline_file)
+        print(f"\n基準値を {save_baseline_file} に保存しました")
+
+    if baseline_file:
+        if not os.path.exists(baseline_file):
+            print(f"\n基準値ファイルが見つかりません: {baseline_file}（--save-baseline で作成できます）")
+            return
+        try:
+            regressions = compare_with_baseline(results, baseline_file, threshold)
+        except EnvironmentMismatch as e:
+            print(f"\n基準値 {baseline_file} は別のマシンで計測されたため比較しません")
+            for key, previous, current in e.differences:
+                print(f"    {key}: {previous} → {current}")
+            print("このマシンの基準値は --save-baseline で作成してください")
+            sys.exit(1)
+        if regressions:
+            print(f"\n=== 基準値からの悪化（{threshold:.0%}超）: {len(regressions)}件 ===")
+            for result, metric, previous, current in regressions:
+                print(f"{format_result(result)}\n    {metric}: {previous:,.2f} → {current:,.2f}")
+            sys.exit(1)
+        print(f"\n基準値 {baseline_file} からの悪化はありません")
+
+
+def parse_args(args):
+    remaining, options = parse_options(args, {
+        '--sizes': ('sizes', lambda value: [parse_size(size) for size in value.split(',')]),
+        '--formats': ('formats', lambda value: tuple(value.split(','))),
+        '--stage': ('stages', str),
+        '--work-dir': ('work_dir', str),
+        '--check': ('baseline_file', DEFAULT_BASELINE_FILE),
+        '--baseline': ('baseline_file', str),
+        '--save-baseline': ('save_baseline_file', str),
+        '--threshold': ('threshold', float),
+    }, {'stages': []})
+    if remaining:
+        print(__doc__)
+        sys.exit(1)
+    return options
+
+
+if __name__ == "__main__":
+    main(**parse_args(sys.argv[1:]))
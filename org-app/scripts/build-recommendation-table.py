@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""診断の全回答パターンのおすすめ上位k件を事前計算した表を出力する
+
+使い方:
+    python build-recommendation-table.py [ワークブック|CSVディレクトリ] [--catalog お酒.json] [--dishes 料理.json]
+                                         [--top-k N] [--check] [--output 表.json]
+
+--catalog には SakeProfile 形式（sake-data.ts と同じ項目）のお酒一覧のJSONを渡せる。
+省略した場合はワークブックのお酒データに、マトリックス基準の日本酒度・酸度・4タイプ分類を
+加えたものを使う。--check を付けると、1本ずつ計算する移植版の recommendSakes と
+全回答パターンの結果を突き合わせる。TypeScript の recommendSakes との突き合わせは
+npm run check-recommendation-table（scripts/check-recommendation-table.js）で行う。
+"""
+import json
+import sys
+
+from dish_sake_index import load_sake_matching_columns
+from recommendation_engine import RecommendationEngine, enumerate_answer_patterns, recommend_sakes_reference
+from run_instrumentation import parse_options
+from script_loader import load_script
+from workbook_loader import DEFAULT_EXCEL_FILE, get_workbook
+
+TABLE_OUTPUT_FILE = "/workspaces/org-app/org-app/lib/data/recommendation-table.json"
+TABLE_VERSION = 1
+
+
+def load_catalog_from_workbook(excel_file):
+    """ワークブックのお酒データに、相性判定に使う生の値を SakeProfile の項目名で加える"""
+    sakes = load_script('convert-excel-proper').convert_excel_to_sake_data(excel_file)
+    matching = load_sake_matching_columns(excel_file)
+    for sake, nihonshu_degree, real_acidity, sake_type in zip(
+            sakes, matching['nihonshu_do'].tolist(), matching['acidity'].tolist(), matching['sake_type']):
+        sake['nihonshuDegree'] = nihonshu_degree
+        sake['realAcidity'] = real_acidity
+        sake['sakeTypeCategory'] = sake_type
+    return sakes
+
+
+def load_dishes_from_workbook(excel_file):
+    extractor = load_script('extract-cuisine-data')
+    workbook = get_workbook(excel_file)
+    dishes = []
+    for sheet_name, cuisine_key in extractor.CUISINE_SHEETS.items():
+        if workbook.has_sheet(sheet_name):
+            dishes.extend(extractor.iter_dish_data(excel_file, sheet_name, cuisine_key))
+    return dishes
+
+
+def load_dishes_from_json(dishes_file):
+    """dish-compatibility-matrix.json（料理タイプ → 料理一覧）を読み込む"""
+    with open(dishes_file, encoding='utf-8') as f:
+        cuisine_data = json.load(f)
+    return [dish for cuisine_dishes in cuisine_data.values() for dish in cuisine_dishes]
+
+
+def check_parity(sakes, dishes, table, top_k):
+    """全回答パターンについて、移植版の recommendSakes と結果が一致するか確認する"""
+    mismatches = []
+    for pattern in enumerate_answer_patterns():
+        expected = recommend_sakes_reference(sakes, dishes, pattern, top_k)
+        entry = table[pattern['key']]
+        actual = list(zip(entry['sakeIds'], entry['scores']))
+        if actual != expected:
+            mismatches.append((pattern['key'], expected, actual))
+    return mismatches
+
+
+def build_table_document(table, top_k):
+    return {
+        'version': TABLE_VERSION,
+        'topK': top_k,
+        # キーは "q1:q2:q3:q4"（q2 を答えない「色々な料理」は空欄）
+        'keyFormat': 'q1:q2:q3:q4',
+        'entries': table,
+    }
+
+
+def main(excel_file=DEFAULT_EXCEL_FILE, catalog_file=None, dishes_file=None, top_k=3, check=False,
+         output_file=TABLE_OUTPUT_FILE):
+    if catalog_file:
+        with open(catalog_file, encoding='utf-8') as f:
+            sakes = json.load(f)
+    else:
+        sakes = load_catalog_from_workbook(excel_file)
+    dishes = load_dishes_from_json(dishes_file) if dishes_file else load_dishes_from_workbook(excel_file)
+
+    if not sakes:
+        print("お酒データがないため、おすすめ表は作成しません")
+        return
+
+    table = RecommendationEngine(sakes, dishes).build_table(top_k=top_k)
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(build_table_document(table, top_k), f, ensure_ascii=False, separators=(',', ':'))
+        f.write('\n')
+    print(f"おすすめ表を {output_file} に保存しました（回答パターン {len(table)}件 × 上位{top_k}件、お酒 {len(sakes)}本）")
+
+    if check:
+        mismatches = check_parity(sakes, dishes, table, top_k)
+        if mismatches:
+            print(f"不一致: {len(mismatches)}件")
+            for key, expected, actual in mismatches[:10]:
+                print(f"  {key}: 期待値 {expected} / 一括計算 {actual}")
+            sys.exit(1)
+        print(f"一致を確認しました: 全{len(table)}パターン")
+
+
+def parse_args(args):
+    """コマンドライン引数を (入力, オプション) に分ける"""
+    return parse_options(args, {
+        '--catalog': ('catalog_file', str),
+        '--dishes': ('dishes_file', str),
+        '--top-k': ('top_k', int),
+        '--check': ('check', True),
+        '--output': ('output_file', str),
+    }, {'catalog_file': None, 'dishes_file': None, 'top_k': 3, 'check': False, 'output_file': TABLE_OUTPUT_FILE})
+
+
+if __name__ == "__main__":
+    inputs, options = parse_args(sys.argv[1:])
+    main(inputs[0] if inputs else DEFAULT_EXCEL_FILE, **options)
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""お酒 → 合う料理 の逆引きデータを作成する
+
+料理の相性範囲から区間インデックス（dish_interval_index）を作り、
+フロントエンド用のインデックスと、カタログ全体の「お酒ごとの合う料理」表を出力する。
+"""
+import json
+import sys
+
+from dish_interval_index import DishIntervalIndex
+from dish_sake_index import SAKE_SHEET_NAME, load_sake_matching_columns
+from output_writers import atomic_output
+from run_instrumentation import get_logger, instrumented_run, parse_instrumentation_args
+from script_loader import load_script
+from workbook_loader import DEFAULT_EXCEL_FILE, get_workbook
+
+logger = get_logger('build-sake-pairings')
+
+INTERVAL_INDEX_OUTPUT_FILE = "/workspaces/org-app/org-app/lib/data/dish-interval-index.json"
+PAIRINGS_OUTPUT_FILE = "/workspaces/org-app/org-app/lib/data/sake-dish-pairings.json"
+
+
+def build_sake_pairings(excel_file, use_type_class=False):
+    """(区間インデックス, お酒IDごとの料理ID一覧) を返す"""
+    cuisine_data = load_script('extract-cuisine-data').extract_cuisine_matrix_data(excel_file)
+    if cuisine_data is None:
+        return None, None
+    index = DishIntervalIndex.from_cuisine_data(cuisine_data)
+    
+    if not get_workbook(excel_file).has_sheet(SAKE_SHEET_NAME):
+        logger.warning(f"{SAKE_SHEET_NAME}シートが見つかりません")
+        return index, None
+    pairings = index.query_batch(load_sake_matching_columns(excel_file), use_type_class=use_type_class)
+    return index, pairings
+
+
+def main(excel_file=DEFAULT_EXCEL_FILE, use_type_class=False):
+    index, pairings = build_sake_pairings(excel_file, use_type_class=use_type_class)
+    if index is None:
+        logger.error("料理データの抽出に失敗しました")
+        return
+    
+    with atomic_output(INTERVAL_INDEX_OUTPUT_FILE) as f:
+        f.write(index.dumps())
+    logger.info(f"区間インデックスを {INTERVAL_INDEX_OUTPUT_FILE} に保存しました（料理 {len(index.dish_ids)}品）")
+    
+    if pairings is not None:
+        with atomic_output(PAIRINGS_OUTPUT_FILE) as f:
+            json.dump(pairings, f, ensure_ascii=False, separators=(',', ':'))
+        logger.info(f"お酒ごとの合う料理を {PAIRINGS_OUTPUT_FILE} に保存しました（{len(pairings)}本）")
+
+
+if __name__ == "__main__":
+    # --log-level / --verbose / --profile / --trace-memory / --report FILE は run_instrumentation を参照
+    argv, instrumentation_options = parse_instrumentation_args(sys.argv[1:])
+    args = [arg for arg in argv if not arg.startswith('--')]
+    with instrumented_run('build-sake-pairings', **instrumentation_options):
+        main(args[0] if args else DEFAULT_EXCEL_FILE, use_type_class='--type-class' in argv)
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""お酒ごとに味わいの近いお酒（類似酒）の上位k本を事前計算した表を出力する
+
+使い方:
+    python build-similar-sakes.py [ワークブック|CSVディレクトリ] [--catalog お酒.json] [--output 表.json]
+                                  [--top-k N] [--check]
+
+--catalog には SakeProfile 形式のお酒一覧のJSON（sake-data-excel.json など）を渡せる。
+省略した場合はワークブックのお酒データを convert-excel-proper と同じく変換して使う。
+--check を付けると、一部のお酒について全件と1本ずつ比べた結果（similar_sakes_reference）と
+突き合わせる。Pythonから直接引く場合は similar_sakes.SimilarSakeIndex を使う。
+"""
+import json
+import random
+import sys
+
+from run_instrumentation import count, get_logger, instrumented_run, parse_instrumentation_args, parse_options, stage
+from script_loader import load_script
+from similar_sakes import DEFAULT_TOP_K, FLAVOR_FIELDS, SimilarSakeIndex, similar_sakes_reference
+from workbook_loader import DEFAULT_EXCEL_FILE
+
+logger = get_logger('build-similar-sakes')
+
+SIMILAR_SAKES_OUTPUT_FILE = "/workspaces/org-app/org-app/lib/data/similar-sakes.json"
+TABLE_VERSION = 1
+# --check で突き合わせるお酒の数
+CHECK_SAMPLE_SIZE = 500
+
+
+def build_similar_sakes_document(index, top_k):
+    return {
+        'version': TABLE_VERSION,
+        'topK': top_k,
+        'fields': FLAVOR_FIELDS,
+        # 各項目は (値 - mean) / scale で標準化したうえでユークリッド距離を測る
+        'normalization': {'mean': index.mean.tolist(), 'scale': index.scale.tolist()},
+        'entries': index.neighbor_table(top_k),
+    }
+
+
+def write_similar_sakes(sake_data, output_file=SIMILAR_SAKES_OUTPUT_FILE, top_k=DEFAULT_TOP_K):
+    """変換したお酒データから類似酒の表を作って保存し、インデックスを返す"""
+    with stage('similar_index'):
+        index = SimilarSakeIndex.from_sakes(sake_data)
+        document = build_similar_sakes_document(index, top_k)
+    count('similar_sakes', len(index.ids))
+    with stage('file_write'):
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(document, f, ensure_ascii=False, separators=(',', ':'))
+            f.write('\n')
+    logger.info(f"類似酒の表を {output_file} に保存しました（お酒 {len(index.ids)}本 × 上位{top_k}本、"
+                f"味わいのパターン {len(index.unique_vectors)}通り）")
+    return index
+
+
+def check_parity(index, top_k, sample_size=CHECK_SAMPLE_SIZE):
+    """一部のお酒について、全件と1本ずつ比べた結果と表の結果が一致するか確認する"""
+    positions, distances = index.all_neighbors(top_k)
+    sample = random.Random(0).sample(range(len(index.ids)), min(sample_size, len(index.ids)))
+    mismatches = []
+    for position in sample:
+        expected = similar_sakes_reference(index, index.ids[position], top_k)
+        actual = [(index.ids[other], distance)
+                  for other, distance in zip(positions[position].tolist(), distances[position].tolist()) if other >= 0]
+        if actual != expected:
+            mismatches.append((index.ids[position], expected, actual))
+    return len(sample), mismatches
+
+
+def main(excel_file=DEFAULT_EXCEL_FILE, catalog_file=None, output_file=SIMILAR_SAKES_OUTPUT_FILE,
+         top_k=DEFAULT_TOP_K, check=False):
+    if catalog_file:
+        with open(catalog_file, encoding='utf-8') as f:
+            sake_data = json.load(f)
+    else:
+        sake_data = load_script('convert-excel-proper').convert_excel_to_sake_data(excel_file, vectorized=True, records=True)
+
+    if not sake_data:
+        logger.error("お酒データがないため、類似酒の表は作成しません")
+        return 1
+
+    index = write_similar_sakes(sake_data, output_file, top_k)
+
+    if check:
+        checked, mismatches = check_parity(index, top_k)
+        if mismatches:
+            logger.error(f"不一致: {len(mismatches)}件")
+            for sake_id, expected, actual in mismatches[:10]:
+                logger.error(f"  {sake_id}: 期待値 {expected} / 一括計算 {actual}")
+            return 1
+        logger.info(f"一致を確認しました: {checked}本")
+    return 0
+
+
+def parse_args(args):
+    """コマンドライン引数を (入力, オプション) に分ける"""
+    return parse_options(args, {
+        '--catalog': ('catalog_file', str),
+        '--output': ('output_file', str),
+        '--top-k': ('top_k', int),
+        '--check': ('check', True),
+    }, {'catalog_file': None, 'output_file': SIMILAR_SAKES_OUTPUT_FILE, 'top_k': DEFAULT_TOP_K, 'check': False})
+
+
+if __name__ == "__main__":
+    argv, instrumentation_options = parse_instrumentation_args(sys.argv[1:])
+    inputs, options = parse_args(argv)
+    with instrumented_run('build-similar-sakes', **instrumentation_options):
+        status = main(inputs[0] if inputs else DEFAULT_EXCEL_FILE, **options)
+    sys.exit(status)
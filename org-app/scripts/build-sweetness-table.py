@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""辛甘判定の基準（sweetness-rules.json）から判定表（sweetness-table.json）を作る
+
+使い方:
+    python build-sweetness-table.py [--rules 基準.json] [--output 表.json] [--check]
+
+作った表は、基準を上から順に比べる判定（これまでの judgeSweetnessByMatrix と同じ処理）と
+日本酒度 -40〜+40・酸度 0〜6 の 0.01 刻みの全組み合わせで一致することを確かめてから保存する。
+--check を付けると保存せず、保存済みの表が基準から作った表と同じかだけを確かめる。
+"""
+import json
+import sys
+
+import numpy as np
+
+from run_instrumentation import parse_options
+from sweetness_table import RULES_FILE, TABLE_FILE, SweetnessTable, build_sweetness_table, load_sweetness_rules
+
+# 確かめる範囲（0.01 刻み）
+CHECK_DEGREE_RANGE = (-40, 40)
+CHECK_ACIDITY_RANGE = (0, 6)
+CHECK_STEP = 0.01
+
+
+def _judge_by_rules(levels, values):
+    """基準を上から順に比べ、最初に min 以上になった位置（配列でまとめて求める）"""
+    thresholds = levels['thresholds']
+    return np.select([values >= entry['min'] for entry in thresholds], range(len(thresholds)), len(thresholds))
+
+
+def _acidity_impact_by_rules(rules, acidity):
+    for entry in rules['acidityImpact']['thresholds']:
+        if acidity >= entry['min']:
+            return entry['impact']
+    return rules['acidityImpact']['default']
+
+
+def find_mismatches(rules, table):
+    """基準を順に比べた判定と表の判定が異なる (日本酒度, 酸度) の一覧"""
+    lookup = SweetnessTable(table)
+    # 0.01 刻みの値は round で作り、表と同じく小数第2位までの値として比べる
+    degrees = np.round(np.arange(CHECK_DEGREE_RANGE[0], CHECK_DEGREE_RANGE[1] + CHECK_STEP / 2, CHECK_STEP), 2)
+    acidities = np.round(np.arange(CHECK_ACIDITY_RANGE[0], CHECK_ACIDITY_RANGE[1] + CHECK_STEP / 2, CHECK_STEP), 2)
+    mismatches = []
+    for acidity in acidities.tolist():
+        impact = _acidity_impact_by_rules(rules, acidity)
+        expected = _judge_by_rules(rules['matrixLevels'], np.round(degrees + impact, 2))
+        actual = lookup.level_index(degrees, np.full(len(degrees), acidity))
+        for degree in degrees[expected != actual].tolist():
+            mismatches.append((degree, acidity))
+    basic_expected = _judge_by_rules(rules['basicLevels'], degrees)
+    basic_actual = np.array([lookup.basic_levels.index(lookup.judge_basic(degree)) for degree in degrees.tolist()])
+    mismatches.extend((degree, None) for degree in degrees[basic_expected != basic_actual].tolist())
+    return mismatches
+
+
+def dump_sweetness_table(table):
+    return json.dumps(table, ensure_ascii=False, indent=2) + '\n'
+
+
+def main(rules_file=RULES_FILE, output_file=TABLE_FILE, check=False):
+    rules = load_sweetness_rules(rules_file)
+    table = build_sweetness_table(rules)
+    content = dump_sweetness_table(table)
+
+    if check:
+        try:
+            with open(output_file, encoding='utf-8') as f:
+                current = f.read()
+        except FileNotFoundError:
+            current = None
+        if current != content:
+            print(f"{output_file} は基準（{rules_file}）から作った表と異なります。build-sweetness-table.py を実行してください")
+            return 1
+        print(f"{output_file} は最新です")
+        return 0
+
+    mismatches = find_mismatches(rules, table)
+    if mismatches:
+        print(f"基準と表の判定が {len(mismatches)}件で異なるため保存しません")
+        for degree, acidity in mismatches[:10]:
+            print(f"  日本酒度 {degree} / 酸度 {acidity}")
+        return 1
+
+    with open(output_file, 'w', encoding='utf-8') as f:
+        f.write(content)
+    matrix = table['matrix']
+    print(f"辛甘判定表を {output_file} に保存しました"
+          f"（日本酒度 {matrix['degreeCount']}マス × 酸度 {matrix['acidityCount']}マス）")
+    return 0
+
+
+def parse_args(args):
+    """コマンドライン引数を (入力, オプション) に分ける"""
+    return parse_options(args, {
+        '--rules': ('rules_file', str),
+        '--output': ('output_file', str),
+        '--check': ('check', True),
+    }, {'rules_file': RULES_FILE, 'output_file': TABLE_FILE, 'check': False})
+
+
+if __name__ == "__main__":
+    _, options = parse_args(sys.argv[1:])
+    sys.exit(main(**options))
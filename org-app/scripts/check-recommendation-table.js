@@ -0,0 +1,130 @@
+#!/usr/bin/env node
+// おすすめ表（scripts/build-recommendation-table.py）と TypeScript の recommendSakes の一致確認
+//
+// 使い方:
+//     npm run check-recommendation-table [-- --table 表.json]
+//
+// --table を省略した場合は、sake-data.ts の sakeData と dish-compatibility-matrix.ts の料理データを
+// JSONに書き出し、それを --catalog / --dishes に渡して表を作り直してから確認する
+// （Python側の移植版との突き合わせ --check も同時に行う）。
+// --table を渡す場合は、sakeData と同じお酒一覧から作成した表であること。
+// .ts は devDependencies の typescript でCommonJSに変換して読み込む。
+const fs = require('fs');
+const os = require('os');
+const path = require('path');
+const Module = require('module');
+const { spawnSync } = require('child_process');
+const ts = require('typescript');
+
+const ROOT_DIR = path.resolve(__dirname, '..');
+const PYTHON = process.env.PYTHON || 'python3';
+
+// tsconfig の paths（@/* → ./*）と拡張子なしの .ts の import を解決する
+// （同じ名前の .json がある場合も bundler と同じく .ts を優先する）
+const resolveFilename = Module._resolveFilename;
+Module._resolveFilename = function (request, parent, ...rest) {
+  if (request.startsWith('@/')) {
+    request = path.join(ROOT_DIR, request.slice(2));
+  }
+  const isFilePath = path.isAbsolute(request) || request.startsWith('.');
+  if (isFilePath && path.extname(request) === '') {
+    for (const extension of ['.ts', '.tsx']) {
+      if (fs.existsSync(path.resolve(parent ? path.dirname(parent.filename) : ROOT_DIR, request + extension))) {
+        request += extension;
+        break;
+      }
+    }
+  }
+  return resolveFilename.call(this, request, parent, ...rest);
+};
+
+require.extensions['.ts'] = (module, filename) => {
+  const source = fs.readFileSync(filename, 'utf8');
+  const { outputText } = ts.transpileModule(source, {
+    fileName: filename,
+    compilerOptions: {
+      module: ts.ModuleKind.CommonJS,
+      target: ts.ScriptTarget.ES2017,
+      esModuleInterop: true,
+      resolveJsonModule: true,
+    },
+  });
+  module._compile(outputText, filename);
+};
+
+// dish-compatibility-matrix.ts の料理データを dish-compatibility-matrix.json の形式にする
+function toCuisineJson(dishes) {
+  const cuisineData = {};
+  for (const dish of dishes) {
+    (cuisineData[dish.cuisineType] ??= []).push({
+      id: dish.id,
+      name: dish.name,
+      cuisine_type: dish.cuisineType,
+      compatibility: {
+        sake_min_level: dish.compatibility.sakeMinLevel,
+        sake_max_level: dish.compatibility.sakeMaxLevel,
+        acidity_min: dish.compatibility.acidityMin,
+        acidity_max: dish.compatibility.acidityMax,
+        alcohol_min: dish.compatibility.alcoholMin,
+        alcohol_max: dish.compatibility.alcoholMax,
+      },
+      type_class1: dish.typeClass1,
+      type_class2: dish.typeClass2,
+      match_bonus: dish.matchBonus,
+    });
+  }
+  return cuisineData;
+}
+
+function buildTable(workDir) {
+  const { sakeData } = require('@/lib/data/sake-data');
+  const { dishCompatibilityData } = require('@/lib/data/dish-compatibility-matrix');
+  const catalogFile = path.join(workDir, 'sake-catalog.json');
+  const dishesFile = path.join(workDir, 'dishes.json');
+  const tableFile = path.join(workDir, 'recommendation-table.json');
+  fs.writeFileSync(catalogFile, JSON.stringify(sakeData));
+  fs.writeFileSync(dishesFile, JSON.stringify(toCuisineJson(dishCompatibilityData)));
+
+  const result = spawnSync(PYTHON, [
+    path.join(__dirname, 'build-recommendation-table.py'),
+    '--catalog', catalogFile, '--dishes', dishesFile, '--output', tableFile, '--check',
+  ], { stdio: 'inherit' });
+  if (result.status !== 0) {
+    throw new Error(`build-recommendation-table.py が失敗しました（終了コード ${result.status}）`);
+  }
+  return tableFile;
+}
+
+function main(args) {
+  const tableIndex = args.indexOf('--table');
+  let workDir = null;
+  let tableFile;
+  if (tableIndex >= 0) {
+    tableFile = path.resolve(args[tableIndex + 1]);
+  } else {
+    workDir = fs.mkdtempSync(path.join(os.tmpdir(), 'recommendation-table-'));
+    tableFile = buildTable(workDir);
+  }
+
+  try {
+    const { checkRecommendationTableParity } = require('@/lib/recommendation/recommendation-table');
+    const table = JSON.parse(fs.readFileSync(tableFile, 'utf8'));
+    const mismatches = checkRecommendationTableParity(table);
+    const total = Object.keys(table.entries).length;
+    if (mismatches.length > 0) {
+      console.error(`recommendSakes との不一致: ${mismatches.length}件 / 全${total}パターン`);
+      for (const { key, expected, actual } of mismatches.slice(0, 10)) {
+        console.error(`  ${key}: recommendSakes ${JSON.stringify(expected)} / 表 ${JSON.stringify(actual)}`);
+      }
+      return 1;
+    }
+    console.log(`recommendSakes との一致を確認しました: 全${total}パターン`);
+    return 0;
+  } finally {
+    if (workDir) {
+      fs.rmSync(workDir, { recursive: true, force: true });
+    }
+  }
+}
+
+process.exitCode = main(process.argv.slice(2));
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""お酒・料理データの列指向（struct-of-arrays）出力形式
+
+レコードの配列ではなく列ごとの配列として書き出す。種類・都道府県などの
+繰り返しの多い文字列は辞書に登録してコード（整数）で持つ。
+
+- JSON形式: 列ごとの配列と辞書をそのままJSONにしたもの
+- バイナリ形式: 小さなJSONのスキーマヘッダーの後に、8バイト境界に揃えた
+  リトルエンディアンの型付き配列を並べたもの。numpy.memmap で開けば
+  数値列はコピーせずにそのまま配列として参照できる。
+
+バイナリのレイアウト:
+    MAGIC (8バイト) | ヘッダー長 (uint32) | ヘッダーJSON | パディング | データ領域
+"""
+import json
+import os
+import struct
+
+import numpy as np
+
+from output_writers import atomic_output
+
+MAGIC = b'ORGCOL01'
+FORMAT_NAME = 'org-app-columnar'
+FORMAT_VERSION = 1
+ALIGNMENT = 8
+
+# 列の種類
+#   int / float : 数値（dtypeを指定）
+#   string      : UTF-8文字列（オフセット + バイト列）
+#   category    : 辞書に登録した文字列のコード
+#   category_list: 辞書に登録した文字列のリスト（オフセット + コード）
+SAKE_SCHEMA = [
+    ('id', 'string', None),
+    ('name', 'string', None),
+    ('brewery', 'category', None),
+    ('price', 'int', '<i8'),
+    ('alcoholContent', 'float', '<f8'),
+    ('riceMilling', 'int', '<i4'),
+    ('sweetness', 'float', '<f8'),
+    ('richness', 'float', '<f8'),
+    ('acidity', 'float', '<f8'),
+    ('aroma', 'int', '<i4'),
+    ('type', 'category', None),
+    ('prefecture', 'category', None),
+    ('description', 'category', None),
+    ('ecUrl', 'string', None),
+    ('tags', 'category_list', None),
+]
+
+DISH_SCHEMA = [
+    ('id', 'string', None),
+    ('name', 'string', None),
+    ('cuisine_type', 'category', None),
+    ('compatibility.sake_min_level', 'float', '<f8'),
+    ('compatibility.sake_max_level', 'float', '<f8'),
+    ('compatibility.acidity_min', 'float', '<f8'),
+    ('compatibility.acidity_max', 'float', '<f8'),
+    ('compatibility.alcohol_min', 'float', '<f8'),
+    ('compatibility.alcohol_max', 'float', '<f8'),
+    ('type_class1', 'category', None),
+    ('type_class2', 'category', None),
+    ('match_bonus', 'float', '<f8'),
+]
+
+SCHEMAS = {
+    'sake': SAKE_SCHEMA,
+    'dish': DISH_SCHEMA,
+}
+
+
+def _get_field(record, name):
+    # 'compatibility.sake_min_level' のようなネストした項目に対応
+    for key in name.split('.'):
+        record = record[key]
+    return record
+
+
+def _set_field(record, name, value):
+    keys = name.split('.')
+    for key in keys[:-1]:
+        record = record.setdefault(key, {})
+    record[keys[-1]] = value
+
+
+def _intern(values):
+    """文字列を辞書に登録し、(辞書, コード配列) を返す（辞書は初出順）"""
+    dictionary = {}
+    codes = np.fromiter((dictionary.setdefault(value, len(dictionary)) for value in values), dtype='<i4', count=len(values))
+    return list(dictionary), codes
+
+
+def build_columns(records, table):
+    """レコードの配列を列ごとのデータに変換する"""
+    columns = {}
+    for name, kind, dtype in SCHEMAS[table]:
+        values = [_get_field(record, name) for record in records]
+        if kind in ('int', 'float'):
+            columns[name] = {'kind': kind, 'data': np.asarray(values, dtype=dtype)}
+        elif kind == 'string':
+            columns[name] = {'kind': kind, 'data': values}
+        elif kind == 'category':
+            dictionary, codes = _intern(values)
+            columns[name] = {'kind': kind, 'dictionary': dictionary, 'data': codes}
+        else:
+            dictionary, codes = _intern([item for items in values for item in items])
+            offsets = np.zeros(len(values) + 1, dtype='<i8')
+            np.cumsum([len(items) for items in values], out=offsets[1:])
+            columns[name] = {'kind': kind, 'dictionary': dictionary, 'data': codes, 'offsets': offsets}
+    return columns
+
+
+def dumps_columnar_json(records, table):
+    """列指向のJSON文字列を作る"""
+    columns = {}
+    for name, column in build_columns(records, table).items():
+        entry = {'kind': column['kind']}
+        if 'dictionary' in column:
+            entry['dictionary'] = column['dictionary']
+        if 'offsets' in column:
+            entry['offsets'] = column['offsets'].tolist()
+        data = column['data']
+        entry['data'] = data if isinstance(data, list) else data.tolist()
+        columns[name] = entry
+    document = {
+        'format': FORMAT_NAME,
+        'version': FORMAT_VERSION,
+        'table': table,
+        'length': len(records),
+        'columns': columns,
+    }
+    return json.dumps(document, ensure_ascii=False, separators=(',', ':')) + '\n'
+
+
+def _align(size):
+    return (size + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def write_columnar_binary(records, table, output_file):
+    """列指向のバイナリファイルを書き出す"""
+    buffers = []
+    column_headers = {}
+    offset = 0
+
+    def add_buffer(array):
+        nonlocal offset
+        array = np.ascontiguousarray(array)
+        entry = {'offset': offset, 'dtype': array.dtype.str, 'length': len(array)}
+        buffers.append((offset, array.tobytes()))
+        offset = _align(offset + array.nbytes)
+        return entry
+
+    for name, column in build_columns(records, table).items():
+        header = {'kind': column['kind']}
+        if column['kind'] == 'string':
+            encoded = [value.encode('utf-8') for value in column['data']]
+            offsets = np.zeros(len(encoded) + 1, dtype='<i8')
+            np.cumsum([len(value) for value in encoded], out=offsets[1:])
+            header['offsets'] = add_buffer(offsets)
+            header['data'] = add_buffer(np.frombuffer(b''.join(encoded), dtype='u1'))
+        else:
+            if 'dictionary' in column:
+                header['dictionary'] = column['dictionary']
+            if 'offsets' in column:
+                header['offsets'] = add_buffer(column['offsets'])
+            header['data'] = add_buffer(column['data'])
+        column_headers[name] = header
+
+    header_bytes = json.dumps({
+        'format': FORMAT_NAME,
+        'version': FORMAT_VERSION,
+        'table': table,
+        'length': len(records),
+        'columns': column_headers,
+    }, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    data_start = _align(len(MAGIC) + 4 + len(header_bytes))
+
+    with atomic_output(output_file, binary=True) as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<I', len(header_bytes)))
+        f.write(header_bytes)
+        f.write(b'\0' * (data_start - f.tell()))
+        for buffer_offset, data in buffers:
+            f.write(b'\0' * (data_start + buffer_offset - f.tell()))
+            f.write(data)
+        f.write(b'\0' * (data_start + offset - f.tell()))
+    return data_start + offset
+
+
+def columnar_output_paths(json_output_file):
+    """通常のJSON出力先から列指向形式の出力先 (JSON, バイナリ) を決める"""
+    base, _ = os.path.splitext(json_output_file)
+    return f"{base}.columns.json", f"{base}.columns.bin"
+
+
+def write_columnar_outputs(records, table, json_output_file):
+    """列指向のJSONとバイナリを両方書き出し、出力先のパスを返す"""
+    json_path, binary_path = columnar_output_paths(json_output_file)
+    with atomic_output(json_path) as f:
+        f.write(dumps_columnar_json(records, table))
+    write_columnar_binary(records, table, binary_path)
+    return json_path, binary_path
+
+
+class ColumnarTable:
+    """列指向データの読み込み結果
+
+    数値列・コード列はファイル（またはバッファ）を参照するnumpy配列で、コピーしない。
+    """
+
+    def __init__(self, header, buffer):
+        self.header = header
+        self.table = header['table']
+        self.length = header['length']
+        self._buffer = buffer
+
+    def __len__(self):
+        return self.length
+
+    @property
+    def column_names(self):
+        return list(self.header['columns'])
+
+    def _array(self, entry):
+        if isinstance(entry, list):
+            return np.asarray(entry)
+        return np.frombuffer(self._buffer, dtype=entry['dtype'], count=entry['length'], offset=entry['offset'])
+
+    def column(self, name):
+        """数値列はその値、category列はコードの配列を返す"""
+        return self._array(self.header['columns'][name]['data'])
+
+    def dictionary(self, name):
+        return self.header['columns'][name]['dictionary']
+
+    def values(self, name):
+        """列の値をPythonのリストとして取り出す（文字列は復号する）"""
+        column = self.header['columns'][name]
+        kind = column['kind']
+        if kind == 'string' and isinstance(column['data'], list):
+            return list(column['data'])
+        data = self._array(column['data'])
+        if kind in ('int', 'float'):
+            return data.tolist()
+        if kind == 'category':
+            dictionary = column['dictionary']
+            return [dictionary[code] for code in data.tolist()]
+        offsets = self._array(column['offsets']).tolist()
+        if kind == 'category_list':
+            dictionary = column['dictionary']
+            codes = data.tolist()
+            return [[dictionary[code] for code in codes[start:end]] for start, end in zip(offsets, offsets[1:])]
+        raw = data.tobytes()
+        return [raw[start:end].decode('utf-8') for start, end in zip(offsets, offsets[1:])]
+
+    def to_records(self):
+        """元のレコード形式（辞書の配列）に戻す"""
+        records = [{} for _ in range(self.length)]
+        for name in self.column_names:
+            for record, value in zip(records, self.values(name)):
+                _set_field(record, name, value)
+        return records
+
+
+def load_columnar_binary(input_file, use_mmap=True):
+    """バイナリ形式を読み込む（use_mmap=True ならファイルをメモリマップして参照する）"""
+    if use_mmap:
+        raw = np.memmap(input_file, dtype='u1', mode='r')
+    else:
+        with open(input_file, 'rb') as f:
+            raw = np.frombuffer(f.read(), dtype='u1')
+    if raw[:len(MAGIC)].tobytes() != MAGIC:
+        raise ValueError(f"列指向バイナリ形式ではありません: {input_file}")
+    header_length = struct.unpack('<I', raw[len(MAGIC):len(MAGIC) + 4].tobytes())[0]
+    header_end = len(MAGIC) + 4 + header_length
+    header = json.loads(raw[len(MAGIC) + 4:header_end].tobytes().decode('utf-8'))
+    return ColumnarTable(header, raw[_align(header_end):])
+
+
+def load_columnar_json(input_file):
+    """JSON形式を読み込む"""
+    with open(input_file, encoding='utf-8') as f:
+        document = json.load(f)
+    return ColumnarTable(document, None)
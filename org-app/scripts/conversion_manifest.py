@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""差分変換用のマニフェスト
+
+変換段階（お酒データ・料理データ）ごとに、入力ワークブックの指紋、変換に使う
+その他の入力ファイル（名前辞書など）のハッシュ、シートごとの内容ハッシュ、
+出力レコードごとのハッシュ、出力ファイルのハッシュを記録する。
+次回の実行ではこれと比較して、変更のないシートや出力をスキップする。
+"""
+import hashlib
+import json
+import os
+
+DEFAULT_MANIFEST_FILE = "/workspaces/org-app/org-app/lib/data/.conversion-manifest.json"
+MANIFEST_VERSION = 1
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _source_files(path):
+    """入力に含まれるファイルの一覧（CSVのディレクトリならその中のCSVファイル）"""
+    if os.path.isdir(path):
+        return [os.path.join(path, name) for name in sorted(os.listdir(path))
+                if name.lower().endswith('.csv')]
+    return [path]
+
+
+def source_sha256(path):
+    """入力（ワークブックまたはCSVのディレクトリ）の内容ハッシュ"""
+    if not os.path.isdir(path):
+        return file_sha256(path)
+    digest = hashlib.sha256()
+    for file_path in _source_files(path):
+        digest.update(os.path.basename(file_path).encode('utf-8'))
+        digest.update(file_sha256(file_path).encode('ascii'))
+    return digest.hexdigest()
+
+
+def source_stat(path):
+    """入力の (合計サイズ, 最終更新時刻)"""
+    stats = [os.stat(file_path) for file_path in _source_files(path)]
+    return sum(stat.st_size for stat in stats), max((stat.st_mtime for stat in stats), default=0)
+
+
+def hash_rows(rows):
+    """シートの行（値のタプル）から内容ハッシュを計算"""
+    digest = hashlib.sha256()
+    for row in rows:
+        digest.update(repr(tuple(row)).encode('utf-8'))
+        digest.update(b'\n')
+    return digest.hexdigest()
+
+
+def hash_record(record):
+    """出力レコード1件のハッシュ（キーの順序に依存しない）"""
+    encoded = json.dumps(record, ensure_ascii=False, sort_keys=True).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def workbook_fingerprint(excel_file):
+    """入力の指紋（パス・サイズ・更新時刻・内容ハッシュ）
+
+    変換中にワークブックが保存されても、変換前の内容を記録できるように、
+    ワークブックを読み込む前に取って update / touch_workbook に渡す。
+    """
+    size, mtime = source_stat(excel_file)
+    return {
+        'path': os.path.abspath(excel_file),
+        'size': size,
+        'mtime': mtime,
+        'sha256': source_sha256(excel_file),
+    }
+
+
+def input_hashes(input_files):
+    """変換に使う入力ファイルの内容ハッシュ（ファイルがなければ None）
+
+    ワークブックの指紋と同じく、変換前に取って update に渡す。
+    """
+    return {
+        os.path.abspath(path): file_sha256(path) if os.path.exists(path) else None
+        for path in input_files
+    }
+
+
+class ConversionManifest:
+    def __init__(self, manifest_path=DEFAULT_MANIFEST_FILE):
+        self.manifest_path = manifest_path
+        self.data = {'version': MANIFEST_VERSION, 'stages': {}}
+        if os.path.exists(manifest_path):
+            with open(manifest_path, encoding='utf-8') as f:
+                loaded = json.load(f)
+            if loaded.get('version') == MANIFEST_VERSION:
+                self.data = loaded
+
+    def _stage(self, stage):
+        return self.data['stages'].get(stage, {})
+
+    def workbook_unchanged(self, stage, excel_file):
+        """前回この段階で変換したワークブックから変更がないか
+
+        サイズと更新時刻が一致すればハッシュ計算も省略する。
+        """
+        recorded = self._stage(stage).get('workbook')
+        if not recorded or not os.path.exists(excel_file):
+            return False
+        size, mtime = source_stat(excel_file)
+        if recorded['size'] != size:
+            return False
+        if recorded['mtime'] == mtime:
+            return True
+        return recorded['sha256'] == source_sha256(excel_file)
+
+    def inputs_unchanged(self, stage, inputs):
+        """前回この段階で使った入力ファイル（input_hashes の結果）から変更がないか"""
+        return self._stage(stage).get('inputs', {}) == inputs
+
+    def sheet_unchanged(self, stage, sheet_name, sheet_hash):
+        return self._stage(stage).get('sheets', {}).get(sheet_name) == sheet_hash
+
+    def recorded_sheets(self, stage):
+        """前回この段階で変換したシート名の一覧"""
+        return list(self._stage(stage).get('sheets', {}))
+
+    def outputs_intact(self, stage, output_files=None):
+        """出力ファイルが前回書き出したままの内容で残っているか
+
+        output_files を省略した場合は前回記録したすべての出力を確認する。
+        """
+        recorded = self._stage(stage).get('outputs', {})
+        if output_files is None:
+            output_files = list(recorded)
+            if not output_files:
+                return False
+        for output_file in output_files:
+            if output_file not in recorded or not os.path.exists(output_file):
+                return False
+            if recorded[output_file] != file_sha256(output_file):
+                return False
+        return True
+
+    def diff_records(self, stage, records, key=lambda record: record['id']):
+        """前回の出力とのレコード単位の差分（追加・変更・削除されたキー）"""
+        previous = self._stage(stage).get('rows', {})
+        current = {key(record): hash_record(record) for record in records}
+        return {
+            'added': [k for k in current if k not in previous],
+            'changed': [k for k in current if k in previous and previous[k] != current[k]],
+            'removed': [k for k in previous if k not in current],
+        }
+
+    def update(self, stage, fingerprint, sheet_hashes, records, output_files, key=lambda record: record['id'],
+               inputs=None):
+        """変換結果を記録する（fingerprint・inputs は変換前に取った workbook_fingerprint・input_hashes）"""
+        self.data['stages'][stage] = {
+            'workbook': fingerprint,
+            'inputs': dict(inputs or {}),
+            'sheets': dict(sheet_hashes),
+            'rows': {key(record): hash_record(record) for record in records},
+            'outputs': {output_file: file_sha256(output_file) for output_file in output_files},
+        }
+
+    def touch_workbook(self, stage, fingerprint):
+        """シートに変更がなかった場合に、ワークブックの指紋だけを更新する"""
+        if stage not in self.data['stages']:
+            return
+        self.data['stages'][stage]['workbook'] = fingerprint
+
+    def save(self):
+        with open(self.manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f, ensure_ascii=False, indent=2)
+
+
+def log_record_diff(label, diff, logger):
+    """差分の件数と対象キーを INFO レベルでログに出す"""
+    logger.info(f"{label}: 追加 {len(diff['added'])}件, 変更 {len(diff['changed'])}件, 削除 {len(diff['removed'])}件")
+    for kind, mark in (('added', '+'), ('changed', '~'), ('removed', '-')):
+        for record_key in diff[kind]:
+            logger.info(f"  {mark} {record_key}")
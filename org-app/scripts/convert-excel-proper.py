@@ -1,136 +1,287 @@
 #!/usr/bin/env python3
-import pandas as pd
 import json
+import logging
 
-def convert_excel_to_sake_data(excel_file_path, sheet_name="お酒データ"):
-    try:
-        # Excelファイルを読み込み（ヘッダーを手動で処理）
-        df = pd.read_excel(excel_file_path, sheet_name=sheet_name, header=None)
-        
-        # データ構造:
-        # 行1: ヘッダー - ['カテゴリー', '日本酒度', '酸度', '度数', '４タイプ分類', '価格帯', '価格']
-        # 行2以降: データ - ['〇〇正宗', '純米酒', -2, 1, 12, 'A', 'M', 1500]
-        
-        sake_data = []
-        
-        # 行2から行4までのデータを処理（index 2, 3, 4）
-        for i in range(2, min(len(df), 5)):
-            row = df.iloc[i]
-            
-            # 基本データの抽出
-            name = str(row[1])  # 銘柄名
-            category = str(row[2])  # カテゴリー
-            nihonshu_do = float(row[3]) if pd.notna(row[3]) else 0  # 日本酒度
-            acidity = float(row[4]) if pd.notna(row[4]) else 1  # 酸度
-            alcohol = float(row[5]) if pd.notna(row[5]) else 15  # 度数
-            type_class = str(row[6]) if pd.notna(row[6]) else 'A'  # 4タイプ分類
-            price_range = str(row[7]) if pd.notna(row[7]) else 'M'  # 価格帯
-            price = int(row[8]) if pd.notna(row[8]) else 3000  # 価格
-            
-            # 正しい辛口・甘口判定を適用した甘辛度計算
-            # 辛口：日本酒度+1以上 AND 酸度1.1以上
-            # 甘口：日本酒度-1以下
-            if nihonshu_do >= 1.0 and acidity >= 1.1:
-                # 辛口：1-4の範囲
-                sweetness = max(1, min(4, 3 - (nihonshu_do / 5)))
-            elif nihonshu_do <= -1.0:
-                # 甘口：7-10の範囲
-                sweetness = max(7, min(10, 8.5 + (abs(nihonshu_do) / 4)))
-            else:
-                # 中口：4-7の範囲（辛口にも甘口にも当てはまらない場合）
-                sweetness = max(4, min(7, 5.5 - (nihonshu_do / 6)))
-            
-            # 酸度からさっぱり度を計算
-            acidity_score = max(1, min(10, acidity * 3))
-            
-            # 度数からコク（richness）を推定
-            richness = max(1, min(10, (alcohol - 10) / 2 + 5))
-            
-            # 香りは種類から推定
-            if '吟醸' in category or '大吟醸' in category:
-                aroma = 8
-            elif '純米' in category:
-                aroma = 6
+from conversion_manifest import ConversionManifest, hash_rows, input_hashes, log_record_diff, workbook_fingerprint
+from columnar_format import write_columnar_outputs
+from matrix_validation import check_before_conversion
+from name_dictionary import get_name_dictionary, resolve_dictionary_file
+from output_writers import write_json_array, write_text_if_changed
+from run_instrumentation import count, get_logger, instrumented_run, parse_instrumentation_args, stage
+from script_loader import load_script
+from records import SakeRecord
+from sake_scoring import build_sake_items_vectorized, build_sake_records_vectorized, rows_to_frame
+from sweetness_table import TABLE_FILE, get_sweetness_table
+from workbook_loader import DEFAULT_EXCEL_FILE, cell_has_value, get_workbook
+
+logger = get_logger('convert-excel-proper')
+
+# データ構造:
+# 行1: ヘッダー - ['カテゴリー', '日本酒度', '酸度', '度数', '４タイプ分類', '価格帯', '価格']
+# 行2以降: データ - ['〇〇正宗', '純米酒', -2, 1, 12, 'A', 'M', 1500]
+SAKE_DATA_START_ROW = 2
+SAKE_COLUMN_COUNT = 9
+
+SAKE_OUTPUT_FILE = "/workspaces/org-app/org-app/lib/data/sake-data-excel.json"
+
+def build_sake_item(i, row):
+    """シートの1行（行番号 i）からSakeProfile形式のデータを作成"""
+    # 基本データの抽出
+    name = str(row[1])  # 銘柄名
+    category = str(row[2])  # カテゴリー
+    nihonshu_do = float(row[3]) if cell_has_value(row[3]) else 0  # 日本酒度
+    acidity = float(row[4]) if cell_has_value(row[4]) else 1  # 酸度
+    alcohol = float(row[5]) if cell_has_value(row[5]) else 15  # 度数
+    type_class = str(row[6]) if cell_has_value(row[6]) else 'A'  # 4タイプ分類
+    price_range = str(row[7]) if cell_has_value(row[7]) else 'M'  # 価格帯
+    price = int(row[8]) if cell_has_value(row[8]) else 3000  # 価格
+
+    # 辛口・甘口の判定はサイトと同じ辛甘判定表（lib/data/sweetness-table.json）を引く
+    taste_category = get_sweetness_table().judge(nihonshu_do, acidity)['category']
+    if taste_category == 'karakuchi':
+        # 辛口：1-4の範囲
+        sweetness = max(1, min(4, 3 - (nihonshu_do / 5)))
+    elif taste_category == 'amakuchi':
+        # 甘口：7-10の範囲
+        sweetness = max(7, min(10, 8.5 + (abs(nihonshu_do) / 4)))
+    else:
+        # 中口：4-7の範囲（辛口にも甘口にも当てはまらない場合）
+        sweetness = max(4, min(7, 5.5 - (nihonshu_do / 6)))
+
+    # 酸度からさっぱり度を計算
+    acidity_score = max(1, min(10, acidity * 3))
+
+    # 度数からコク（richness）を推定
+    richness = max(1, min(10, (alcohol - 10) / 2 + 5))
+
+    # 香りは種類から推定
+    if '吟醸' in category or '大吟醸' in category:
+        aroma = 8
+    elif '純米' in category:
+        aroma = 6
+    else:
+        aroma = 4
+
+    # 都道府県・酒蔵名を銘柄名から推定（名前辞書 lib/data/sake-name-dictionary.csv を使う）
+    prefecture, brewery = get_name_dictionary().resolve(name)
+
+    # TypeScriptの型に合わせたデータ構造を作成
+    sake_item = {
+        "id": f"sake{i-1:03d}",
+        "name": name,
+        "brewery": brewery,
+        "price": price,
+        "alcoholContent": alcohol,
+        "riceMilling": 55 if '吟醸' in category else 70,  # 推定値
+        "sweetness": round(sweetness, 1),
+        "richness": round(richness, 1),
+        "acidity": round(acidity_score, 1),
+        "aroma": aroma,
+        "type": category,
+        "prefecture": prefecture,
+        "description": f"{category}の特徴を活かした、{type_class}タイプの日本酒です。",
+        "ecUrl": f"https://example-ec.com/sake{i-1:03d}",
+        "tags": []
+    }
+
+    # タグの設定（辛口・甘口は甘辛度と同じ判定）
+    if taste_category == 'karakuchi':
+        sake_item["tags"].append("辛口")
+    elif taste_category == 'amakuchi':
+        sake_item["tags"].append("甘口")
+
+    if price < 1500:
+        sake_item["tags"].append("コスパ良")
+    elif price > 2500:
+        sake_item["tags"].append("高級")
+
+    if '吟醸' in category:
+        sake_item["tags"].append("フルーティー")
+        sake_item["tags"].append("華やか")
+
+    if not sake_item["tags"]:
+        sake_item["tags"].append("おすすめ")
+
+    return sake_item
+
+def iter_sake_data(excel_file_path, sheet_name="お酒データ", chunk_size=1000, vectorized=False, records=False):
+    """全データ行を順に変換して1件ずつ返す（メモリ使用量は行数に依存しない）
+
+    vectorized=True の場合はチャンクごとに sake_scoring の列単位計算を使う。
+    records=True の場合は dict ではなく records.SakeRecord を返す。
+    """
+    workbook = get_workbook(excel_file_path)
+    i = SAKE_DATA_START_ROW
+    for chunk in workbook.iter_row_chunks(sheet_name, min_row=SAKE_DATA_START_ROW, chunk_size=chunk_size):
+        with stage('row_transform'):
+            if vectorized:
+                build = build_sake_records_vectorized if records else build_sake_items_vectorized
+                sake_items = build(rows_to_frame(chunk), i)
             else:
-                aroma = 4
-            
-            # 都道府県を銘柄名から推定（簡易版）
-            prefecture_map = {
-                '正宗': '新潟県',
-                '錦': '京都府', 
-                '男山': '北海道'
-            }
-            prefecture = '未設定'
-            for key, value in prefecture_map.items():
-                if key in name:
-                    prefecture = value
-                    break
-            
-            # 酒蔵名を生成
-            brewery = name.replace('〇〇', '').replace('××', '').replace('△△', '') + '酒造'
-            
-            # TypeScriptの型に合わせたデータ構造を作成
-            sake_item = {
-                "id": f"sake{i-1:03d}",
-                "name": name,
-                "brewery": brewery,
-                "price": price,
-                "alcoholContent": alcohol,
-                "riceMilling": 55 if '吟醸' in category else 70,  # 推定値
-                "sweetness": round(sweetness, 1),
-                "richness": round(richness, 1),
-                "acidity": round(acidity_score, 1),
-                "aroma": aroma,
-                "type": category,
-                "prefecture": prefecture,
-                "description": f"{category}の特徴を活かした、{type_class}タイプの日本酒です。",
-                "ecUrl": f"https://example-ec.com/sake{i-1:03d}",
-                "tags": []
-            }
-            
-            # タグの設定（正しい辛口・甘口判定を適用）
-            if nihonshu_do >= 1.0 and acidity >= 1.1:
-                sake_item["tags"].append("辛口")
-            elif nihonshu_do <= -1.0:
-                sake_item["tags"].append("甘口")
-            
-            if price < 1500:
-                sake_item["tags"].append("コスパ良")
-            elif price > 2500:
-                sake_item["tags"].append("高級")
-                
-            if '吟醸' in category:
-                sake_item["tags"].append("フルーティー")
-                sake_item["tags"].append("華やか")
-            
-            if not sake_item["tags"]:
-                sake_item["tags"].append("おすすめ")
-            
-            sake_data.append(sake_item)
+                sake_items = []
+                for offset, row in enumerate(chunk):
+                    row = tuple(row) + (None,) * (SAKE_COLUMN_COUNT - len(row))
+                    # 銘柄名のない行（末尾の空行など）は読み飛ばす
+                    if cell_has_value(row[1]) and str(row[1]).strip():
+                        sake_item = build_sake_item(i + offset, row)
+                        sake_items.append(SakeRecord.from_dict(sake_item) if records else sake_item)
+        i += len(chunk)
+        count('sake_records', len(sake_items))
+        yield from sake_items
+
+def convert_excel_to_sake_data(excel_file_path, sheet_name="お酒データ", vectorized=False, records=False):
+    """お酒データシートを変換する（records=True の場合は records.SakeRecord のリスト）"""
+    try:
+        # シートは実行中キャッシュされ、全データ行を処理する
+        # （読み取り専用モードではシート全体のDataFrameを作らず、iter_sake_data でチャンクごとに変換する）
+        workbook = get_workbook(excel_file_path)
+        if vectorized and not workbook.read_only:
+            df = workbook.read_sheet(sheet_name)
+            build = build_sake_records_vectorized if records else build_sake_items_vectorized
+            with stage('row_transform'):
+                sake_data = build(df.iloc[SAKE_DATA_START_ROW:], SAKE_DATA_START_ROW)
+            count('sake_records', len(sake_data))
+            return sake_data
+        return list(iter_sake_data(excel_file_path, sheet_name, vectorized=vectorized, records=records))
         
-        return sake_data
+    except Exception as e:
+        logger.error(f"エラーが発生しました: {e}")
+        return None
+
+def stream_sake_data(excel_file_path, output_file, sheet_name="お酒データ", vectorized=False):
+    """読み取り専用モードでシートを逐次読み込み、変換したデータをそのまま書き出す"""
+    get_workbook(excel_file_path, read_only=True)
+    try:
+        # 逐次書き出しでは変換と書き出しが交互に行われる（読み込み・変換の時間はそれぞれの段階に入る）
+        with stage('file_write'):
+            return write_json_array(iter_sake_data(excel_file_path, sheet_name, vectorized=vectorized, records=True),
+                                    output_file)
         
     except Exception as e:
-        print(f"エラーが発生しました: {e}")
+        logger.error(f"エラーが発生しました: {e}")
         return None
 
-if __name__ == "__main__":
-    excel_file = "/workspaces/org-app/お酒とお料理相性マトリックス.xlsx"
+def write_similar_sakes(sake_data):
+    """変換したお酒データから類似酒の表（lib/data/similar-sakes.json）も作る"""
+    load_script('build-similar-sakes').write_similar_sakes(sake_data)
+
+def conversion_inputs():
+    """お酒データの変換に使う入力ファイル（名前辞書・辛甘判定表）の内容ハッシュ"""
+    return input_hashes([resolve_dictionary_file(), TABLE_FILE])
+
+def convert_incremental(excel_file, output_file, sheet_name="お酒データ", vectorized=False, show_diff=False, validate=True,
+                        similar=False):
+    """前回の変換から変更がある場合だけ変換し、内容が変わった出力だけを書き換える"""
+    stage_name = 'sake'
+    manifest = ConversionManifest()
+    # 名前辞書・辛甘判定表が変わった場合は、ワークブックに変更がなくても変換し直す
+    inputs = conversion_inputs()
+    inputs_unchanged = manifest.inputs_unchanged(stage_name, inputs)
+    
+    if (inputs_unchanged and manifest.workbook_unchanged(stage_name, excel_file)
+            and manifest.outputs_intact(stage_name, [output_file])):
+        logger.info("変更なし: ワークブックは前回の変換から更新されていません")
+        return
+    
+    # 変換中にワークブックが保存された場合に備え、指紋は読み込む前に取る
+    fingerprint = workbook_fingerprint(excel_file)
+    if validate and not check_before_conversion(excel_file, [sheet_name], logger):
+        return
+    
+    with stage('change_detection'):
+        sheet_hash = hash_rows(get_workbook(excel_file).iter_rows(sheet_name))
+    if (inputs_unchanged and manifest.sheet_unchanged(stage_name, sheet_name, sheet_hash)
+            and manifest.outputs_intact(stage_name, [output_file])):
+        manifest.touch_workbook(stage_name, fingerprint)
+        manifest.save()
+        logger.info(f"変更なし: {sheet_name}シートは前回の変換から更新されていません")
+        return
+    
+    sake_data = convert_excel_to_sake_data(excel_file, sheet_name, vectorized=vectorized)
+    if sake_data is None:
+        logger.error("データの変換に失敗しました")
+        return
     
-    # データ変換実行
-    sake_data = convert_excel_to_sake_data(excel_file)
+    diff = manifest.diff_records(stage_name, sake_data)
+    with stage('serialization'):
+        content = json.dumps(sake_data, ensure_ascii=False, indent=2)
+    with stage('file_write'):
+        changed = write_text_if_changed(output_file, content)
+    if changed:
+        logger.info(f"変換完了! {len(sake_data)}件のデータを {output_file} に保存しました")
+    else:
+        logger.info(f"出力内容に変更はありません: {output_file}")
+    
+    if show_diff:
+        log_record_diff("お酒データ", diff, logger)
+    
+    if similar and changed:
+        write_similar_sakes(sake_data)
+    
+    manifest.update(stage_name, fingerprint, {sheet_name: sheet_hash}, sake_data, [output_file], inputs=inputs)
+    manifest.save()
+
+def main(excel_file=DEFAULT_EXCEL_FILE, stream=False, vectorized=False, incremental=False, show_diff=False, columnar=False,
+         validate=True, similar=False):
+    output_file = SAKE_OUTPUT_FILE
+    
+    if incremental:
+        convert_incremental(excel_file, output_file, vectorized=vectorized, show_diff=show_diff, validate=validate,
+                            similar=similar)
+        return
     
-    if sake_data:
-        # JSONファイルに出力
-        output_file = "/workspaces/org-app/org-app/lib/data/sake-data-excel.json"
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(sake_data, f, ensure_ascii=False, indent=2)
+    # 空欄・範囲外の値・4タイプ分類などを変換前にまとめて検証する（--no-validate で省略）
+    if stream:
+        # 逐次書き出しでは検証も読み取り専用モードで行う
+        get_workbook(excel_file, read_only=True)
+    if validate and not check_before_conversion(excel_file, ["お酒データ"], logger):
+        return
+    
+    if stream:
+        written = stream_sake_data(excel_file, output_file, vectorized=vectorized)
+        if written is None:
+            logger.error("データの変換に失敗しました")
+        else:
+            logger.info(f"変換完了! {written}件のデータを {output_file} に保存しました")
+        if similar:
+            # 逐次書き出しでは全件を保持しないため、類似酒の表は build-similar-sakes.py で別に作る
+            logger.warning("--stream では類似酒の表を作成しません（build-similar-sakes.py を実行してください）")
+        return
+    
+    # データ変換実行（全件を保持するため、1件ずつの dict ではなく省メモリな SakeRecord で持つ）
+    sake_data = convert_excel_to_sake_data(excel_file, vectorized=vectorized, records=True)
+    
+    if sake_data and columnar:
+        # 列指向形式（JSON + バイナリ）で出力
+        with stage('file_write'):
+            json_path, binary_path = write_columnar_outputs(sake_data, 'sake', output_file)
+        logger.info(f"変換完了! {len(sake_data)}件のデータを {json_path} と {binary_path} に保存しました")
+    elif sake_data:
+        # JSONファイルに出力（全体を1つの文字列にせず、1件ずつ整形して書き出す）
+        with stage('serialization'):
+            write_json_array(sake_data, output_file)
         
-        print(f"変換完了! {len(sake_data)}件のデータを {output_file} に保存しました")
+        logger.info(f"変換完了! {len(sake_data)}件のデータを {output_file} に保存しました")
         
-        # 全データを表示
-        for i, sake in enumerate(sake_data):
-            print(f"\n=== 日本酒 {i+1} ===")
-            print(json.dumps(sake, ensure_ascii=False, indent=2))
+        # 全データの表示は DEBUG レベルの場合だけ（無効なら整形もしない）
+        if logger.isEnabledFor(logging.DEBUG):
+            for i, sake in enumerate(sake_data):
+                logger.debug(f"=== 日本酒 {i+1} ===")
+                logger.debug(sake.to_json())
     else:
-        print("データの変換に失敗しました")
\ No newline at end of file
+        logger.error("データの変換に失敗しました")
+    
+    # 味わいの近いお酒の表（--similar の場合）
+    if sake_data and similar:
+        write_similar_sakes(sake_data)
+
+if __name__ == "__main__":
+    import sys
+    # --log-level / --verbose / --profile / --trace-memory / --report FILE は run_instrumentation を参照
+    argv, instrumentation_options = parse_instrumentation_args(sys.argv[1:])
+    # 入力は .xlsx のほか、CSVファイルやCSVを置いたディレクトリ（lib/data/）も指定できる
+    args = [arg for arg in argv if not arg.startswith('--')]
+    with instrumented_run('convert-excel-proper', **instrumentation_options):
+        main(args[0] if args else DEFAULT_EXCEL_FILE, stream='--stream' in argv, vectorized='--vectorized' in argv,
+             incremental='--incremental' in argv, show_diff='--diff' in argv,
+             columnar='--columnar' in argv, validate='--no-validate' not in argv, similar='--similar' in argv)
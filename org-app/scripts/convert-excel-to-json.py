@@ -1,145 +1,209 @@
 #!/usr/bin/env python3
-import pandas as pd
 import json
+import logging
 import sys
 import os
 
+import numpy as np
+
+from run_instrumentation import count, get_logger, instrumented_run, parse_instrumentation_args, stage
+from workbook_loader import DEFAULT_EXCEL_FILE, get_workbook
+
+logger = get_logger('convert-excel-to-json')
+
+# 列名の候補（この順に探し、最初に見つかった列を銘柄名として使う）
+NAME_COLUMN_CANDIDATES = ['名前', '銘柄', '商品名', 'name', 'Name', '日本酒名']
+
+# 数値項目: 項目名 → (セル値の変換関数, 変換できない場合のデフォルト値, 整数か)
+NUMERIC_FIELDS = {
+    'price': (lambda v: int(float(str(v).replace('¥', '').replace(',', ''))), 3000, True),
+    'alcoholContent': (lambda v: float(str(v).replace('%', '')), 15.0, False),
+    'riceMilling': (lambda v: int(float(str(v).replace('%', ''))), 60, True),
+    'sweetness': (lambda v: int(float(v)), 5, True),
+    'richness': (lambda v: int(float(v)), 5, True),
+    'aroma': (lambda v: int(float(v)), 5, True),
+    'acidity': (lambda v: int(float(v)), 5, True),
+}
+
+def resolve_column_role(col):
+    """列名から項目名を判定（該当しない列は None）"""
+    col_lower = str(col).lower()
+    if '価格' in str(col) or 'price' in col_lower:
+        return 'price'
+    elif '酒蔵' in str(col) or 'brewery' in col_lower or '蔵元' in str(col):
+        return 'brewery'
+    elif 'アルコール' in str(col) or 'alcohol' in col_lower:
+        return 'alcoholContent'
+    elif '精米' in str(col) or 'milling' in col_lower:
+        return 'riceMilling'
+    elif '甘' in str(col) or 'sweet' in col_lower:
+        return 'sweetness'
+    elif 'コク' in str(col) or 'rich' in col_lower or '濃' in str(col):
+        return 'richness'
+    elif '香り' in str(col) or 'aroma' in col_lower:
+        return 'aroma'
+    elif '酸' in str(col) or 'acid' in col_lower:
+        return 'acidity'
+    elif '種類' in str(col) or 'type' in col_lower or '分類' in str(col):
+        return 'type'
+    elif '都道府県' in str(col) or '県' in str(col) or 'prefecture' in col_lower:
+        return 'prefecture'
+    elif '説明' in str(col) or 'description' in col_lower or '特徴' in str(col):
+        return 'description'
+    return None
+
+def resolve_sheet_schema(columns):
+    """シートの列構成を1度だけ解析する
+
+    戻り値は (銘柄名の列, [(項目名, 値を取る列), ...])。
+    同じ項目に複数の列が該当する場合は後の列の値が使われるが、
+    項目の並び順は最初に該当した列の位置で決まる。
+    """
+    name_col = next((col for col in NAME_COLUMN_CANDIDATES if col in columns), None)
+    
+    field_columns = {}
+    for col in columns:
+        role = resolve_column_role(col)
+        if role:
+            field_columns[role] = col
+    return name_col, list(field_columns.items())
+
+def _parse_cell(parse, value, default):
+    try:
+        return parse(value)
+    except (TypeError, ValueError, OverflowError):
+        return default
+
+def coerce_numeric_column(raw_values, values, field):
+    """数値項目の列をまとめて変換する
+
+    元の列が数値型ならNumPyで一括変換し、それ以外は同じ値を1度だけ解析する。
+    """
+    parse, default, as_int = NUMERIC_FIELDS[field]
+    
+    if raw_values.dtype.kind in 'iuf':
+        numbers = raw_values.astype(float)
+        if as_int:
+            valid = np.isfinite(numbers) & (np.abs(numbers) < 2 ** 63)
+            # int64に収まらない値はPythonの int に任せる
+            if np.all(valid | np.isnan(numbers)):
+                result = np.full(len(numbers), default, dtype=object)
+                result[valid] = np.trunc(numbers[valid]).astype(np.int64).tolist()
+                return result.tolist()
+        else:
+            return np.where(np.isnan(numbers), default, numbers).tolist()
+    
+    parsed = {}
+    result = []
+    for value in values:
+        key = (type(value), value)
+        if key not in parsed:
+            parsed[key] = _parse_cell(parse, value, default)
+        result.append(parsed[key])
+    return result
+
 def convert_excel_to_json(excel_file_path, sheet_name="お酒データ"):
     try:
         # Excelファイルを読み込み
-        df = pd.read_excel(excel_file_path, sheet_name=sheet_name)
-        
-        # データフレームの情報を表示
-        print(f"シート '{sheet_name}' を読み込みました")
-        print(f"行数: {len(df)}, 列数: {len(df.columns)}")
-        print(f"列名: {list(df.columns)}")
-        print("\n最初の5行:")
-        print(df.head())
-        
-        # NaN値を適切な値に置き換え
-        df = df.fillna("")
-        
-        # データフレームをJSON形式に変換
-        sake_data = []
+        df = get_workbook(excel_file_path).read_sheet(sheet_name, header=0)
         
-        for index, row in df.iterrows():
-            # カラム名の対応付け（実際のExcelの列名に合わせて調整が必要）
-            sake_item = {}
-            
-            # 基本的な列名パターンを試す
-            possible_names = ['名前', '銘柄', '商品名', 'name', 'Name', '日本酒名']
-            name_col = None
-            for col in possible_names:
-                if col in df.columns:
-                    name_col = col
-                    break
-            
-            if name_col:
-                sake_item['name'] = str(row[name_col])
-            else:
-                sake_item['name'] = f"日本酒_{index + 1}"
-            
-            # 他の基本情報を試行錯誤で取得
-            # 実際のExcelファイルの構造に合わせて調整します
-            for col in df.columns:
-                col_lower = str(col).lower()
-                if '価格' in str(col) or 'price' in col_lower:
-                    try:
-                        sake_item['price'] = int(float(str(row[col]).replace('¥', '').replace(',', '')))
-                    except:
-                        sake_item['price'] = 3000  # デフォルト値
-                elif '酒蔵' in str(col) or 'brewery' in col_lower or '蔵元' in str(col):
-                    sake_item['brewery'] = str(row[col])
-                elif 'アルコール' in str(col) or 'alcohol' in col_lower:
-                    try:
-                        sake_item['alcoholContent'] = float(str(row[col]).replace('%', ''))
-                    except:
-                        sake_item['alcoholContent'] = 15.0
-                elif '精米' in str(col) or 'milling' in col_lower:
-                    try:
-                        sake_item['riceMilling'] = int(float(str(row[col]).replace('%', '')))
-                    except:
-                        sake_item['riceMilling'] = 60
-                elif '甘' in str(col) or 'sweet' in col_lower:
-                    try:
-                        sake_item['sweetness'] = int(float(row[col]))
-                    except:
-                        sake_item['sweetness'] = 5
-                elif 'コク' in str(col) or 'rich' in col_lower or '濃' in str(col):
-                    try:
-                        sake_item['richness'] = int(float(row[col]))
-                    except:
-                        sake_item['richness'] = 5
-                elif '香り' in str(col) or 'aroma' in col_lower:
-                    try:
-                        sake_item['aroma'] = int(float(row[col]))
-                    except:
-                        sake_item['aroma'] = 5
-                elif '酸' in str(col) or 'acid' in col_lower:
-                    try:
-                        sake_item['acidity'] = int(float(row[col]))
-                    except:
-                        sake_item['acidity'] = 5
-                elif '種類' in str(col) or 'type' in col_lower or '分類' in str(col):
-                    sake_item['type'] = str(row[col])
-                elif '都道府県' in str(col) or '県' in str(col) or 'prefecture' in col_lower:
-                    sake_item['prefecture'] = str(row[col])
-                elif '説明' in str(col) or 'description' in col_lower or '特徴' in str(col):
-                    sake_item['description'] = str(row[col])
-            
-            # デフォルト値の設定
-            sake_item.setdefault('id', f'sake{index + 1:03d}')
-            sake_item.setdefault('brewery', '未設定')
-            sake_item.setdefault('price', 3000)
-            sake_item.setdefault('alcoholContent', 15.0)
-            sake_item.setdefault('riceMilling', 60)
-            sake_item.setdefault('sweetness', 5)
-            sake_item.setdefault('richness', 5)
-            sake_item.setdefault('acidity', 5)
-            sake_item.setdefault('aroma', 5)
-            sake_item.setdefault('type', '純米')
-            sake_item.setdefault('prefecture', '未設定')
-            sake_item.setdefault('description', '美味しい日本酒です。')
-            sake_item.setdefault('ecUrl', f'https://example-ec.com/{sake_item["id"]}')
-            sake_item.setdefault('tags', ['おすすめ'])
-            
-            # 空の名前をスキップ
-            if sake_item['name'] and sake_item['name'] != 'nan':
-                sake_data.append(sake_item)
+        # データフレームの情報を表示（先頭行の表示は DEBUG レベルの場合だけ）
+        logger.info(f"シート '{sheet_name}' を読み込みました")
+        logger.info(f"行数: {len(df)}, 列数: {len(df.columns)}")
+        logger.info(f"列名: {list(df.columns)}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("最初の5行:")
+            logger.debug(df.head())
         
+        with stage('row_transform'):
+            sake_data = _build_sake_items(df)
+        count('sake_records', len(sake_data))
         return sake_data
         
     except Exception as e:
-        print(f"エラーが発生しました: {e}")
+        logger.error(f"エラーが発生しました: {e}")
         return None
 
-if __name__ == "__main__":
-    excel_file = "/workspaces/org-app/お酒とお料理相性マトリックス.xlsx"
+def _build_sake_items(df):
+    """読み込んだシートの各行をお酒データに変換"""
+    # 列名の対応付けはシートごとに1度だけ行う
+    name_col, field_columns = resolve_sheet_schema(df.columns)
+    
+    # NaN値を適切な値に置き換え（iterrows と同じく全列共通の型の配列として扱う）
+    values = df.fillna("").to_numpy()
+    column_positions = {col: pos for pos, col in enumerate(df.columns)}
+    
+    # 列ごとに値をまとめて変換
+    columns = []
+    for field, col in field_columns:
+        cells = values[:, column_positions[col]]
+        if field in NUMERIC_FIELDS:
+            columns.append((field, coerce_numeric_column(df[col].to_numpy(), cells, field)))
+        else:
+            columns.append((field, [str(value) for value in cells]))
     
+    if name_col is not None:
+        names = [str(value) for value in values[:, column_positions[name_col]]]
+    else:
+        names = [f"日本酒_{index + 1}" for index in df.index]
+    
+    # データフレームをJSON形式に変換
+    sake_data = []
+    
+    for pos, index in enumerate(df.index):
+        # 空の名前をスキップ
+        if not names[pos] or names[pos] == 'nan':
+            continue
+        
+        sake_item = {'name': names[pos]}
+        for field, column_values in columns:
+            sake_item[field] = column_values[pos]
+        
+        # デフォルト値の設定
+        sake_item.setdefault('id', f'sake{index + 1:03d}')
+        sake_item.setdefault('brewery', '未設定')
+        sake_item.setdefault('price', 3000)
+        sake_item.setdefault('alcoholContent', 15.0)
+        sake_item.setdefault('riceMilling', 60)
+        sake_item.setdefault('sweetness', 5)
+        sake_item.setdefault('richness', 5)
+        sake_item.setdefault('acidity', 5)
+        sake_item.setdefault('aroma', 5)
+        sake_item.setdefault('type', '純米')
+        sake_item.setdefault('prefecture', '未設定')
+        sake_item.setdefault('description', '美味しい日本酒です。')
+        sake_item.setdefault('ecUrl', f'https://example-ec.com/{sake_item["id"]}')
+        sake_item.setdefault('tags', ['おすすめ'])
+        
+        sake_data.append(sake_item)
+    
+    return sake_data
+
+def main(excel_file=DEFAULT_EXCEL_FILE):
     if not os.path.exists(excel_file):
-        print(f"ファイルが見つかりません: {excel_file}")
+        logger.error(f"ファイルが見つかりません: {excel_file}")
         sys.exit(1)
     
     # シート名を確認
     try:
-        xl_file = pd.ExcelFile(excel_file)
-        print(f"利用可能なシート名: {xl_file.sheet_names}")
+        workbook = get_workbook(excel_file)
+        logger.info(f"利用可能なシート名: {workbook.sheet_names}")
         
         # 'お酒データ'シートがあるかチェック
         target_sheet = "お酒データ"
-        if target_sheet not in xl_file.sheet_names:
+        if target_sheet not in workbook.sheet_names:
             # 代替シート名を試す
             possible_sheets = ["お酒データ", "酒データ", "データ", "Sheet1", "data"]
             target_sheet = None
             for sheet in possible_sheets:
-                if sheet in xl_file.sheet_names:
+                if sheet in workbook.sheet_names:
                     target_sheet = sheet
                     break
             
             if not target_sheet:
-                target_sheet = xl_file.sheet_names[0]  # 最初のシートを使用
+                target_sheet = workbook.sheet_names[0]  # 最初のシートを使用
         
-        print(f"使用するシート: {target_sheet}")
+        logger.info(f"使用するシート: {target_sheet}")
         
         # データ変換実行
         sake_data = convert_excel_to_json(excel_file, target_sheet)
@@ -147,17 +211,26 @@ if __name__ == "__main__":
         if sake_data:
             # JSONファイルに出力
             output_file = "/workspaces/org-app/org-app/lib/data/sake-data-from-excel.json"
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(sake_data, f, ensure_ascii=False, indent=2)
+            with stage('serialization'):
+                content = json.dumps(sake_data, ensure_ascii=False, indent=2)
+            with stage('file_write'):
+                with open(output_file, 'w', encoding='utf-8') as f:
+                    f.write(content)
             
-            print(f"\n変換完了! {len(sake_data)}件のデータを {output_file} に保存しました")
+            logger.info(f"変換完了! {len(sake_data)}件のデータを {output_file} に保存しました")
             
             # 最初の1件を表示
             if sake_data:
-                print("\n最初のデータ例:")
-                print(json.dumps(sake_data[0], ensure_ascii=False, indent=2))
+                logger.info("最初のデータ例:")
+                logger.info(json.dumps(sake_data[0], ensure_ascii=False, indent=2))
         else:
-            print("データの変換に失敗しました")
+            logger.error("データの変換に失敗しました")
             
     except Exception as e:
-        print(f"ファイル読み込みエラー: {e}")
\ No newline at end of file
+        logger.error(f"ファイル読み込みエラー: {e}")
+
+if __name__ == "__main__":
+    # --log-level / --verbose / --profile / --trace-memory / --report FILE は run_instrumentation を参照
+    argv, instrumentation_options = parse_instrumentation_args(sys.argv[1:])
+    with instrumented_run('convert-excel-to-json', **instrumentation_options):
+        main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""料理タイプ（和食・中華・洋食）ごとの相性範囲の集計
+
+料理ごとの相性範囲（日本酒度・酸度・度数の下限/上限）から、料理タイプごとに
+- mean: 各下限・上限の平均（料理カテゴリで絞り込むときの範囲）
+- envelope: 全料理の範囲を含む範囲（下限の最小・上限の最大）
+- intersection: 全料理に共通する範囲（下限の最大・上限の最小、どれかの項目が空なら None）
+- type_class1 / type_class2: 4タイプ分類-1・-2を合わせて多い順の上位2つ（同数はA〜D順、出力もA〜D順）
+を料理タイプ番号での group-by（NumPy）でまとめて求める。
+"""
+import numpy as np
+
+RANGE_FIELDS = ['sake_min_level', 'sake_max_level', 'acidity_min', 'acidity_max', 'alcohol_min', 'alcohol_max']
+# (下限, 上限) の組
+RANGE_PAIRS = [('sake_min_level', 'sake_max_level'), ('acidity_min', 'acidity_max'), ('alcohol_min', 'alcohol_max')]
+TYPE_CLASSES = ['A', 'B', 'C', 'D']
+CUISINE_TYPES = ['japanese', 'chinese', 'western']
+# 料理タイプごとの基本のマッチボーナス（料理ごとの追加ボーナスは含まない）
+CUISINE_MATCH_BONUS = {
+    'japanese': 2.0,
+    'chinese': 1.5,
+    'western': 1.8
+}
+# 平均の浮動小数点誤差（11.250000000000002 など）を出力前に丸める桁数
+MEAN_DIGITS = 6
+
+
+def compute_cuisine_aggregates(dishes, cuisine_types=CUISINE_TYPES):
+    """料理一覧（extract-cuisine-data.py の形式）から料理タイプごとの集計を求める
+
+    料理のない料理タイプは結果に含めない。
+    """
+    codes = {cuisine_type: code for code, cuisine_type in enumerate(cuisine_types)}
+    dishes = [dish for dish in dishes if dish['cuisine_type'] in codes]
+    group = np.array([codes[dish['cuisine_type']] for dish in dishes], dtype=np.int64)
+    group_count = len(cuisine_types)
+    counts = np.bincount(group, minlength=group_count)
+
+    # 行: 料理、列: RANGE_FIELDS
+    values = np.array([[dish['compatibility'][field] for field in RANGE_FIELDS] for dish in dishes],
+                      dtype=float).reshape(len(dishes), len(RANGE_FIELDS))
+    sums = np.zeros((group_count, len(RANGE_FIELDS)))
+    np.add.at(sums, group, values)
+    lows = np.full((group_count, len(RANGE_FIELDS)), np.inf)
+    highs = np.full((group_count, len(RANGE_FIELDS)), -np.inf)
+    np.minimum.at(lows, group, values)
+    np.maximum.at(highs, group, values)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = sums / counts[:, None]
+
+    # 4タイプ分類の出現数（-1 と -2 を合わせる）
+    class_codes = {type_class: code for code, type_class in enumerate(TYPE_CLASSES)}
+    class_counts = np.zeros((group_count, len(TYPE_CLASSES)), dtype=np.int64)
+    for key in ('type_class1', 'type_class2'):
+        class_index = np.array([class_codes.get(dish[key], -1) for dish in dishes], dtype=np.int64)
+        known = class_index >= 0
+        np.add.at(class_counts, (group[known], class_index[known]), 1)
+
+    aggregates = {}
+    for code, cuisine_type in enumerate(cuisine_types):
+        if not counts[code]:
+            continue
+        mean = {field: round(value, MEAN_DIGITS) for field, value in zip(RANGE_FIELDS, means[code].tolist())}
+        envelope = {}
+        intersection = {}
+        for position, (low_field, high_field) in enumerate(RANGE_PAIRS):
+            envelope[low_field] = lows[code, 2 * position].item()
+            envelope[high_field] = highs[code, 2 * position + 1].item()
+            intersection[low_field] = highs[code, 2 * position].item()
+            intersection[high_field] = lows[code, 2 * position + 1].item()
+        if any(intersection[low] > intersection[high] for low, high in RANGE_PAIRS):
+            intersection = None
+
+        # 出現数の多い順（同数はA〜D順）に2つ選び、A〜D順に並べる
+        order = np.lexsort((np.arange(len(TYPE_CLASSES)), -class_counts[code]))
+        dominant = sorted(order[:2].tolist())
+        aggregates[cuisine_type] = {
+            'cuisine_type': cuisine_type,
+            'dish_count': int(counts[code]),
+            'mean': mean,
+            'envelope': envelope,
+            'intersection': intersection,
+            'type_class1': TYPE_CLASSES[dominant[0]],
+            'type_class2': TYPE_CLASSES[dominant[1]],
+            'type_class_counts': dict(zip(TYPE_CLASSES, class_counts[code].tolist())),
+            'match_bonus': CUISINE_MATCH_BONUS.get(cuisine_type, 1.0),
+        }
+    return aggregates
+
+
+def cuisine_compatibility_ranges(aggregates):
+    """料理カテゴリでの絞り込みに使う範囲（平均）とマッチボーナス"""
+    return {cuisine_type: dict(aggregate['mean'], match_bonus=aggregate['match_bonus'])
+            for cuisine_type, aggregate in aggregates.items()}
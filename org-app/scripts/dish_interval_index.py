@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""「このお酒に合う料理」を引くための区間インデックス
+
+料理ごとの相性範囲（日本酒度・酸度・度数）を3次元の箱とみなし、軸ごとに
+範囲の端点を並べた基本区間を作る。各基本区間にはその区間を含む料理の集合を
+ビットマスクで持たせておくので、1本のお酒の問い合わせは軸ごとの二分探索と
+ビットマスク3つの論理積だけで済む。
+"""
+import bisect
+import json
+
+import numpy as np
+
+from dish_sake_index import convert_type_class
+
+# (軸名, compatibility の下限キー, 上限キー)
+DIMENSIONS = [
+    ('sakeLevel', 'sake_min_level', 'sake_max_level'),
+    ('acidity', 'acidity_min', 'acidity_max'),
+    ('alcohol', 'alcohol_min', 'alcohol_max'),
+]
+
+MASK_WORD_BITS = 32
+
+
+class _AxisIndex:
+    """1軸分の端点と基本区間ごとの料理ビットマスク
+
+    端点 e0 < e1 < ... < e(m-1) に対して、基本区間を
+    (-inf, e0), [e0], (e0, e1), [e1], ... , [e(m-1)], (e(m-1), inf)
+    の 2m+1 個とし、番号 2i+1 が端点 ei、2i がその手前の開区間を表す。
+    """
+
+    def __init__(self, endpoints, masks):
+        self.endpoints = endpoints
+        self.masks = masks
+
+    @classmethod
+    def build(cls, lower, upper):
+        endpoints = sorted(set(lower) | set(upper))
+        position = {value: i for i, value in enumerate(endpoints)}
+
+        # 料理 d は基本区間 2*pos(下限)+1 から 2*pos(上限)+1 までを覆う
+        starts = [[] for _ in range(2 * len(endpoints) + 2)]
+        ends = [[] for _ in range(2 * len(endpoints) + 2)]
+        for dish, (low, high) in enumerate(zip(lower, upper)):
+            if low > high:
+                continue
+            starts[2 * position[low] + 1].append(dish)
+            ends[2 * position[high] + 2].append(dish)
+
+        masks = []
+        current = 0
+        for segment in range(2 * len(endpoints) + 1):
+            for dish in starts[segment]:
+                current |= 1 << dish
+            for dish in ends[segment]:
+                current &= ~(1 << dish)
+            masks.append(current)
+        return cls(endpoints, masks)
+
+    def segment(self, value):
+        i = bisect.bisect_left(self.endpoints, value)
+        if i < len(self.endpoints) and self.endpoints[i] == value:
+            return 2 * i + 1
+        return 2 * i
+
+    def segments(self, values):
+        """複数の値の基本区間番号をまとめて求める"""
+        endpoints = np.asarray(self.endpoints, dtype=float)
+        values = np.asarray(values, dtype=float)
+        i = np.searchsorted(endpoints, values, side='left')
+        if len(endpoints) == 0:
+            # 料理がない場合、基本区間は (-inf, inf) の1つだけ
+            return 2 * i
+        on_endpoint = (i < len(endpoints)) & (endpoints[np.minimum(i, len(endpoints) - 1)] == values)
+        return 2 * i + on_endpoint
+
+
+def _mask_to_words(mask, word_count):
+    words = []
+    for _ in range(word_count):
+        words.append(mask & 0xFFFFFFFF)
+        mask >>= MASK_WORD_BITS
+    return words
+
+
+def _words_to_mask(words):
+    mask = 0
+    for shift, word in enumerate(words):
+        mask |= word << (MASK_WORD_BITS * shift)
+    return mask
+
+
+class DishIntervalIndex:
+    def __init__(self, dish_ids, axes, type_class_masks):
+        self.dish_ids = dish_ids
+        self.axes = axes
+        self.type_class_masks = type_class_masks
+
+    @classmethod
+    def from_cuisine_data(cls, cuisine_data):
+        """extract_cuisine_matrix_data の結果からインデックスを作る"""
+        dishes = [dish for cuisine_dishes in cuisine_data.values() for dish in cuisine_dishes]
+        axes = {}
+        for name, lower_key, upper_key in DIMENSIONS:
+            axes[name] = _AxisIndex.build(
+                [dish['compatibility'][lower_key] for dish in dishes],
+                [dish['compatibility'][upper_key] for dish in dishes],
+            )
+
+        # 4タイプ分類（薫酒など）ごとに、それを推奨している料理のビットマスク
+        type_class_masks = {}
+        for position, dish in enumerate(dishes):
+            for type_class in (dish['type_class1'], dish['type_class2']):
+                if type_class:
+                    sake_type = convert_type_class(type_class)
+                    type_class_masks[sake_type] = type_class_masks.get(sake_type, 0) | (1 << position)
+
+        return cls([dish['id'] for dish in dishes], axes, type_class_masks)
+
+    def _mask_ids(self, mask):
+        ids = []
+        while mask:
+            lowest = mask & -mask
+            ids.append(self.dish_ids[lowest.bit_length() - 1])
+            mask ^= lowest
+        return ids
+
+    def query_mask(self, nihonshu_do, acidity, alcohol, sake_type=None):
+        mask = (self.axes['sakeLevel'].masks[self.axes['sakeLevel'].segment(nihonshu_do)]
+                & self.axes['acidity'].masks[self.axes['acidity'].segment(acidity)]
+                & self.axes['alcohol'].masks[self.axes['alcohol'].segment(alcohol)])
+        if sake_type is not None:
+            mask |= self.type_class_masks.get(sake_type, 0)
+        return mask
+
+    def query(self, nihonshu_do, acidity, alcohol, sake_type=None):
+        """お酒1本に合う料理IDの一覧（料理データの順）
+
+        sake_type（4タイプ分類名）を渡すと、推奨タイプが一致する料理も含める
+        （isWithinMatrixCompatibilityRange と同じOR条件）。
+        """
+        return self._mask_ids(self.query_mask(nihonshu_do, acidity, alcohol, sake_type))
+
+    def query_batch(self, sakes, use_type_class=False):
+        """カタログ全体（load_sake_matching_columns の結果）→ お酒IDごとの料理ID一覧
+
+        基本区間の組み合わせが同じお酒は結果も同じなので、1度だけ計算する。
+        """
+        keys = np.stack([
+            self.axes['sakeLevel'].segments(sakes['nihonshu_do']),
+            self.axes['acidity'].segments(sakes['acidity']),
+            self.axes['alcohol'].segments(sakes['alcohol']),
+        ], axis=1).tolist()
+        sake_types = sakes['sake_type'] if use_type_class else [None] * len(keys)
+
+        cache = {}
+        table = {}
+        for sake_id, (level_segment, acidity_segment, alcohol_segment), sake_type in zip(sakes['ids'], keys, sake_types):
+            key = (level_segment, acidity_segment, alcohol_segment, sake_type)
+            if key not in cache:
+                mask = (self.axes['sakeLevel'].masks[level_segment]
+                        & self.axes['acidity'].masks[acidity_segment]
+                        & self.axes['alcohol'].masks[alcohol_segment])
+                if sake_type is not None:
+                    mask |= self.type_class_masks.get(sake_type, 0)
+                cache[key] = self._mask_ids(mask)
+            table[sake_id] = cache[key]
+        return table
+
+    def to_dict(self):
+        """フロントエンド向けの形式（ビットマスクは32bit整数の配列）"""
+        word_count = max(1, (len(self.dish_ids) + MASK_WORD_BITS - 1) // MASK_WORD_BITS)
+        return {
+            'dishIds': self.dish_ids,
+            'maskWords': word_count,
+            'axes': {
+                name: {
+                    'endpoints': axis.endpoints,
+                    'masks': [_mask_to_words(mask, word_count) for mask in axis.masks],
+                }
+                for name, axis in self.axes.items()
+            },
+            'typeClassMasks': {
+                sake_type: _mask_to_words(mask, word_count)
+                for sake_type, mask in self.type_class_masks.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        axes = {
+            name: _AxisIndex(axis['endpoints'], [_words_to_mask(words) for words in axis['masks']])
+            for name, axis in data['axes'].items()
+        }
+        type_class_masks = {
+            sake_type: _words_to_mask(words) for sake_type, words in data['typeClassMasks'].items()
+        }
+        return cls(data['dishIds'], axes, type_class_masks)
+
+    def dumps(self):
+        return json.dumps(self.to_dict(), ensure_ascii=False, separators=(',', ':')) + '\n'
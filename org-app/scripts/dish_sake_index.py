@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""料理 → 候補のお酒 の事前計算インデックス
+
+sake-recommender.ts の isWithinMatrixCompatibilityRange と同じ条件
+（4タイプ分類の一致 または 日本酒度・酸度・度数がすべて範囲内）で
+料理ごとに候補のお酒を絞り込み、calculateMatrixCompatibilityScore と同じ
+マトリックス適合度スコアの高い順に並べて出力する。
+"""
+import json
+
+import numpy as np
+
+from sake_scoring import numeric_column, sake_id, select_named_rows
+from workbook_loader import get_workbook
+
+SAKE_SHEET_NAME = "お酒データ"
+SAKE_DATA_START_ROW = 2
+
+TYPE_CLASS_NAMES = {
+    'A': '薫酒',
+    'B': '爽酒',
+    'C': '醇酒',
+    'D': '熟酒'
+}
+
+# 適合フラグ（ビット）
+FLAG_TYPE_CLASS = 1
+FLAG_SAKE_LEVEL = 2
+FLAG_ACIDITY = 4
+FLAG_ALCOHOL = 8
+
+
+def convert_type_class(type_class):
+    """typeClassコード(A,B,C,D)を4タイプ分類名に変換（convertTypeClassToSakeType と同じ）"""
+    return TYPE_CLASS_NAMES.get(type_class, type_class)
+
+
+def load_sake_matching_columns(excel_file_path, sheet_name=SAKE_SHEET_NAME):
+    """お酒シートから相性判定に使う生の値（日本酒度・酸度・度数・4タイプ分類）を取り出す
+
+    欠損値の扱いとIDは convert-excel-proper.py と同じ。
+    """
+    df = get_workbook(excel_file_path).read_sheet(sheet_name)
+    frame, row_numbers = select_named_rows(df.iloc[SAKE_DATA_START_ROW:], SAKE_DATA_START_ROW)
+    type_class = frame[6].where(frame[6].notna(), 'A').map(str)
+    return {
+        'ids': [sake_id(i) for i in row_numbers.tolist()],
+        'nihonshu_do': numeric_column(frame, 3, 0)[0],
+        'acidity': numeric_column(frame, 4, 1)[0],
+        'alcohol': numeric_column(frame, 5, 15)[0],
+        'sake_type': np.array([convert_type_class(t) for t in type_class], dtype=object),
+    }
+
+
+def build_dish_sake_index(cuisine_data, sakes):
+    """料理IDごとに候補のお酒ID・マトリックス適合度スコア・適合フラグを並べた辞書を作る"""
+    ids = np.array(sakes['ids'], dtype=object)
+    nihonshu_do = sakes['nihonshu_do']
+    acidity = sakes['acidity']
+    alcohol = sakes['alcohol']
+    sake_type = sakes['sake_type']
+
+    dishes = {}
+    for cuisine_dishes in cuisine_data.values():
+        for dish in cuisine_dishes:
+            compatibility = dish['compatibility']
+            sake_in_range = (nihonshu_do >= compatibility['sake_min_level']) & (nihonshu_do <= compatibility['sake_max_level'])
+            acidity_in_range = (acidity >= compatibility['acidity_min']) & (acidity <= compatibility['acidity_max'])
+            alcohol_in_range = (alcohol >= compatibility['alcohol_min']) & (alcohol <= compatibility['alcohol_max'])
+
+            type_class_match = np.zeros(len(ids), dtype=bool)
+            for type_class in (dish['type_class1'], dish['type_class2']):
+                if type_class:
+                    type_class_match |= sake_type == convert_type_class(type_class)
+
+            candidates = np.flatnonzero(type_class_match | (sake_in_range & acidity_in_range & alcohol_in_range))
+            scores = (type_class_match * 10 + sake_in_range * 3 + acidity_in_range * 2 + alcohol_in_range * 1)[candidates]
+            flags = (type_class_match * FLAG_TYPE_CLASS + sake_in_range * FLAG_SAKE_LEVEL
+                     + acidity_in_range * FLAG_ACIDITY + alcohol_in_range * FLAG_ALCOHOL)[candidates]
+
+            # スコアの高い順（同点はカタログ順）
+            order = np.argsort(-scores, kind='stable')
+            dishes[dish['id']] = {
+                'sakeIds': ids[candidates[order]].tolist(),
+                'matrixScores': scores[order].tolist(),
+                'flags': flags[order].tolist(),
+            }
+
+    return {
+        'flags': {
+            'typeClass': FLAG_TYPE_CLASS,
+            'sakeLevel': FLAG_SAKE_LEVEL,
+            'acidity': FLAG_ACIDITY,
+            'alcohol': FLAG_ALCOHOL,
+        },
+        'dishes': dishes,
+    }
+
+
+def dump_dish_sake_index(index):
+    """インデックスをコンパクトなJSON文字列にする"""
+    return json.dumps(index, ensure_ascii=False, separators=(',', ':')) + '\n'
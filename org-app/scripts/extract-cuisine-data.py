@@ -1,9 +1,87 @@
 #!/usr/bin/env python3
-import pandas as pd
 import json
+import logging
 
-def extract_cuisine_matrix_data(excel_file_path):
-    """お酒とお料理相性マトリックスから料理データを抽出"""
+from columnar_format import write_columnar_outputs
+from cuisine_aggregates import CUISINE_MATCH_BONUS, compute_cuisine_aggregates
+from dish_sake_index import SAKE_SHEET_NAME, build_dish_sake_index, dump_dish_sake_index, load_sake_matching_columns
+from conversion_manifest import ConversionManifest, hash_rows, log_record_diff, workbook_fingerprint
+from matrix_validation import check_before_conversion
+from output_writers import atomic_output, write_text_if_changed
+from records import DishRecord, iter_grouped_json
+from run_instrumentation import count, get_logger, instrumented_run, parse_instrumentation_args, stage
+from workbook_loader import DEFAULT_EXCEL_FILE, cell_has_value, get_workbook
+
+logger = get_logger('extract-cuisine-data')
+
+JSON_OUTPUT_FILE = "/workspaces/org-app/org-app/lib/data/dish-compatibility-matrix.json"
+TS_OUTPUT_FILE = "/workspaces/org-app/org-app/lib/data/dish-compatibility-matrix.ts"
+INDEX_OUTPUT_FILE = "/workspaces/org-app/org-app/lib/data/dish-sake-index.json"
+
+CUISINE_SHEETS = {
+    '和食': 'japanese',
+    '中華': 'chinese', 
+    '洋食': 'western'
+}
+
+# データ構造: 行1がヘッダー、行2以降が料理ごとのデータ（列1が料理名）
+DISH_DATA_START_ROW = 2
+DISH_COLUMN_COUNT = 10
+
+def build_dish_item(row, cuisine_key):
+    """シートの1行から料理データを作成（料理名が空の行は None）"""
+    dish_name = str(row[1]) if cell_has_value(row[1]) else ''
+    if not dish_name:
+        return None
+
+    # 数値データの抽出（NaNの場合はデフォルト値を使用）
+    sake_min = float(row[2]) if cell_has_value(row[2]) else 0
+    sake_max = float(row[3]) if cell_has_value(row[3]) else 10
+    acidity_min = float(row[4]) if cell_has_value(row[4]) else 0
+    acidity_max = float(row[5]) if cell_has_value(row[5]) else 2
+    alcohol_min = float(row[6]) if cell_has_value(row[6]) else 10
+    alcohol_max = float(row[7]) if cell_has_value(row[7]) else 18
+    type_class1 = str(row[8]) if cell_has_value(row[8]) else 'A'
+    type_class2 = str(row[9]) if cell_has_value(row[9]) else 'B'
+
+    # IDを生成（料理名から）
+    dish_id = generate_dish_id(dish_name, cuisine_key)
+
+    dish_data = {
+        'id': dish_id,
+        'name': dish_name,
+        'cuisine_type': cuisine_key,
+        'compatibility': {
+            'sake_min_level': sake_min,
+            'sake_max_level': sake_max,
+            'acidity_min': acidity_min,
+            'acidity_max': acidity_max,
+            'alcohol_min': alcohol_min,
+            'alcohol_max': alcohol_max,
+        },
+        'type_class1': type_class1,
+        'type_class2': type_class2,
+        'match_bonus': calculate_match_bonus(cuisine_key, dish_name)
+    }
+
+    return dish_data
+
+def iter_dish_data(excel_file_path, sheet_name, cuisine_key, chunk_size=1000, records=False):
+    """料理シートの全データ行を順に変換して1件ずつ返す（records=True の場合は records.DishRecord）"""
+    workbook = get_workbook(excel_file_path)
+    for chunk in workbook.iter_row_chunks(sheet_name, min_row=DISH_DATA_START_ROW, chunk_size=chunk_size):
+        with stage('row_transform'):
+            dishes = []
+            for row in chunk:
+                row = tuple(row) + (None,) * (DISH_COLUMN_COUNT - len(row))
+                dish_data = build_dish_item(row, cuisine_key)
+                if dish_data is not None:
+                    dishes.append(DishRecord.from_dict(dish_data) if records else dish_data)
+        count('dishes', len(dishes))
+        yield from dishes
+
+def extract_cuisine_matrix_data(excel_file_path, records=False):
+    """お酒とお料理相性マトリックスから料理データを抽出（records=True の場合は records.DishRecord で持つ）"""
     
     all_cuisine_data = {
         'japanese': [],
@@ -11,68 +89,27 @@ def extract_cuisine_matrix_data(excel_file_path):
         'western': []
     }
     
-    cuisine_sheets = {
-        '和食': 'japanese',
-        '中華': 'chinese', 
-        '洋食': 'western'
-    }
-    
     try:
-        xl_file = pd.ExcelFile(excel_file_path)
+        workbook = get_workbook(excel_file_path)
         
-        for sheet_name, cuisine_key in cuisine_sheets.items():
-            if sheet_name not in xl_file.sheet_names:
-                print(f"{sheet_name}シートが見つかりません")
+        for sheet_name, cuisine_key in CUISINE_SHEETS.items():
+            if not workbook.has_sheet(sheet_name):
+                logger.warning(f"{sheet_name}シートが見つかりません")
                 continue
                 
-            print(f"\n=== {sheet_name}シート処理中 ===")
-            df = pd.read_excel(excel_file_path, sheet_name=sheet_name, header=None)
-            
-            # データ行を処理（行2-5）
-            for i in range(2, min(6, len(df))):
-                row = df.iloc[i]
-                
-                dish_name = str(row[1]) if pd.notna(row[1]) else ''
-                if not dish_name:
-                    continue
-                    
-                # 数値データの抽出（NaNの場合はデフォルト値を使用）
-                sake_min = float(row[2]) if pd.notna(row[2]) else 0
-                sake_max = float(row[3]) if pd.notna(row[3]) else 10
-                acidity_min = float(row[4]) if pd.notna(row[4]) else 0
-                acidity_max = float(row[5]) if pd.notna(row[5]) else 2
-                alcohol_min = float(row[6]) if pd.notna(row[6]) else 10
-                alcohol_max = float(row[7]) if pd.notna(row[7]) else 18
-                type_class1 = str(row[8]) if pd.notna(row[8]) else 'A'
-                type_class2 = str(row[9]) if pd.notna(row[9]) else 'B'
-                
-                # IDを生成（料理名から）
-                dish_id = generate_dish_id(dish_name, cuisine_key)
-                
-                dish_data = {
-                    'id': dish_id,
-                    'name': dish_name,
-                    'cuisine_type': cuisine_key,
-                    'compatibility': {
-                        'sake_min_level': sake_min,
-                        'sake_max_level': sake_max,
-                        'acidity_min': acidity_min,
-                        'acidity_max': acidity_max,
-                        'alcohol_min': alcohol_min,
-                        'alcohol_max': alcohol_max,
-                    },
-                    'type_class1': type_class1,
-                    'type_class2': type_class2,
-                    'match_bonus': calculate_match_bonus(cuisine_key, dish_name)
-                }
-                
+            logger.info(f"=== {sheet_name}シート処理中 ===")
+            # 1件ごとの表示は DEBUG レベルの場合だけ行う
+            log_dishes = logger.isEnabledFor(logging.DEBUG)
+            for dish_data in iter_dish_data(excel_file_path, sheet_name, cuisine_key, records=records):
                 all_cuisine_data[cuisine_key].append(dish_data)
-                print(f"追加: {dish_name} (ID: {dish_id})")
+                if log_dishes:
+                    logger.debug(f"追加: {dish_data['name']} (ID: {dish_data['id']})")
+            logger.info(f"{sheet_name}: {len(all_cuisine_data[cuisine_key])}品")
         
         return all_cuisine_data
         
     except Exception as e:
-        print(f"エラーが発生しました: {e}")
+        logger.error(f"エラーが発生しました: {e}")
         return None
 
 def generate_dish_id(dish_name, cuisine_type):
@@ -102,22 +139,16 @@ def generate_dish_id(dish_name, cuisine_type):
 
 def calculate_match_bonus(cuisine_type, dish_name):
     """料理タイプに基づくマッチボーナススコア"""
-    bonus_map = {
-        'japanese': 2.0,
-        'chinese': 1.5,
-        'western': 1.8
-    }
-    
     # 特定の料理には追加ボーナス
     if dish_name in ['刺身/寿司', 'カルパッチョ/生牡蠣']:
-        return bonus_map.get(cuisine_type, 1.0) + 0.5
+        return CUISINE_MATCH_BONUS.get(cuisine_type, 1.0) + 0.5
     
-    return bonus_map.get(cuisine_type, 1.0)
+    return CUISINE_MATCH_BONUS.get(cuisine_type, 1.0)
 
-def generate_typescript_interface(cuisine_data):
-    """TypeScript用のインターフェースとデータを生成"""
-    
-    typescript_code = '''// お酒とお料理相性マトリックスから抽出した詳細料理データ
+TYPESCRIPT_HEADER = '''// お酒とお料理相性マトリックスから抽出した詳細料理データ
+// CSVファイル「料理（和食・中華・洋食）とお酒の相性データマトリックス.csv」から取得
+
+import { convertTypeClassToSakeType } from '@/lib/recommendation/sake-recommender';
 
 export interface DishCompatibilityDetail {
   id: string;
@@ -131,83 +162,354 @@ export interface DishCompatibilityDetail {
     alcoholMin: number;
     alcoholMax: number;
   };
+  typeClass1: string; // A=薫酒, B=爽酒, C=醇酒, D=熟酒
+  typeClass2: string; // A=薫酒, B=爽酒, C=醇酒, D=熟酒
+  matchBonus: number;
+}
+
+export interface CuisineRangeBounds {
+  sakeMinLevel: number;
+  sakeMaxLevel: number;
+  acidityMin: number;
+  acidityMax: number;
+  alcoholMin: number;
+  alcoholMax: number;
+}
+
+// 料理タイプごとの集計（料理データから自動で求めた値）
+export interface CuisineAggregate {
+  dishCount: number;
+  mean: CuisineRangeBounds;          // 各下限・上限の平均（料理カテゴリでの絞り込みに使う）
+  envelope: CuisineRangeBounds;      // 全料理の範囲を含む範囲
+  intersection: CuisineRangeBounds | null;  // 全料理に共通する範囲（共通部分がなければ null）
   typeClass1: string;
   typeClass2: string;
   matchBonus: number;
 }
 
+/**
+ * 料理の推奨4タイプ分類を取得
+ */
+export function getDishRecommendedSakeTypes(dishId: string): string[] {
+  const dish = getDishCompatibility(dishId);
+  if (!dish) return [];
+  
+  const types = [];
+  if (dish.typeClass1) types.push(convertTypeClassToSakeType(dish.typeClass1));
+  if (dish.typeClass2 && dish.typeClass2 !== dish.typeClass1) {
+    types.push(convertTypeClassToSakeType(dish.typeClass2));
+  }
+  return types;
+}
+
 export const dishCompatibilityData: DishCompatibilityDetail[] = [
 '''
-    
-    all_dishes = []
-    for cuisine_type, dishes in cuisine_data.items():
-        all_dishes.extend(dishes)
-    
-    for dish in all_dishes:
-        typescript_code += f'''  {{
+
+TYPESCRIPT_FUNCTIONS = '''
+const dishesByCuisineType: Record<'japanese' | 'chinese' | 'western', DishCompatibilityDetail[]> = {
+  japanese: dishCompatibilityData.filter(d => d.cuisineType === 'japanese'),
+  chinese: dishCompatibilityData.filter(d => d.cuisineType === 'chinese'),
+  western: dishCompatibilityData.filter(d => d.cuisineType === 'western'),
+};
+
+// CSVマトリックスデータ要約（料理タイプごとの全料理の範囲。cuisineAggregates の envelope から求める）
+function summarizeEnvelope(envelope: CuisineRangeBounds | undefined) {
+  return envelope && {
+    sakeRange: { min: envelope.sakeMinLevel, max: envelope.sakeMaxLevel },
+    acidityRange: { min: envelope.acidityMin, max: envelope.acidityMax },
+    alcoholRange: { min: envelope.alcoholMin, max: envelope.alcoholMax },
+  };
+}
+
+export const matrixDataSummary = {
+  japanese: summarizeEnvelope(cuisineAggregates.japanese?.envelope),
+  chinese: summarizeEnvelope(cuisineAggregates.chinese?.envelope),
+  western: summarizeEnvelope(cuisineAggregates.western?.envelope),
+};
+
+// 料理IDから料理データを取得
+export function getDishCompatibility(dishId: string): DishCompatibilityDetail | undefined {
+  const index = dishIndexById.get(dishId);
+  return index === undefined ? undefined : dishCompatibilityData[index];
+}
+
+// 料理IDから表示名を取得
+export function getDishDisplayName(dishId: string): string {
+  const dish = getDishCompatibility(dishId);
+  return dish ? dish.name : dishId;
+}
+
+// 料理タイプから該当料理一覧を取得（読み込み時に作成した配列を返すので変更しないこと）
+export function getDishesByCuisineType(cuisineType: 'japanese' | 'chinese' | 'western'): DishCompatibilityDetail[] {
+  return dishesByCuisineType[cuisineType] ?? [];
+}
+'''
+
+def _typescript_dish_entry(dish):
+    compatibility = dish['compatibility']
+    return f'''  {{
     id: "{dish['id']}",
     name: "{dish['name']}",
     cuisineType: "{dish['cuisine_type']}",
     compatibility: {{
-      sakeMinLevel: {dish['compatibility']['sake_min_level']},
-      sakeMaxLevel: {dish['compatibility']['sake_max_level']},
-      acidityMin: {dish['compatibility']['acidity_min']},
-      acidityMax: {dish['compatibility']['acidity_max']},
-      alcoholMin: {dish['compatibility']['alcohol_min']},
-      alcoholMax: {dish['compatibility']['alcohol_max']},
+      sakeMinLevel: {_typescript_number(compatibility['sake_min_level'])},
+      sakeMaxLevel: {_typescript_number(compatibility['sake_max_level'])},
+      acidityMin: {_typescript_number(compatibility['acidity_min'])},
+      acidityMax: {_typescript_number(compatibility['acidity_max'])},
+      alcoholMin: {_typescript_number(compatibility['alcohol_min'])},
+      alcoholMax: {_typescript_number(compatibility['alcohol_max'])},
     }},
     typeClass1: "{dish['type_class1']}",
     typeClass2: "{dish['type_class2']}",
     matchBonus: {dish['match_bonus']}
+  }}'''
+
+def _typescript_number(value):
+    # 11.0 → 11 のように整数値は小数点を付けない
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+def _typescript_bounds(bounds):
+    if bounds is None:
+        return 'null'
+    return ('{ ' + ', '.join(f'{key}: {_typescript_number(bounds[field])}' for key, field in (
+        ('sakeMinLevel', 'sake_min_level'), ('sakeMaxLevel', 'sake_max_level'),
+        ('acidityMin', 'acidity_min'), ('acidityMax', 'acidity_max'),
+        ('alcoholMin', 'alcohol_min'), ('alcoholMax', 'alcohol_max'))) + ' }')
+
+def _typescript_aggregate_entry(cuisine_type, aggregate):
+    return f'''  {cuisine_type}: {{
+    dishCount: {aggregate['dish_count']},
+    mean: {_typescript_bounds(aggregate['mean'])},
+    envelope: {_typescript_bounds(aggregate['envelope'])},
+    intersection: {_typescript_bounds(aggregate['intersection'])},
+    typeClass1: "{aggregate['type_class1']}",
+    typeClass2: "{aggregate['type_class2']}",
+    matchBonus: {aggregate['match_bonus']}
   }},
 '''
+
+def iter_typescript_module(cuisine_data):
+    """TypeScript用のインターフェースとデータを先頭から順に断片として返す
+
+    料理データの配列に加えて、料理ID → 配列の位置、料理タイプ → 料理ID一覧 を
+    事前に計算して出力し、実行時の検索を線形探索にしない。
+    料理タイプごとの相性範囲（cuisineAggregates）も料理データから求めて出力する。
+    """
+    yield TYPESCRIPT_HEADER
+
+    # 料理タイプが変わるところに見出しのコメントを入れる（【和食系】など）
+    sheet_names = {cuisine_type: sheet_name for sheet_name, cuisine_type in CUISINE_SHEETS.items()}
+    all_dishes = [dish for dishes in cuisine_data.values() for dish in dishes]
+    previous_type = None
+    for i, dish in enumerate(all_dishes):
+        if dish['cuisine_type'] != previous_type:
+            previous_type = dish['cuisine_type']
+            section = sheet_names.get(previous_type, previous_type)
+            yield (',\n\n' if i else '') + f'  // 【{section}系】CSVデータより\n' + _typescript_dish_entry(dish)
+        else:
+            yield ',\n' + _typescript_dish_entry(dish)
+    yield '\n];\n' if all_dishes else '];\n'
+
+    # 同じIDの料理が複数ある場合は find と同じく最初の料理を使う
+    first_index = {}
+    for i, dish in enumerate(all_dishes):
+        first_index.setdefault(dish['id'], i)
+    yield '\n// 料理ID → dishCompatibilityData の位置\n'
+    yield 'export const dishIndexById: ReadonlyMap<string, number> = new Map<string, number>(['
+    for dish_id, i in first_index.items():
+        yield f'\n  ["{dish_id}", {i}],'
+    yield '\n]);\n' if first_index else ']);\n'
+
+    yield '\n// 料理タイプ → 料理IDの一覧（dishCompatibilityData の並び順）\n'
+    yield "export const dishIdsByCuisineType: Record<'japanese' | 'chinese' | 'western', string[]> = {\n"
+    for cuisine_type in CUISINE_SHEETS.values():
+        dish_ids = ', '.join(f'"{dish["id"]}"' for dish in all_dishes if dish['cuisine_type'] == cuisine_type)
+        yield f'  {cuisine_type}: [{dish_ids}],\n'
+    yield '};\n'
+
+    yield '\n// 料理タイプ → 集計（料理データの平均・全体の範囲・共通の範囲・主な4タイプ分類）\n'
+    yield "export const cuisineAggregates: Partial<Record<'japanese' | 'chinese' | 'western', CuisineAggregate>> = {\n"
+    for cuisine_type, aggregate in compute_cuisine_aggregates(all_dishes).items():
+        yield _typescript_aggregate_entry(cuisine_type, aggregate)
+    yield '};\n'
+
+    yield TYPESCRIPT_FUNCTIONS
+
+def write_typescript_module(cuisine_data, output_file):
+    """TypeScriptファイルを文字列全体を組み立てずにそのまま書き出す"""
+    with atomic_output(output_file) as f:
+        for chunk in iter_typescript_module(cuisine_data):
+            f.write(chunk)
+
+def generate_typescript_interface(cuisine_data):
+    """TypeScript用のインターフェースとデータを生成"""
+    return ''.join(iter_typescript_module(cuisine_data))
+
+def generate_dish_sake_index(excel_file, cuisine_data):
+    """料理データとお酒シートを突き合わせた候補インデックスのJSON文字列（お酒シートがなければ None）"""
+    if not get_workbook(excel_file).has_sheet(SAKE_SHEET_NAME):
+        logger.warning(f"{SAKE_SHEET_NAME}シートが見つからないため、候補インデックスは作成しません")
+        return None
+    sakes = load_sake_matching_columns(excel_file)
+    with stage('index_build'):
+        index = build_dish_sake_index(cuisine_data, sakes)
+    with stage('serialization'):
+        return dump_dish_sake_index(index)
+
+def extract_incremental(excel_file, show_diff=False, validate=True):
+    """変更のあったシートだけを変換し、内容が変わった出力だけを書き換える"""
+    stage_name = 'dish'
+    output_files = [JSON_OUTPUT_FILE, TS_OUTPUT_FILE, INDEX_OUTPUT_FILE]
+    manifest = ConversionManifest()
+    outputs_intact = manifest.outputs_intact(stage_name)
     
-    typescript_code = typescript_code.rstrip(',\n') + '\n];\n'
+    if outputs_intact and manifest.workbook_unchanged(stage_name, excel_file):
+        logger.info("変更なし: ワークブックは前回の変換から更新されていません")
+        return
     
-    # 料理IDから名前を取得する関数を追加
-    typescript_code += '''
-// 料理IDから表示名を取得
-export function getDishDisplayName(dishId: string): string {
-  const dish = dishCompatibilityData.find(d => d.id === dishId);
-  return dish ? dish.name : dishId;
-}
-
-// 料理タイプから該当料理一覧を取得  
-export function getDishesByCuisineType(cuisineType: 'japanese' | 'chinese' | 'western'): DishCompatibilityDetail[] {
-  return dishCompatibilityData.filter(d => d.cuisineType === cuisineType);
-}
-'''
+    # 変換中にワークブックが保存された場合に備え、指紋は読み込む前に取る
+    fingerprint = workbook_fingerprint(excel_file)
+    if validate and not check_before_conversion(excel_file, list(CUISINE_SHEETS), logger):
+        return
+    
+    # 前回の出力が残っていれば、変更のないシートはその結果を再利用する
+    previous_data = {}
+    if outputs_intact:
+        with open(JSON_OUTPUT_FILE, encoding='utf-8') as f:
+            previous_data = json.load(f)
+    
+    workbook = get_workbook(excel_file)
+    cuisine_data = {cuisine_key: [] for cuisine_key in CUISINE_SHEETS.values()}
+    sheet_hashes = {}
+    changed_sheets = []
+    # 前回変換したシートが削除された場合も変更として扱う（その料理タイプは空になる）
+    recorded_sheets = manifest.recorded_sheets(stage_name)
+    try:
+        for sheet_name, cuisine_key in CUISINE_SHEETS.items():
+            if not workbook.has_sheet(sheet_name):
+                logger.warning(f"{sheet_name}シートが見つかりません")
+                if sheet_name in recorded_sheets:
+                    changed_sheets.append(sheet_name)
+                continue
+            with stage('change_detection'):
+                sheet_hashes[sheet_name] = hash_rows(workbook.iter_rows(sheet_name))
+            if cuisine_key in previous_data and manifest.sheet_unchanged(stage_name, sheet_name, sheet_hashes[sheet_name]):
+                cuisine_data[cuisine_key] = previous_data[cuisine_key]
+                continue
+            changed_sheets.append(sheet_name)
+            cuisine_data[cuisine_key] = list(iter_dish_data(excel_file, sheet_name, cuisine_key))
+        
+        # 候補インデックスはお酒シートにも依存する
+        if workbook.has_sheet(SAKE_SHEET_NAME):
+            with stage('change_detection'):
+                sheet_hashes[SAKE_SHEET_NAME] = hash_rows(workbook.iter_rows(SAKE_SHEET_NAME))
+            if not manifest.sheet_unchanged(stage_name, SAKE_SHEET_NAME, sheet_hashes[SAKE_SHEET_NAME]):
+                changed_sheets.append(SAKE_SHEET_NAME)
+        elif SAKE_SHEET_NAME in recorded_sheets:
+            changed_sheets.append(SAKE_SHEET_NAME)
+        
+        if not changed_sheets:
+            manifest.touch_workbook(stage_name, fingerprint)
+            manifest.save()
+            logger.info("変更なし: 料理シートは前回の変換から更新されていません")
+            return
+        
+        index_content = generate_dish_sake_index(excel_file, cuisine_data)
+    except Exception as e:
+        logger.error(f"エラーが発生しました: {e}")
+        logger.error("データの抽出に失敗しました")
+        return
     
-    return typescript_code
+    logger.info(f"変更のあったシート: {changed_sheets}")
+    
+    all_dishes = [dish for dishes in cuisine_data.values() for dish in dishes]
+    diff = manifest.diff_records(stage_name, all_dishes)
+    
+    with stage('serialization'):
+        outputs = [
+            (JSON_OUTPUT_FILE, json.dumps(cuisine_data, ensure_ascii=False, indent=2)),
+            (TS_OUTPUT_FILE, generate_typescript_interface(cuisine_data)),
+        ]
+    if index_content is not None:
+        outputs.append((INDEX_OUTPUT_FILE, index_content))
+    else:
+        output_files.remove(INDEX_OUTPUT_FILE)
+    for output_file, content in outputs:
+        with stage('file_write'):
+            changed = write_text_if_changed(output_file, content)
+        if changed:
+            logger.info(f"{output_file} を更新しました")
+        else:
+            logger.info(f"出力内容に変更はありません: {output_file}")
+    
+    if show_diff:
+        log_record_diff("料理データ", diff, logger)
+    
+    manifest.update(stage_name, fingerprint, sheet_hashes, all_dishes, output_files)
+    manifest.save()
 
-if __name__ == "__main__":
-    excel_file = "/workspaces/org-app/お酒とお料理相性マトリックス.xlsx"
+def main(excel_file=DEFAULT_EXCEL_FILE, incremental=False, show_diff=False, columnar=False, validate=True):
+    if incremental:
+        extract_incremental(excel_file, show_diff=show_diff, validate=validate)
+        return
     
-    # データ抽出実行
-    cuisine_data = extract_cuisine_matrix_data(excel_file)
+    # 空欄・範囲外の値・下限と上限の逆転などを変換前にまとめて検証する（--no-validate で省略）
+    if validate and not check_before_conversion(excel_file, list(CUISINE_SHEETS), logger):
+        return
+    
+    # データ抽出実行（全件を保持するため、1件ずつの dict ではなく省メモリな DishRecord で持つ）
+    cuisine_data = extract_cuisine_matrix_data(excel_file, records=True)
     
     if cuisine_data:
-        # JSONファイルに出力
-        json_output_file = "/workspaces/org-app/org-app/lib/data/dish-compatibility-matrix.json"
-        with open(json_output_file, 'w', encoding='utf-8') as f:
-            json.dump(cuisine_data, f, ensure_ascii=False, indent=2)
-        
-        print(f"\\nJSONデータを {json_output_file} に保存しました")
+        json_output_file = JSON_OUTPUT_FILE
+        if columnar:
+            # 列指向形式（JSON + バイナリ）で出力
+            dishes = [dish for cuisine_dishes in cuisine_data.values() for dish in cuisine_dishes]
+            with stage('file_write'):
+                json_path, binary_path = write_columnar_outputs(dishes, 'dish', json_output_file)
+            logger.info(f"列指向データを {json_path} と {binary_path} に保存しました")
+        else:
+            # JSONファイルに出力（全体を1つの文字列にせず、1件ずつ整形して書き出す）
+            with stage('serialization'):
+                with atomic_output(json_output_file) as f:
+                    for chunk in iter_grouped_json(cuisine_data):
+                        f.write(chunk)
+            
+            logger.info(f"JSONデータを {json_output_file} に保存しました")
         
         # TypeScriptファイルに出力
-        ts_output_file = "/workspaces/org-app/org-app/lib/data/dish-compatibility-matrix.ts"
-        typescript_code = generate_typescript_interface(cuisine_data)
-        with open(ts_output_file, 'w', encoding='utf-8') as f:
-            f.write(typescript_code)
+        ts_output_file = TS_OUTPUT_FILE
+        with stage('file_write'):
+            write_typescript_module(cuisine_data, ts_output_file)
         
-        print(f"TypeScriptファイルを {ts_output_file} に保存しました")
+        logger.info(f"TypeScriptファイルを {ts_output_file} に保存しました")
         
-        # サマリー表示
+        # 料理 → 候補のお酒 インデックスを出力
+        index_content = generate_dish_sake_index(excel_file, cuisine_data)
+        if index_content is not None:
+            with stage('file_write'):
+                with atomic_output(INDEX_OUTPUT_FILE) as f:
+                    f.write(index_content)
+            logger.info(f"候補インデックスを {INDEX_OUTPUT_FILE} に保存しました")
+        
+        # サマリー表示（料理名の一覧は DEBUG レベルの場合だけ）
         total_dishes = sum(len(dishes) for dishes in cuisine_data.values())
-        print(f"\\n=== 抽出完了 ===")
-        print(f"総料理数: {total_dishes}品")
+        logger.info("=== 抽出完了 ===")
+        logger.info(f"総料理数: {total_dishes}品")
         for cuisine_type, dishes in cuisine_data.items():
-            print(f"{cuisine_type}: {len(dishes)}品 - {[d['name'] for d in dishes]}")
+            logger.info(f"{cuisine_type}: {len(dishes)}品")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"  {[d['name'] for d in dishes]}")
         
     else:
-        print("データの抽出に失敗しました")
\ No newline at end of file
+        logger.error("データの抽出に失敗しました")
+
+if __name__ == "__main__":
+    import sys
+    # --log-level / --verbose / --profile / --trace-memory / --report FILE は run_instrumentation を参照
+    argv, instrumentation_options = parse_instrumentation_args(sys.argv[1:])
+    # 入力は .xlsx のほか、CSVを置いたディレクトリ（lib/data/）も指定できる
+    args = [arg for arg in argv if not arg.startswith('--')]
+    with instrumented_run('extract-cuisine-data', **instrumentation_options):
+        main(args[0] if args else DEFAULT_EXCEL_FILE, incremental='--incremental' in argv, show_diff='--diff' in argv,
+             columnar='--columnar' in argv, validate='--no-validate' not in argv)
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""お酒データ・料理シートの一括検証
+
+変換スクリプトは空欄や数値にできないセルを既定値（酸度下限 0、度数上限 18、価格 3000 など）に
+置き換えるか、float() の例外で変換全体を止めるため、どのセルに問題があるのかが分からない。
+ここではシートの全データ行を列単位（NumPy）でまとめて検証し、
+- 数値にできない値（invalid_number）
+- 日本酒度・酸度・度数・価格の値の範囲外（out_of_domain）
+- 下限 > 上限（inverted_range、空欄は既定値に置き換えて比較する）
+- A〜D 以外の4タイプ分類（invalid_type_class）
+をエラー、既定値に置き換わる空欄（missing）を警告として、シート・行番号付きのレポートにまとめる。
+"""
+import numpy as np
+
+from cuisine_aggregates import RANGE_PAIRS
+from dish_sake_index import SAKE_SHEET_NAME
+from run_instrumentation import count, stage
+from workbook_loader import CsvWorkbookLoader, get_workbook
+
+DATA_START_ROW = 2
+CUISINE_SHEET_NAMES = ['和食', '中華', '洋食']
+VALID_TYPE_CLASSES = ['A', 'B', 'C', 'D']
+
+# 値の範囲（両端を含む）
+NIHONSHU_DEGREE_DOMAIN = (-30.0, 30.0)
+ACIDITY_DOMAIN = (0.0, 5.0)
+ALCOHOL_DOMAIN = (0.0, 25.0)
+PRICE_DOMAIN = (0.0, 1_000_000.0)
+
+# 項目名 → (列, 見出し, 種類, 値の範囲, 空欄の場合の既定値)
+# 既定値は convert-excel-proper.py の build_sake_item / extract-cuisine-data.py の build_dish_item と同じ
+SAKE_SCHEMA = {
+    'nihonshu_do': (3, '日本酒度', 'number', NIHONSHU_DEGREE_DOMAIN, 0),
+    'acidity': (4, '酸度', 'number', ACIDITY_DOMAIN, 1),
+    'alcohol': (5, '度数', 'number', ALCOHOL_DOMAIN, 15),
+    'type_class': (6, '4タイプ分類', 'type_class', None, 'A'),
+    'price': (8, '価格', 'number', PRICE_DOMAIN, 3000),
+}
+DISH_SCHEMA = {
+    'sake_min_level': (2, '日本酒度下限', 'number', NIHONSHU_DEGREE_DOMAIN, 0),
+    'sake_max_level': (3, '日本酒度上限', 'number', NIHONSHU_DEGREE_DOMAIN, 10),
+    'acidity_min': (4, '酸度下限', 'number', ACIDITY_DOMAIN, 0),
+    'acidity_max': (5, '酸度上限', 'number', ACIDITY_DOMAIN, 2),
+    'alcohol_min': (6, '度数下限', 'number', ALCOHOL_DOMAIN, 10),
+    'alcohol_max': (7, '度数上限', 'number', ALCOHOL_DOMAIN, 18),
+    'type_class1': (8, '4タイプ分類-1', 'type_class', None, 'A'),
+    'type_class2': (9, '4タイプ分類-2', 'type_class', None, 'B'),
+}
+
+ERROR = 'error'
+WARNING = 'warning'
+
+# レポートに1件ずつ載せる問題の上限（件数の集計は全件）
+DEFAULT_MAX_ISSUES = 1000
+# ログに1件ずつ出す問題の上限
+LOG_ISSUE_COUNT = 20
+# 読み取り専用モードでDataFrameにまとめる行数
+VALIDATION_CHUNK_SIZE = 100_000
+
+
+def _plain(value):
+    """NumPyの値をJSONにできる値にする（欠損は None）"""
+    if hasattr(value, 'item'):
+        value = value.item()
+    if isinstance(value, float) and np.isnan(value):
+        return None
+    return value
+
+
+class ValidationReport:
+    """検証結果（問題の一覧とシート・種類ごとの件数）"""
+
+    def __init__(self, max_issues=DEFAULT_MAX_ISSUES):
+        self.max_issues = max_issues
+        self.issues = []
+        # (シート名, 重大度, コード) → 件数
+        self.counts = {}
+        self.rows_checked = {}
+
+    def add(self, sheet_name, severity, code, field, row_numbers, values, message):
+        """同じ種類の問題を行番号・値の配列でまとめて追加する"""
+        if not len(row_numbers):
+            return
+        key = (sheet_name, severity, code)
+        self.counts[key] = self.counts.get(key, 0) + len(row_numbers)
+        room = self.max_issues - len(self.issues)
+        for row_number, value in zip(row_numbers[:room].tolist(), list(values[:room])):
+            self.issues.append({
+                'sheet': sheet_name,
+                'row': row_number,
+                'field': field,
+                'value': _plain(value),
+                'severity': severity,
+                'code': code,
+                'message': message,
+            })
+
+    def _total(self, severity):
+        return sum(n for (_, key_severity, _), n in self.counts.items() if key_severity == severity)
+
+    @property
+    def error_count(self):
+        return self._total(ERROR)
+
+    @property
+    def warning_count(self):
+        return self._total(WARNING)
+
+    @property
+    def ok(self):
+        return self.error_count == 0
+
+    def to_dict(self):
+        counts = {}
+        for (sheet_name, severity, code), n in sorted(self.counts.items()):
+            counts.setdefault(sheet_name, {}).setdefault(severity, {})[code] = n
+        return {
+            'ok': self.ok,
+            'errorCount': self.error_count,
+            'warningCount': self.warning_count,
+            'rowsChecked': self.rows_checked,
+            'counts': counts,
+            'truncated': len(self.issues) < sum(self.counts.values()),
+            'issues': sorted(self.issues, key=lambda issue: (issue['sheet'], issue['row'])),
+        }
+
+    def log_summary(self, logger, issue_count=LOG_ISSUE_COUNT):
+        """件数と先頭の問題をログに出す（エラーは ERROR、警告は WARNING レベル）"""
+        for sheet_name, rows in self.rows_checked.items():
+            errors = sum(n for (name, severity, _), n in self.counts.items() if name == sheet_name and severity == ERROR)
+            warnings = sum(n for (name, severity, _), n in self.counts.items() if name == sheet_name and severity == WARNING)
+            logger.info(f"検証: {sheet_name} {rows}行 / エラー {errors}件 / 警告 {warnings}件")
+        for issue in self.to_dict()['issues'][:issue_count]:
+            log = logger.error if issue['severity'] == ERROR else logger.warning
+            log(f"  {issue['sheet']} {issue['row']}行目 {issue['field']}: {issue['message']} (値: {issue['value']})")
+        listed = min(len(self.issues), issue_count)
+        if sum(self.counts.values()) > listed:
+            logger.info(f"  ...ほか {sum(self.counts.values()) - listed}件")
+
+
+def _to_float(column):
+    """列（object の配列）を float の配列にする（数値にできない値は NaN）
+
+    問題のない列は float() と同じ変換を1度で行い、失敗した列だけ値ごとに float() で変換する。
+    """
+    try:
+        return column.astype(float)
+    except (TypeError, ValueError):
+        return np.array([_parse_float(value) for value in column.tolist()], dtype=float)
+
+
+def _parse_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _present(column):
+    """値のあるセルのマスク（None と NaN 以外。cell_has_value と同じ判定を配列でまとめて行う）"""
+    return np.not_equal(column, None) & np.equal(column, column)
+
+
+def _rows_to_array(rows, width):
+    """行（値のタプル）のリストを、幅 width の object の2次元配列にする（足りない列は None）"""
+    values = np.full((len(rows), width), None, dtype=object)
+    for position, row in enumerate(rows):
+        row = row[:width]
+        values[position, :len(row)] = row
+    return values
+
+
+def _iter_data_blocks(workbook, sheet_name, start_row, width):
+    """シートのデータ行を object の2次元配列で返す（行を逐次読み出すローダーでは一定の行数ずつ）
+
+    pandasで解析済みのシートはDataFrameから、読み取り専用モードとCSVではpandasを使わずに作る。
+    """
+    if not workbook.read_only and not isinstance(workbook, CsvWorkbookLoader):
+        frame = workbook.read_sheet(sheet_name).iloc[start_row:]
+        yield start_row, frame.reindex(columns=range(width)).to_numpy(dtype=object)
+        return
+    for chunk in workbook.iter_row_chunks(sheet_name, min_row=start_row, chunk_size=VALIDATION_CHUNK_SIZE):
+        yield start_row, _rows_to_array(chunk, width)
+        start_row += len(chunk)
+
+
+def _schema_width(schema):
+    return max(column for column, *_ in schema.values()) + 1
+
+
+def validate_rows(report, sheet_name, values, start_row, schema, range_pairs=()):
+    """header=None で読み込んだデータ行（object の2次元配列、先頭が行番号 start_row）を検証してレポートに追加する
+
+    銘柄名・料理名（列1）のない行は変換時と同じく対象にしない。
+    レポートの行番号はワークブック上の行番号（1行目がタイトル、2行目が見出し）。
+    """
+    row_numbers = np.arange(start_row, start_row + len(values)) + 1
+    names = values[:, 1]
+    blank = np.array([isinstance(name, str) and not name.strip() for name in names.tolist()], dtype=bool)
+    named = _present(names) & ~blank
+    values = values[named]
+    row_numbers = row_numbers[named]
+    report.rows_checked[sheet_name] = report.rows_checked.get(sheet_name, 0) + len(values)
+    if not len(values):
+        return report
+
+    effective = {}
+    for field, (column, label, kind, domain, default) in schema.items():
+        raw = values[:, column]
+        present = _present(raw)
+        report.add(sheet_name, WARNING, 'missing', label, row_numbers[~present], raw[~present],
+                   f"空欄のため既定値 {default} を使います")
+        if kind == 'type_class':
+            invalid = present & ~np.isin(raw, VALID_TYPE_CLASSES)
+            report.add(sheet_name, ERROR, 'invalid_type_class', label, row_numbers[invalid], raw[invalid],
+                       f"4タイプ分類は {'/'.join(VALID_TYPE_CLASSES)} のいずれかです")
+            continue
+
+        numbers = _to_float(raw)
+        invalid = present & np.isnan(numbers)
+        report.add(sheet_name, ERROR, 'invalid_number', label, row_numbers[invalid], raw[invalid],
+                   "数値ではありません")
+        low, high = domain
+        with np.errstate(invalid='ignore'):
+            outside = (numbers < low) | (numbers > high)
+        report.add(sheet_name, ERROR, 'out_of_domain', label, row_numbers[outside], numbers[outside],
+                   f"{low:g}〜{high:g} の範囲外です")
+        effective[field] = np.where(present, numbers, default)
+
+    for low_field, high_field in range_pairs:
+        low_values, high_values = effective[low_field], effective[high_field]
+        with np.errstate(invalid='ignore'):
+            inverted = low_values > high_values
+        pairs = np.array([f"{low:g} > {high:g}" for low, high in zip(low_values[inverted], high_values[inverted])],
+                         dtype=object)
+        report.add(sheet_name, ERROR, 'inverted_range', f"{schema[low_field][1]}/{schema[high_field][1]}",
+                   row_numbers[inverted], pairs, "下限が上限より大きくなっています")
+    return report
+
+
+def validate_sheet(excel_file, sheet_name, schema, range_pairs=(), report=None):
+    """シートの全データ行を検証する"""
+    report = report if report is not None else ValidationReport()
+    workbook = get_workbook(excel_file)
+    with stage('validation'):
+        for start_row, values in _iter_data_blocks(workbook, sheet_name, DATA_START_ROW, _schema_width(schema)):
+            validate_rows(report, sheet_name, values, start_row, schema, range_pairs)
+    count('rows_validated', report.rows_checked.get(sheet_name, 0))
+    return report
+
+
+def validate_sake_sheet(excel_file, sheet_name=SAKE_SHEET_NAME, report=None):
+    return validate_sheet(excel_file, sheet_name, SAKE_SCHEMA, report=report)
+
+
+def validate_dish_sheet(excel_file, sheet_name, report=None):
+    return validate_sheet(excel_file, sheet_name, DISH_SCHEMA, RANGE_PAIRS, report=report)
+
+
+def validate_workbook(excel_file, sheet_names=None, max_issues=DEFAULT_MAX_ISSUES):
+    """お酒データ・料理シートのうち、ワークブックにあるものをすべて検証する
+
+    sheet_names を指定した場合はそのシートだけを検証する。
+    """
+    workbook = get_workbook(excel_file)
+    report = ValidationReport(max_issues=max_issues)
+    for sheet_name in sheet_names or [SAKE_SHEET_NAME] + CUISINE_SHEET_NAMES:
+        if not workbook.has_sheet(sheet_name):
+            continue
+        if sheet_name == SAKE_SHEET_NAME:
+            validate_sake_sheet(excel_file, sheet_name, report=report)
+        elif sheet_name in CUISINE_SHEET_NAMES:
+            validate_dish_sheet(excel_file, sheet_name, report=report)
+    return report
+
+
+def check_before_conversion(excel_file, sheet_names, logger):
+    """変換前に検証し、エラーがあればログに出して False を返す（警告だけなら変換を続ける）"""
+    report = validate_workbook(excel_file, sheet_names)
+    report.log_summary(logger)
+    if not report.ok:
+        logger.error(f"検証エラーが {report.error_count}件あるため変換を中止します（validate-matrix.py で一覧を出力できます）")
+    return report.ok
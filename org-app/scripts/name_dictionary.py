@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""銘柄名から都道府県・酒蔵を推定する名前辞書
+
+辞書（lib/data/sake-name-dictionary.csv）の形式:
+    名前,都道府県,酒蔵,優先度
+    男山,北海道,男山株式会社,
+    錦,京都府,,
+- UTF-8（BOM付き可）のCSVで、1行目は見出し。列は見出しの名前で探すので順序は問わない
+- 「名前」は必須。銘柄名にこの文字列が含まれる行が当てはまる（空の行は読み飛ばす）
+- 「都道府県」「酒蔵」は空欄でもよい。空欄の列はその行では推定しない
+  （都道府県は「未設定」、酒蔵は銘柄名から伏せ字を除いて「酒造」を付けたものになる）
+- 「優先度」は省略可能な整数（既定 0）
+
+複数の行が当てはまる場合は、優先度の高い行 → 名前の長い（より具体的な）行 → 辞書の上の行の順に
+優先する。たとえば「錦」と「錦鶴」の両方が含まれる銘柄名では「錦鶴」の行を使うので、
+短い一般的な名前を辞書の上の方に置いても、それを含む長い銘柄名の行は隠れない。
+
+辞書の全パターンを Aho-Corasick 法のオートマトンに1度だけまとめるので、
+1件の照合にかかる時間は辞書の大きさによらず銘柄名の長さに比例する。
+オートマトンは辞書ファイルごとにプロセス内でキャッシュする。
+"""
+import csv
+import os
+from collections import deque
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DICTIONARY_FILE = os.path.join(SCRIPTS_DIR, '..', 'lib', 'data', 'sake-name-dictionary.csv')
+# 別の辞書を使う場合は環境変数で指定する（一括変換のワーカープロセスにも引き継がれる）
+DICTIONARY_ENV = 'SAKE_NAME_DICTIONARY'
+
+DICTIONARY_HEADER = ['名前', '都道府県', '酒蔵', '優先度']
+UNKNOWN_PREFECTURE = '未設定'
+# 辞書に酒蔵がない場合は、銘柄名から伏せ字を除いて「酒造」を付ける
+PLACEHOLDERS = ('〇〇', '××', '△△')
+
+_NO_MATCH = float('inf')
+
+
+class AhoCorasickMatcher:
+    """複数のパターンを同時に探すオートマトン
+
+    patterns は (パターン, 値) または (パターン, 値, 優先度) の並び。値が None のパターンは照合しない。
+    best_match は文字列に含まれるパターンのうち、優先度が高い → パターンが長い → 並びの前、の順で
+    最初のものの値を返す。
+    """
+
+    def __init__(self, patterns):
+        patterns = [tuple(pattern) + (0,) * (3 - len(pattern)) for pattern in patterns]
+        self._values = [value for _, value, _ in patterns]
+        # パターンの番号 → 順位（小さいほど優先）
+        order = sorted(range(len(patterns)), key=lambda i: (-patterns[i][2], -len(patterns[i][0] or ''), i))
+        self._index_by_rank = order
+        rank_of = {index: rank for rank, index in enumerate(order)}
+        self._goto = [{}]
+        # 状態ごとに、その状態で一致する（失敗遷移先も含む）パターンの最小の順位
+        self._best = [_NO_MATCH]
+        for value_index, (pattern, value, _) in enumerate(patterns):
+            if not pattern or value is None:
+                continue
+            state = 0
+            for char in pattern:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._best.append(_NO_MATCH)
+                state = next_state
+            self._best[state] = min(self._best[state], rank_of[value_index])
+        self._fail = self._build_failure_links()
+
+    def _build_failure_links(self):
+        fail = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                link = fail[state]
+                while link and char not in self._goto[link]:
+                    link = fail[link]
+                fail[next_state] = self._goto[link].get(char, 0)
+                self._best[next_state] = min(self._best[next_state], self._best[fail[next_state]])
+        return fail
+
+    def best_index(self, text):
+        """text に含まれるパターンのうち最も優先するものの番号（なければ None）"""
+        goto, fail, best = self._goto, self._fail, self._best
+        state = 0
+        found = _NO_MATCH
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if best[state] < found:
+                found = best[state]
+        return None if found == _NO_MATCH else self._index_by_rank[found]
+
+    def best_match(self, text, default=None):
+        index = self.best_index(text)
+        return default if index is None else self._values[index]
+
+
+class NameDictionary:
+    """名前辞書の行（名前, 都道府県, 酒蔵, 優先度）から都道府県用・酒蔵用のオートマトンを作る"""
+
+    def __init__(self, entries):
+        entries = list(entries)
+        self.entries = entries
+        self._prefectures = AhoCorasickMatcher(
+            (name, prefecture or None, priority) for name, prefecture, _, priority in entries)
+        self._breweries = AhoCorasickMatcher((name, brewery or None, priority) for name, _, brewery, priority in entries)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def prefecture(self, name):
+        return self._prefectures.best_match(name, UNKNOWN_PREFECTURE)
+
+    def brewery(self, name):
+        brewery = self._breweries.best_match(name)
+        if brewery is not None:
+            return brewery
+        for placeholder in PLACEHOLDERS:
+            name = name.replace(placeholder, '')
+        return name + '酒造'
+
+    def resolve(self, name):
+        """銘柄名から (都道府県, 酒蔵) を求める"""
+        return self.prefecture(name), self.brewery(name)
+
+
+def load_name_dictionary(dictionary_file):
+    """名前辞書のCSV（BOM付き可、1行目は見出し）を読み込む"""
+    with open(dictionary_file, encoding='utf-8-sig', newline='') as f:
+        reader = csv.reader(f)
+        header = [column.strip() for column in next(reader, [])]
+        positions = [header.index(column) if column in header else None for column in DICTIONARY_HEADER]
+        if positions[0] is None:
+            raise ValueError(f"名前辞書に「{DICTIONARY_HEADER[0]}」列がありません: {dictionary_file}")
+        entries = []
+        for row in reader:
+            values = [row[position].strip() if position is not None and position < len(row) else ''
+                      for position in positions]
+            if values[0]:
+                name, prefecture, brewery, priority = values
+                try:
+                    priority = int(priority) if priority else 0
+                except ValueError:
+                    raise ValueError(f"名前辞書の優先度が整数ではありません: {name} ({priority})") from None
+                entries.append((name, prefecture, brewery, priority))
+    return NameDictionary(entries)
+
+
+_dictionaries = {}
+
+
+def resolve_dictionary_file(dictionary_file=None):
+    """使う辞書ファイルのパス
+
+    dictionary_file を省略した場合は環境変数 SAKE_NAME_DICTIONARY、
+    それもなければ lib/data/sake-name-dictionary.csv を使う。
+    """
+    return os.path.abspath(dictionary_file or os.environ.get(DICTIONARY_ENV) or DEFAULT_DICTIONARY_FILE)
+
+
+def get_name_dictionary(dictionary_file=None):
+    """同じプロセス内では辞書ファイルごとに同じ辞書（コンパイル済み）を返す"""
+    path = resolve_dictionary_file(dictionary_file)
+    dictionary = _dictionaries.get(path)
+    if dictionary is None:
+        dictionary = load_name_dictionary(path)
+        _dictionaries[path] = dictionary
+    return dictionary
+
+
+def clear_name_dictionary_cache():
+    """読み込み済みの辞書を破棄する（辞書ファイルを更新した場合）"""
+    _dictionaries.clear()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""変換結果の書き出し処理
+
+出力はいずれも同じディレクトリの一時ファイルに書いてから置き換えるため、
+変換の途中で失敗しても Next.js から壊れた（途中までの）ファイルが見えることはない。
+"""
+import os
+from contextlib import contextmanager
+
+from records import record_to_json
+
+
+@contextmanager
+def atomic_output(output_file, binary=False):
+    """書き込み用に開いたファイルを返し、ブロックを抜けたら出力ファイルと置き換える（例外の場合は元のまま）
+
+    binary=True の場合はバイナリモードで開く（既定は UTF-8 のテキスト）。
+    """
+    temporary_file = f"{output_file}.{os.getpid()}.tmp"
+    try:
+        with open(temporary_file, 'wb') if binary else open(temporary_file, 'w', encoding='utf-8') as f:
+            yield f
+        os.replace(temporary_file, output_file)
+    except BaseException:
+        try:
+            os.remove(temporary_file)
+        except OSError:
+            pass
+        raise
+
+
+def write_json_array(records, output_file):
+    """レコードを受け取った順にJSON配列として書き出す
+
+    json.dump(list(records), f, ensure_ascii=False, indent=2) と同じ内容を、
+    全件をメモリに保持せずに出力する。records のレコード型は dict にせずに整形する。
+    書き出した件数を返す。
+    """
+    count = 0
+    with atomic_output(output_file) as f:
+        for record in records:
+            f.write('[\n  ' if count == 0 else ',\n  ')
+            f.write(record_to_json(record).replace('\n', '\n  '))
+            count += 1
+        f.write('\n]' if count else '[]')
+    return count
+
+
+def write_text_if_changed(output_file, content):
+    """内容が変わった場合だけファイルを書き換える
+
+    同じ内容なら更新時刻も変えないため、Next.jsの再ビルドを起こさない。
+    書き換えた場合は True を返す。
+    """
+    if os.path.exists(output_file):
+        with open(output_file, encoding='utf-8') as f:
+            if f.read() == content:
+                return False
+    with atomic_output(output_file) as f:
+        f.write(content)
+    return True
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""変換パイプラインのベンチマーク
+
+各段階（お酒データ変換・汎用JSON変換・料理データ抽出）を別プロセスで実行し、
+処理時間・行数/秒・最大メモリ使用量（ピークRSS）を計測する。プロセスを分けるのは、
+ワークブックのキャッシュやメモリ使用量が前の段階の影響を受けないようにするため。
+同じ理由で、ディスクのシートキャッシュ（sheet_cache）も使わずに毎回ワークブックを解析する。
+"""
+import contextlib
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import time
+
+from script_loader import load_script
+from sheet_cache import SHEET_CACHE_ENV
+from synthetic_matrix import write_synthetic_csv, write_synthetic_workbook
+
+BASELINE_VERSION = 2
+DEFAULT_SIZES = [1_000, 100_000]
+SIZE_LABELS = {1_000: '1k', 100_000: '100k', 1_000_000: '1m'}
+
+
+def parse_size(text):
+    """'1k' '100k' '1m' や数値の文字列を行数にする"""
+    text = text.strip().lower()
+    for suffix, factor in (('k', 1_000), ('m', 1_000_000)):
+        if text.endswith(suffix):
+            return int(float(text[:-1]) * factor)
+    return int(text)
+
+
+def size_label(size):
+    return SIZE_LABELS.get(size, str(size))
+
+
+def _sake_data(source):
+    return len(load_script('convert-excel-proper').convert_excel_to_sake_data(source) or [])
+
+
+def _sake_data_vectorized(source):
+    return len(load_script('convert-excel-proper').convert_excel_to_sake_data(source, vectorized=True) or [])
+
+
+def _sake_records(source):
+    return len(load_script('convert-excel-proper').convert_excel_to_sake_data(source, vectorized=True, records=True) or [])
+
+
+def _excel_to_json(source):
+    # 汎用変換は1行目（タイトル行）を見出しとして読み、2行目の見出しも1件として変換するので、
+    # その1件を除いてデータ行の数にそろえる
+    sake_data = load_script('convert-excel-to-json').convert_excel_to_json(source) or []
+    return max(len(sake_data) - 1, 0)
+
+
+def _cuisine_data(source):
+    cuisine_data = load_script('extract-cuisine-data').extract_cuisine_matrix_data(source) or {}
+    return sum(len(dishes) for dishes in cuisine_data.values())
+
+
+def _cuisine_records(source):
+    cuisine_data = load_script('extract-cuisine-data').extract_cuisine_matrix_data(source, records=True) or {}
+    return sum(len(dishes) for dishes in cuisine_data.values())
+
+
+def _validate_workbook(source):
+    from matrix_validation import validate_workbook
+    return sum(validate_workbook(source).rows_checked.values())
+
+
+def _similar_sakes(source):
+    from similar_sakes import SimilarSakeIndex
+    sake_data = load_script('convert-excel-proper').convert_excel_to_sake_data(source, vectorized=True) or []
+    SimilarSakeIndex.from_sakes(sake_data).all_neighbors()
+    return len(sake_data)
+
+
+# 段階名 → (実行する関数, 対応する入力形式)
+STAGES = {
+    'convert_excel_to_sake_data': (_sake_data, ('xlsx', 'csv')),
+    'convert_excel_to_sake_data[vectorized]': (_sake_data_vectorized, ('xlsx', 'csv')),
+    # vectorized で records.SakeRecord を作る（dict との最大メモリの比較用）
+    'convert_excel_to_sake_data[records]': (_sake_records, ('xlsx', 'csv')),
+    # 汎用変換は1行目を見出しとして読むため、ワークブックのレイアウト専用
+    'convert_excel_to_json': (_excel_to_json, ('xlsx',)),
+    'extract_cuisine_matrix_data': (_cuisine_data, ('xlsx', 'csv')),
+    'extract_cuisine_matrix_data[records]': (_cuisine_records, ('xlsx', 'csv')),
+    'validate_workbook': (_validate_workbook, ('xlsx', 'csv')),
+    # 変換（vectorized）+ 類似酒の上位k件
+    'similar_sakes': (_similar_sakes, ('xlsx', 'csv')),
+}
+
+
+def _peak_rss_bytes():
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux はKB単位、macOS はバイト単位
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _run_stage(stage, source, connection):
+    """子プロセスで1段階を実行し、計測結果を親プロセスに送る"""
+    os.environ[SHEET_CACHE_ENV] = ''
+    try:
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            start = time.perf_counter()
+            rows = STAGES[stage][0](source)
+            elapsed = time.perf_counter() - start
+        connection.send({'rows': rows, 'seconds': elapsed, 'peak_rss_bytes': _peak_rss_bytes()})
+    except Exception as e:
+        connection.send({'error': f"{type(e).__name__}: {e}"})
+    finally:
+        connection.close()
+
+
+def measure_stage(stage, source):
+    """1段階を新しいプロセスで実行して計測する"""
+    context = multiprocessing.get_context('spawn')
+    parent, child = context.Pipe(duplex=False)
+    process = context.Process(target=_run_stage, args=(stage, source, child))
+    process.start()
+    child.close()
+    result = parent.recv() if parent.poll(None) else {'error': 'no result'}
+    process.join()
+    if 'error' not in result:
+        result['rows_per_second'] = result['rows'] / result['seconds'] if result['seconds'] > 0 else None
+    return result
+
+
+def prepare_inputs(work_dir, size, seed=0, formats=('xlsx', 'csv')):
+    """合成データを作成する（同じ行数・シードのものが作成済みなら再利用する）"""
+    os.makedirs(work_dir, exist_ok=True)
+    inputs = {}
+    base = os.path.join(work_dir, f"matrix-{size_label(size)}-seed{seed}")
+    if 'xlsx' in formats:
+        workbook_path = base + '.xlsx'
+        if not os.path.exists(workbook_path):
+            write_synthetic_workbook(workbook_path + '.tmp', size, seed=seed)
+            os.replace(workbook_path + '.tmp', workbook_path)
+        inputs['xlsx'] = workbook_path
+    if 'csv' in formats:
+        csv_dir = base + '-csv'
+        if not os.path.isdir(csv_dir):
+            write_synthetic_csv(csv_dir + '.tmp', size, seed=seed)
+            os.replace(csv_dir + '.tmp', csv_dir)
+        inputs['csv'] = csv_dir
+    return inputs
+
+
+def run_benchmarks(sizes, work_dir, stages=None, formats=('xlsx', 'csv'), seed=0, report=print):
+    """サイズ × 入力形式 × 段階 の組み合わせを計測し、結果の一覧を返す"""
+    results = []
+    for size in sizes:
+        report(f"\n=== {size_label(size)}行 ===")
+        started = time.perf_counter()
+        inputs = prepare_inputs(work_dir, size, seed, formats)
+        report(f"合成データ準備: {time.perf_counter() - started:.1f}秒")
+        for input_format, source in inputs.items():
+            for stage, (_, supported_formats) in STAGES.items():
+                if (stages and stage not in stages) or input_format not in supported_formats:
+                    continue
+                result = measure_stage(stage, source)
+                result.update({'size': size, 'format': input_format, 'stage': stage})
+                results.append(result)
+                report(format_result(result))
+    return results
+
+
+def format_result(result):
+    label = f"{result['stage']:<42} {result['format']:<4} {size_label(result['size']):>5}"
+    if 'error' in result:
+        return f"{label}  エラー: {result['error']}"
+    return (f"{label}  {result['seconds']:8.2f}秒  {result['rows_per_second'] or 0:12,.0f}行/秒  "
+            f"ピークRSS {result['peak_rss_bytes'] / 2**20:8.1f}MB")
+
+
+def _cpu_model():
+    """CPUの型番（Linux は /proc/cpuinfo から。取れなければ platform.processor()）"""
+    try:
+        with open('/proc/cpuinfo', encoding='utf-8') as f:
+            for line in f:
+                if line.startswith('model name'):
+                    return line.split(':', 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor()
+
+
+def environment_info():
+    """計測したマシンの情報（基準値と比べられるのは、これがすべて同じ場合だけ）"""
+    return {
+        'host': platform.node(),
+        'cpu': _cpu_model(),
+        'cpu_count': os.cpu_count(),
+        'machine': platform.machine(),
+        'platform': platform.platform(),
+        'python': platform.python_version(),
+    }
+
+
+def _result_key(result):
+    return f"{result['stage']}|{result['format']}|{result['size']}"
+
+
+def build_baseline(results):
+    return {
+        'version': BASELINE_VERSION,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'environment': environment_info(),
+        'results': {
+            _result_key(result): {key: result[key] for key in ('rows', 'seconds', 'rows_per_second', 'peak_rss_bytes')}
+            for result in results if 'error' not in result
+        },
+    }
+
+
+def save_baseline(results, baseline_file):
+    with open(baseline_file, 'w', encoding='utf-8') as f:
+        json.dump(build_baseline(results), f, ensure_ascii=False, indent=2)
+        f.write('\n')
+
+
+class EnvironmentMismatch(Exception):
+    """基準値を計測したマシンと今回のマシンが違う"""
+
+    def __init__(self, differences):
+        self.differences = differences
+        super().__init__(', '.join(f"{key}: {previous} → {current}" for key, previous, current in differences))
+
+
+def compare_with_baseline(results, baseline_file, threshold=0.2):
+    """基準値と比べて、処理時間またはピークRSSが threshold の割合以上悪化した組み合わせを返す
+
+    処理時間はマシンによって変わるため、基準値と計測したマシン（environment_info）が
+    違う場合は比べずに EnvironmentMismatch を送出する。
+    """
+    with open(baseline_file, encoding='utf-8') as f:
+        saved = json.load(f)
+    environment = environment_info()
+    previous_environment = saved.get('environment', {})
+    differences = [(key, previous_environment.get(key), value) for key, value in environment.items()
+                   if previous_environment.get(key) != value]
+    if differences:
+        raise EnvironmentMismatch(differences)
+    baseline = saved['results']
+    regressions = []
+    for result in results:
+        previous = baseline.get(_result_key(result))
+        if previous is None or 'error' in result:
+            continue
+        for metric in ('seconds', 'peak_rss_bytes'):
+            if previous[metric] and result[metric] > previous[metric] * (1 + threshold):
+                regressions.append((result, metric, previous[metric], result[metric]))
+    return regressions
@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+"""診断の全回答パターン × 料理 × お酒 のおすすめを一括で事前計算する
+
+sake-recommender.ts の recommendSakes と同じ絞り込み・スコア計算を、
+回答パターン（行）× お酒（列）の行列演算でまとめて行い、
+回答パターンごとの上位k件をサイトからそのまま引ける表にする。
+
+recommend_sakes_reference は recommendSakes を1本ずつの処理のまま移植したもので、
+一括計算の結果と突き合わせる（build-recommendation-table.py --check）ために使う。
+"""
+import math
+
+import numpy as np
+
+from cuisine_aggregates import compute_cuisine_aggregates, cuisine_compatibility_ranges
+from dish_sake_index import convert_type_class
+from sweetness_table import get_sweetness_table
+
+# lib/types/diagnosis.ts の選択肢の重み（甘辛, 濃淡, 酸味, 香り）
+Q1_OPTION_WEIGHTS = {
+    'japanese': (0, 1, -1, 1),
+    'chinese': (0, 2, 0, 0),
+    'western': (0, 0, 1, 2),
+    'various': (0, 0, 0, 0),
+}
+
+# q2（料理の種類）は q1 で選んだ料理ジャンルごとに選択肢が変わる（cuisineSpecificOptions）
+Q2_OPTION_WEIGHTS = {
+    'japanese': {
+        'sashimi_sushi': (0, 1, 2, 0),
+        'nimono': (1, 1, 0, 1),
+        'yakimono': (0, 2, 1, 1),
+        'agemono': (0, 2, 1, 1),
+    },
+    'chinese': {
+        'tenshin': (2, 1, 1, 1),
+        'strong_taste': (-1, 3, 2, 0),
+        'light_taste': (1, 0, 0, 1),
+        'chinese_fried': (0, 2, 1, 0),
+    },
+    'western': {
+        'carpaccio_oyster': (1, -1, 2, 2),
+        'meat_dish': (0, 2, 1, 1),
+        'fish_dish': (1, 0, 1, 2),
+        'gibier': (1, 3, 2, 0),
+    },
+}
+
+Q3_OPTION_WEIGHTS = {
+    'amakuchi': (2.5, 0, 0, 0),
+    'karakuchi': (-2.5, 0, 0, 0),
+    'either': (0, 0, 0, 0),
+}
+
+# q4（香りの好み）は1〜10のスケール
+Q4_SCALE_VALUES = range(1, 11)
+
+# q4 が1〜4（香り控えめ好み）のときに除外する4タイプ分類
+LOW_AROMA_EXCLUDED_TYPES = ('薫酒', '熟酒')
+
+# 甘辛判定のカテゴリ
+KARAKUCHI = 1
+NEUTRAL = 0
+AMAKUCHI = -1
+
+
+def pattern_key(q1, q2, q3, q4):
+    """回答パターンの表のキー（q2 を答えない場合は空欄）"""
+    return f"{q1}:{q2 or ''}:{q3}:{q4}"
+
+
+def _clamp(value):
+    return max(1, min(10, value))
+
+
+def enumerate_answer_patterns():
+    """診断の回答パターンをすべて列挙する
+
+    診断結果の計算は diagnosis-form.tsx の calculateResult と同じ
+    （5から各選択肢の重みを足し、香りは q4 の値で置き換えて1〜10に収める）。
+    """
+    patterns = []
+    for q1, q1_weights in Q1_OPTION_WEIGHTS.items():
+        # 「色々な料理」の場合は q2 を聞かない
+        q2_options = Q2_OPTION_WEIGHTS.get(q1, {None: (0, 0, 0, 0)})
+        for q2, q2_weights in q2_options.items():
+            for q3, q3_weights in Q3_OPTION_WEIGHTS.items():
+                sweetness = 5 + q1_weights[0] + q2_weights[0] + q3_weights[0]
+                richness = 5 + q1_weights[1] + q2_weights[1] + q3_weights[1]
+                acidity = 5 + q1_weights[2] + q2_weights[2] + q3_weights[2]
+                for q4 in Q4_SCALE_VALUES:
+                    patterns.append({
+                        'key': pattern_key(q1, q2, q3, q4),
+                        'q1': q1,
+                        'q2': q2,
+                        'q3': q3,
+                        'q4': q4,
+                        'cuisine_type': q1,
+                        'specific_dish': q2,
+                        'diagnosis': (_clamp(sweetness), _clamp(richness), _clamp(acidity), _clamp(q4)),
+                    })
+    return patterns
+
+
+def sweetness_category(nihonshu_degree, acidity):
+    """judgeSweetnessByMatrix のカテゴリ（辛口 1 / 普通 0 / 甘口 -1、sweetness-table.json を引く）"""
+    return get_sweetness_table().category(nihonshu_degree, acidity)
+
+
+def _optional(sake, key, fallback):
+    # TS の `sake.key ?? fallback` と同じ（null/undefined のときだけ fallback）
+    value = sake.get(key)
+    return fallback if value is None else value
+
+
+def sake_matrix_columns(sakes):
+    """SakeProfile形式のお酒一覧から、スコア計算に使う列を取り出す"""
+    sweetness = np.array([sake['sweetness'] for sake in sakes], dtype=float)
+    acidity = np.array([sake['acidity'] for sake in sakes], dtype=float)
+    return {
+        'ids': [sake['id'] for sake in sakes],
+        'sweetness': sweetness,
+        'richness': np.array([sake['richness'] for sake in sakes], dtype=float),
+        'acidity': acidity,
+        'aroma': np.array([sake['aroma'] for sake in sakes], dtype=float),
+        'alcohol': np.array([sake['alcoholContent'] for sake in sakes], dtype=float),
+        # convertSweetnessToNihonshuDegree: (4 - sweetness) * 3
+        'nihonshu_degree': np.array([_optional(sake, 'nihonshuDegree', (4 - sake['sweetness']) * 3) for sake in sakes], dtype=float),
+        'real_acidity': np.array([_optional(sake, 'realAcidity', sake['acidity']) for sake in sakes], dtype=float),
+        'sake_type': np.array([sake.get('sakeTypeCategory') for sake in sakes], dtype=object),
+    }
+
+
+def _in_range(values, low, high):
+    return (values >= low) & (values <= high)
+
+
+def _partial_score(values, low, high, full, scale):
+    """範囲内なら満点、範囲外は近い方の端からの距離に応じて減点（0未満にはしない）"""
+    distance = np.minimum(np.abs(values - low), np.abs(values - high))
+    return np.where(_in_range(values, low, high), full, np.maximum(0, full - distance / scale))
+
+
+def _js_round(value):
+    # Math.round と同じ（0.5 は大きい方へ）
+    floored = math.floor(value)
+    return floored + (1 if value - floored >= 0.5 else 0)
+
+
+def js_round_1(values):
+    """Math.round(x * 10) / 10 と同じ丸め（0.5 は大きい方へ）"""
+    scaled = values * 10
+    floored = np.floor(scaled)
+    return (floored + (scaled - floored >= 0.5)) / 10
+
+
+class RecommendationEngine:
+    """お酒一覧（SakeProfile形式）と料理データ（extract-cuisine-data.py の形式）からおすすめを一括計算する"""
+
+    def __init__(self, sakes, dishes):
+        self.columns = sake_matrix_columns(sakes)
+        self.sake_count = len(sakes)
+        # dishCompatibilityData.find と同じく、同じIDは最初の料理を使う
+        self.dishes = {}
+        for dish in dishes:
+            self.dishes.setdefault(dish['id'], dish)
+        # 料理ジャンルの相性範囲（getCuisineCompatibilityRange と同じく料理データの平均）
+        self.cuisine_compatibility = cuisine_compatibility_ranges(compute_cuisine_aggregates(dishes))
+        self.sweetness_category = sweetness_category(self.columns['nihonshu_degree'], self.columns['real_acidity'])
+        self.low_aroma_excluded = np.array([value in LOW_AROMA_EXCLUDED_TYPES for value in self.columns['sake_type']], dtype=bool)
+
+    def _range_flags(self, compatibility):
+        columns = self.columns
+        return (
+            _in_range(columns['nihonshu_degree'], compatibility['sake_min_level'], compatibility['sake_max_level']),
+            _in_range(columns['real_acidity'], compatibility['acidity_min'], compatibility['acidity_max']),
+            _in_range(columns['alcohol'], compatibility['alcohol_min'], compatibility['alcohol_max']),
+        )
+
+    def _type_class_match(self, dish):
+        # isMatchingTypeClass: 4タイプ分類のないお酒は制限しない
+        sake_type = self.columns['sake_type']
+        match = np.array([not value for value in sake_type], dtype=bool)
+        for type_class in (dish['type_class1'], dish['type_class2']):
+            if type_class:
+                match |= sake_type == convert_type_class(type_class)
+        return match
+
+    def context_arrays(self, cuisine_type, specific_dish):
+        """料理の選択（q1, q2）ごとの (候補マスク, マトリックス適合度, 料理相性ボーナス)"""
+        columns = self.columns
+        zeros = np.zeros(self.sake_count)
+        if specific_dish:
+            dish = self.dishes.get(specific_dish)
+            if dish is None:
+                return np.zeros(self.sake_count, dtype=bool), zeros, zeros
+            compatibility = dish['compatibility']
+            sake_in_range, acidity_in_range, alcohol_in_range = self._range_flags(compatibility)
+            type_class_match = self._type_class_match(dish)
+            candidate = type_class_match | (sake_in_range & acidity_in_range & alcohol_in_range)
+            matrix_score = type_class_match * 10 + sake_in_range * 3 + acidity_in_range * 2 + alcohol_in_range * 1
+            # calculateSpecificDishCompatibility × 0.2
+            score = (_partial_score(columns['nihonshu_degree'], compatibility['sake_min_level'], compatibility['sake_max_level'], 4, 2)
+                     + _partial_score(columns['real_acidity'], compatibility['acidity_min'], compatibility['acidity_max'], 3, 1)
+                     + _partial_score(columns['alcohol'], compatibility['alcohol_min'], compatibility['alcohol_max'], 3, 2))
+            cuisine_bonus = score / 3 * (dish['match_bonus'] / 2.0) * 0.2
+            return candidate, matrix_score.astype(float), cuisine_bonus
+
+        if cuisine_type and cuisine_type != 'various':
+            compatibility = self.cuisine_compatibility.get(cuisine_type)
+            if compatibility is None:
+                return np.zeros(self.sake_count, dtype=bool), zeros, zeros
+            sake_in_range, acidity_in_range, alcohol_in_range = self._range_flags(compatibility)
+            # calculateCuisineCompatibility × 0.1
+            score = (_partial_score(columns['nihonshu_degree'], compatibility['sake_min_level'], compatibility['sake_max_level'], 3, 2)
+                     + _partial_score(columns['real_acidity'], compatibility['acidity_min'], compatibility['acidity_max'], 2, 1)
+                     + _partial_score(columns['alcohol'], compatibility['alcohol_min'], compatibility['alcohol_max'], 2, 2))
+            cuisine_bonus = score / 3 * compatibility['match_bonus'] * 0.1
+            return sake_in_range & acidity_in_range & alcohol_in_range, zeros, cuisine_bonus
+
+        return np.ones(self.sake_count, dtype=bool), zeros, zeros
+
+    def preference_filter(self, q3, q4):
+        """q3（甘辛）と q4（香り）による絞り込みのマスク"""
+        mask = np.ones(self.sake_count, dtype=bool)
+        if q3 == 'amakuchi':
+            mask &= self.sweetness_category != KARAKUCHI
+        elif q3 == 'karakuchi':
+            mask &= self.sweetness_category != AMAKUCHI
+        if q4 is not None and 1 <= q4 <= 4:
+            mask &= ~self.low_aroma_excluded
+        return mask
+
+    def user_preference_scores(self, diagnoses):
+        """calculateUserPreferenceScore を回答パターン（行）× お酒（列）で計算"""
+        columns = self.columns
+        diagnoses = np.asarray(diagnoses, dtype=float)
+        sweetness, richness, acidity, aroma = (diagnoses[:, i:i + 1] for i in range(4))
+        aroma_important = aroma >= 7
+        weights = {
+            'sweetness': np.where(aroma_important, 0.35, 0.4),
+            'aroma': np.where(aroma_important, 0.4, 0.3),
+            'richness': np.where(aroma_important, 0.15, 0.2),
+            'acidity': 0.1,
+        }
+        total = (np.maximum(0, 10 - np.abs(columns['sweetness'] - sweetness)) * weights['sweetness']
+                 + np.maximum(0, 10 - np.abs(columns['richness'] - richness)) * weights['richness']
+                 + np.maximum(0, 10 - np.abs(columns['aroma'] - aroma)) * weights['aroma']
+                 + np.maximum(0, 10 - np.abs(columns['acidity'] - acidity)) * weights['acidity'])
+        return js_round_1(total)
+
+    def _top_k(self, scores, mask, top_k):
+        """行ごとにスコアの高い順（同点はお酒一覧の順）で上位k件の列番号を返す"""
+        keys = np.where(mask, -scores, np.inf)
+        kth = min(top_k, self.sake_count) - 1
+        thresholds = np.partition(keys, kth, axis=1)[:, kth]
+        rows = []
+        for row_keys, threshold, count in zip(keys, thresholds, mask.sum(axis=1)):
+            index = np.flatnonzero(row_keys <= threshold)
+            index = index[np.lexsort((index, row_keys[index]))]
+            rows.append(index[:min(top_k, count)])
+        return rows
+
+    def build_table(self, top_k=3, block_cells=4_000_000):
+        """全回答パターンの上位k件の表を作る
+
+        戻り値は回答パターンのキー → {'diagnosis', 'cuisineType', 'specificDish', 'sakeIds', 'scores'}。
+        メモリ使用量を抑えるため、回答パターン数 × お酒の数が block_cells 程度になる単位で計算する。
+        """
+        table = {}
+        if self.sake_count == 0:
+            return table
+        patterns = enumerate_answer_patterns()
+        ids = np.array(self.columns['ids'], dtype=object)
+        block_rows = max(1, block_cells // self.sake_count)
+
+        contexts = {}
+        for pattern in patterns:
+            contexts.setdefault((pattern['cuisine_type'], pattern['specific_dish']), []).append(pattern)
+
+        for (cuisine_type, specific_dish), context_patterns in contexts.items():
+            candidate, matrix_score, cuisine_bonus = self.context_arrays(cuisine_type, specific_dish)
+            for start in range(0, len(context_patterns), block_rows):
+                block = context_patterns[start:start + block_rows]
+                mask = np.stack([candidate & self.preference_filter(p['q3'], p['q4']) for p in block])
+                # 候補がなくなった場合は全てのお酒から選ぶ
+                mask[~mask.any(axis=1)] = True
+                scores = matrix_score * 2.0 + self.user_preference_scores([p['diagnosis'] for p in block]) * 1.0 + cuisine_bonus
+                for pattern, row_scores, index in zip(block, scores, self._top_k(scores, mask, top_k)):
+                    table[pattern['key']] = {
+                        'diagnosis': list(pattern['diagnosis']),
+                        'cuisineType': cuisine_type,
+                        'specificDish': specific_dish,
+                        'sakeIds': ids[index].tolist(),
+                        'scores': row_scores[index].tolist(),
+                    }
+        return table
+
+
+def recommend_sakes_reference(sakes, dishes, pattern, count=3):
+    """recommendSakes を1本ずつの処理のまま移植したもの（一括計算の検証用）
+
+    [(お酒ID, スコア), ...] をスコアの高い順に返す。
+    """
+    dish_by_id = {}
+    for dish in dishes:
+        dish_by_id.setdefault(dish['id'], dish)
+    cuisine_compatibility = cuisine_compatibility_ranges(compute_cuisine_aggregates(dishes))
+    sweetness, richness, acidity, aroma = pattern['diagnosis']
+    cuisine_type = pattern['cuisine_type']
+    specific_dish = pattern['specific_dish']
+
+    def nihonshu_degree_of(sake):
+        return _optional(sake, 'nihonshuDegree', (4 - sake['sweetness']) * 3)
+
+    def real_acidity_of(sake):
+        return _optional(sake, 'realAcidity', sake['acidity'])
+
+    def range_flags(compatibility, sake):
+        nihonshu_degree = nihonshu_degree_of(sake)
+        real_acidity = real_acidity_of(sake)
+        return (
+            compatibility['sake_min_level'] <= nihonshu_degree <= compatibility['sake_max_level'],
+            compatibility['acidity_min'] <= real_acidity <= compatibility['acidity_max'],
+            compatibility['alcohol_min'] <= sake['alcoholContent'] <= compatibility['alcohol_max'],
+        )
+
+    def type_class_match(dish, sake):
+        sake_type = sake.get('sakeTypeCategory')
+        if not sake_type:
+            return True
+        return any(type_class and convert_type_class(type_class) == sake_type
+                   for type_class in (dish['type_class1'], dish['type_class2']))
+
+    def partial(value, low, high, full, scale):
+        if low <= value <= high:
+            return full
+        return max(0, full - min(abs(value - low), abs(value - high)) / scale)
+
+    def category_of(sake):
+        return int(sweetness_category(nihonshu_degree_of(sake), real_acidity_of(sake)))
+
+    if specific_dish:
+        dish = dish_by_id.get(specific_dish)
+        candidates = []
+        if dish is not None:
+            for sake in sakes:
+                flags = range_flags(dish['compatibility'], sake)
+                if type_class_match(dish, sake) or all(flags):
+                    candidates.append(sake)
+    elif cuisine_type and cuisine_type != 'various':
+        compatibility = cuisine_compatibility.get(cuisine_type)
+        candidates = [sake for sake in sakes if compatibility is not None and all(range_flags(compatibility, sake))]
+    else:
+        candidates = list(sakes)
+
+    if pattern['q3'] == 'amakuchi':
+        candidates = [sake for sake in candidates if category_of(sake) != KARAKUCHI]
+    elif pattern['q3'] == 'karakuchi':
+        candidates = [sake for sake in candidates if category_of(sake) != AMAKUCHI]
+
+    if pattern['q4'] is not None and 1 <= pattern['q4'] <= 4:
+        candidates = [sake for sake in candidates if sake.get('sakeTypeCategory') not in LOW_AROMA_EXCLUDED_TYPES]
+
+    if not candidates:
+        candidates = list(sakes)
+
+    aroma_important = aroma >= 7
+    weights = (0.35, 0.4, 0.15, 0.1) if aroma_important else (0.4, 0.3, 0.2, 0.1)
+    results = []
+    for sake in candidates:
+        matrix_score = 0
+        cuisine_bonus = 0
+        if specific_dish:
+            dish = dish_by_id.get(specific_dish)
+            if dish is not None:
+                compatibility = dish['compatibility']
+                sake_in_range, acidity_in_range, alcohol_in_range = range_flags(compatibility, sake)
+                matrix_score = ((10 if type_class_match(dish, sake) else 0) + (3 if sake_in_range else 0)
+                                + (2 if acidity_in_range else 0) + (1 if alcohol_in_range else 0))
+                score = (partial(nihonshu_degree_of(sake), compatibility['sake_min_level'], compatibility['sake_max_level'], 4, 2)
+                         + partial(real_acidity_of(sake), compatibility['acidity_min'], compatibility['acidity_max'], 3, 1)
+                         + partial(sake['alcoholContent'], compatibility['alcohol_min'], compatibility['alcohol_max'], 3, 2))
+                cuisine_bonus = score / 3 * (dish['match_bonus'] / 2.0) * 0.2
+        elif cuisine_type and cuisine_type != 'various':
+            compatibility = cuisine_compatibility[cuisine_type]
+            score = (partial(nihonshu_degree_of(sake), compatibility['sake_min_level'], compatibility['sake_max_level'], 3, 2)
+                     + partial(real_acidity_of(sake), compatibility['acidity_min'], compatibility['acidity_max'], 2, 1)
+                     + partial(sake['alcoholContent'], compatibility['alcohol_min'], compatibility['alcohol_max'], 2, 2))
+            cuisine_bonus = score / 3 * compatibility['match_bonus'] * 0.1
+
+        total = (max(0, 10 - abs(sake['sweetness'] - sweetness)) * weights[0]
+                 + max(0, 10 - abs(sake['richness'] - richness)) * weights[2]
+                 + max(0, 10 - abs(sake['aroma'] - aroma)) * weights[1]
+                 + max(0, 10 - abs(sake['acidity'] - acidity)) * weights[3])
+        user_preference_score = _js_round(total * 10) / 10
+        results.append((sake['id'], matrix_score * 2.0 + user_preference_score * 1.0 + cuisine_bonus))
+
+    # Array.prototype.sort は安定ソート
+    results.sort(key=lambda item: -item[1])
+    return results[:min(count, len(candidates))]
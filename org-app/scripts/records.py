@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""お酒・料理データの省メモリなレコード型
+
+変換結果を1件ごとの dict（タグの list、相性範囲の入れ子の dict を含む）で持つと、
+100万行規模のカタログではこれらのオブジェクトがメモリの大半を占める。
+ここでは __slots__ のレコード型で持ち、
+- 種類・都道府県・酒蔵名・説明文などの繰り返しの多い文字列は sys.intern で共有する
+- タグはビットフラグ（SAKE_TAGS の位置）の整数1つにする
+- 種類の少ない数値（度数・甘辛度など）は同じ値のオブジェクトを共有する
+- id と ecUrl は変換スクリプトの既定の形（sake001 と https://example-ec.com/sake001）なら番号だけを持つ
+ことで1件あたりのオブジェクトを減らす。
+
+既存の処理（sake['sweetness']、dish['compatibility']['acidity_min'] など）は
+そのまま読めるよう、レコードは dict と同じ名前で値を引ける（読み取りのみ）。
+to_dict は変換スクリプトの dict と同じ内容を、to_json は
+json.dumps(to_dict(), ensure_ascii=False, indent=2) と同じ文字列を返す。
+"""
+import json
+import math
+import sys
+from json.encoder import encode_basestring, encode_basestring_ascii
+
+# タグ（ビットの位置の順 = build_sake_item がタグを付ける順）
+SAKE_TAGS = ["辛口", "甘口", "コスパ良", "高級", "フルーティー", "華やか", "おすすめ"]
+TAG_BITS = {tag: 1 << position for position, tag in enumerate(SAKE_TAGS)}
+
+# SakeProfile の項目名（JSONのキーの順）→ 属性名
+SAKE_FIELDS = {
+    'id': 'id',
+    'name': 'name',
+    'brewery': 'brewery',
+    'price': 'price',
+    'alcoholContent': 'alcohol_content',
+    'riceMilling': 'rice_milling',
+    'sweetness': 'sweetness',
+    'richness': 'richness',
+    'acidity': 'acidity',
+    'aroma': 'aroma',
+    'type': 'type',
+    'prefecture': 'prefecture',
+    'description': 'description',
+    'ecUrl': 'ec_url',
+    'tags': 'tags',
+}
+# 変換スクリプトが作る id と ecUrl の形
+SAKE_ID_PREFIX = "sake"
+EC_URL_PREFIX = "https://example-ec.com/"
+# ecUrl が id から作った既定のURLであることを表す
+_DEFAULT_EC_URL = object()
+# 共有する数値の種類の上限（値の種類が多い項目で表が大きくなり続けないようにする）
+MAX_SHARED_NUMBERS = 4096
+
+COMPATIBILITY_FIELDS = ['sake_min_level', 'sake_max_level', 'acidity_min', 'acidity_max', 'alcohol_min', 'alcohol_max']
+DISH_FIELDS = ['id', 'name', 'cuisine_type', 'compatibility', 'type_class1', 'type_class2', 'match_bonus']
+
+
+def pack_tags(tags):
+    """タグのリスト → ビットフラグ（SAKE_TAGS にないタグや、SAKE_TAGS と異なる順の場合は ValueError）"""
+    bits = 0
+    for tag in tags:
+        bit = TAG_BITS.get(tag)
+        if bit is None or bit <= bits:
+            raise ValueError(f"タグ {tags} はビットフラグにできません")
+        bits |= bit
+    return bits
+
+
+_unpacked_tags = {}
+
+
+def unpack_tags(bits):
+    """ビットフラグ → タグのタプル（組み合わせごとに共有する）"""
+    tags = _unpacked_tags.get(bits)
+    if tags is None:
+        tags = tuple(tag for tag in SAKE_TAGS if bits & TAG_BITS[tag])
+        _unpacked_tags[bits] = tags
+    return tags
+
+
+_tags_json = {}
+
+
+def _tags_to_json(bits):
+    """タグのJSON（インデント2のレコード内の表現）"""
+    text = _tags_json.get(bits)
+    if text is None:
+        tags = unpack_tags(bits)
+        text = ('[\n' + ',\n'.join(f'    {encode_basestring(tag)}' for tag in tags) + '\n  ]') if tags else '[]'
+        _tags_json[bits] = text
+    return text
+
+
+def _intern(value):
+    return sys.intern(value) if type(value) is str else value
+
+
+_shared_numbers = {}
+
+
+def _share(value):
+    """同じ値の数値オブジェクトを共有する（0 と -0.0、NaN などはそのまま）"""
+    kind = type(value)
+    if (kind is float or kind is int) and value and value == value:
+        key = (kind, value)
+        shared = _shared_numbers.get(key)
+        if shared is not None:
+            return shared
+        if len(_shared_numbers) < MAX_SHARED_NUMBERS:
+            _shared_numbers[key] = value
+    return value
+
+
+def _pack_sake_id(sake_id):
+    """id が sake001 の形なら番号（int）、それ以外は文字列のまま"""
+    if type(sake_id) is str and sake_id.startswith(SAKE_ID_PREFIX):
+        digits = sake_id[len(SAKE_ID_PREFIX):]
+        if digits.isdecimal() and digits.isascii() and f"{SAKE_ID_PREFIX}{int(digits):03d}" == sake_id:
+            return int(digits)
+    return sake_id
+
+
+def _json_value(value, encode=encode_basestring):
+    """文字列・数値をJSONにする（json.dumps と同じ表現。ensure_ascii=True なら encode に encode_basestring_ascii）"""
+    if type(value) is str:
+        return encode(value)
+    if type(value) is float:
+        if math.isfinite(value):
+            return float.__repr__(value)
+        return 'NaN' if value != value else ('Infinity' if value > 0 else '-Infinity')
+    if value is None:
+        return 'null'
+    if value is True or value is False:
+        return 'true' if value else 'false'
+    return int.__repr__(value)
+
+
+class _MappingRecord:
+    """dict と同じ名前で値を引けるレコードの共通部分（読み取りのみ）"""
+    __slots__ = ()
+    _fields = {}
+
+    def __getitem__(self, key):
+        try:
+            attribute = self._fields[key]
+        except KeyError:
+            raise KeyError(key) from None
+        return getattr(self, attribute)
+
+    def get(self, key, default=None):
+        return getattr(self, self._fields[key]) if key in self._fields else default
+
+    def __contains__(self, key):
+        return key in self._fields
+
+    def keys(self):
+        return self._fields.keys()
+
+    def __eq__(self, other):
+        if isinstance(other, _MappingRecord):
+            other = other.to_dict()
+        return self.to_dict() == other
+
+    __hash__ = None
+
+
+class SakeRecord(_MappingRecord):
+    """SakeProfile 1件（convert-excel-proper の sake_item と同じ項目）"""
+    __slots__ = ('_id', 'name', 'brewery', 'price', 'alcohol_content', 'rice_milling', 'sweetness', 'richness',
+                 'acidity', 'aroma', 'type', 'prefecture', 'description', '_ec_url', 'tag_bits')
+    _fields = SAKE_FIELDS
+
+    def __init__(self, sake_id, name, brewery, price, alcohol_content, rice_milling, sweetness, richness, acidity,
+                 aroma, sake_type, prefecture, description, ec_url, tag_bits):
+        self._id = _pack_sake_id(sake_id)
+        self.name = name
+        self.brewery = _intern(brewery)
+        self.price = _share(price)
+        self.alcohol_content = _share(alcohol_content)
+        self.rice_milling = _share(rice_milling)
+        self.sweetness = _share(sweetness)
+        self.richness = _share(richness)
+        self.acidity = _share(acidity)
+        self.aroma = _share(aroma)
+        self.type = _intern(sake_type)
+        self.prefecture = _intern(prefecture)
+        self.description = _intern(description)
+        # id から作った既定のURLなら保持しない
+        self._ec_url = _DEFAULT_EC_URL if type(sake_id) is str and ec_url == EC_URL_PREFIX + sake_id else ec_url
+        self.tag_bits = tag_bits
+
+    @property
+    def id(self):
+        sake_id = self._id
+        return f"{SAKE_ID_PREFIX}{sake_id:03d}" if type(sake_id) is int else sake_id
+
+    @property
+    def ec_url(self):
+        return EC_URL_PREFIX + self.id if self._ec_url is _DEFAULT_EC_URL else self._ec_url
+
+    @classmethod
+    def from_dict(cls, sake):
+        return cls(sake['id'], sake['name'], sake['brewery'], sake['price'], sake['alcoholContent'],
+                   sake['riceMilling'], sake['sweetness'], sake['richness'], sake['acidity'], sake['aroma'],
+                   sake['type'], sake['prefecture'], sake['description'], sake['ecUrl'], pack_tags(sake['tags']))
+
+    @property
+    def tags(self):
+        return list(unpack_tags(self.tag_bits))
+
+    def to_dict(self):
+        sake_id = self.id
+        return {
+            "id": sake_id,
+            "name": self.name,
+            "brewery": self.brewery,
+            "price": self.price,
+            "alcoholContent": self.alcohol_content,
+            "riceMilling": self.rice_milling,
+            "sweetness": self.sweetness,
+            "richness": self.richness,
+            "acidity": self.acidity,
+            "aroma": self.aroma,
+            "type": self.type,
+            "prefecture": self.prefecture,
+            "description": self.description,
+            "ecUrl": EC_URL_PREFIX + sake_id if self._ec_url is _DEFAULT_EC_URL else self._ec_url,
+            "tags": self.tags,
+        }
+
+    def to_json(self, ensure_ascii=False):
+        """json.dumps(self.to_dict(), ensure_ascii=ensure_ascii, indent=2) と同じ文字列"""
+        if ensure_ascii:
+            return json.dumps(self.to_dict(), ensure_ascii=True, indent=2)
+        sake_id = self.id
+        ec_url = EC_URL_PREFIX + sake_id if self._ec_url is _DEFAULT_EC_URL else self._ec_url
+        return (
+            '{\n'
+            f'  "id": {_json_value(sake_id)},\n'
+            f'  "name": {_json_value(self.name)},\n'
+            f'  "brewery": {_json_value(self.brewery)},\n'
+            f'  "price": {_json_value(self.price)},\n'
+            f'  "alcoholContent": {_json_value(self.alcohol_content)},\n'
+            f'  "riceMilling": {_json_value(self.rice_milling)},\n'
+            f'  "sweetness": {_json_value(self.sweetness)},\n'
+            f'  "richness": {_json_value(self.richness)},\n'
+            f'  "acidity": {_json_value(self.acidity)},\n'
+            f'  "aroma": {_json_value(self.aroma)},\n'
+            f'  "type": {_json_value(self.type)},\n'
+            f'  "prefecture": {_json_value(self.prefecture)},\n'
+            f'  "description": {_json_value(self.description)},\n'
+            f'  "ecUrl": {_json_value(ec_url)},\n'
+            f'  "tags": {_tags_to_json(self.tag_bits)}\n'
+            '}'
+        )
+
+    def __repr__(self):
+        return f"SakeRecord({self.to_dict()!r})"
+
+
+class CompatibilityRecord(_MappingRecord):
+    """料理の相性範囲（dish['compatibility'] と同じ項目）"""
+    __slots__ = tuple(COMPATIBILITY_FIELDS)
+    _fields = {field: field for field in COMPATIBILITY_FIELDS}
+
+    def __init__(self, sake_min_level, sake_max_level, acidity_min, acidity_max, alcohol_min, alcohol_max):
+        self.sake_min_level = _share(sake_min_level)
+        self.sake_max_level = _share(sake_max_level)
+        self.acidity_min = _share(acidity_min)
+        self.acidity_max = _share(acidity_max)
+        self.alcohol_min = _share(alcohol_min)
+        self.alcohol_max = _share(alcohol_max)
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in COMPATIBILITY_FIELDS}
+
+
+class DishRecord(_MappingRecord):
+    """DishCompatibilityDetail 1件（extract-cuisine-data の dish_data と同じ項目）"""
+    __slots__ = tuple(DISH_FIELDS)
+    _fields = {field: field for field in DISH_FIELDS}
+
+    def __init__(self, id, name, cuisine_type, compatibility, type_class1, type_class2, match_bonus):
+        self.id = id
+        self.name = name
+        self.cuisine_type = _intern(cuisine_type)
+        self.compatibility = compatibility
+        self.type_class1 = _intern(type_class1)
+        self.type_class2 = _intern(type_class2)
+        self.match_bonus = _share(match_bonus)
+
+    @classmethod
+    def from_dict(cls, dish):
+        compatibility = dish['compatibility']
+        return cls(dish['id'], dish['name'], dish['cuisine_type'],
+                   CompatibilityRecord(compatibility['sake_min_level'], compatibility['sake_max_level'],
+                                       compatibility['acidity_min'], compatibility['acidity_max'],
+                                       compatibility['alcohol_min'], compatibility['alcohol_max']),
+                   dish['type_class1'], dish['type_class2'], dish['match_bonus'])
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'cuisine_type': self.cuisine_type,
+            'compatibility': self.compatibility.to_dict(),
+            'type_class1': self.type_class1,
+            'type_class2': self.type_class2,
+            'match_bonus': self.match_bonus,
+        }
+
+    def to_json(self, ensure_ascii=False):
+        """json.dumps(self.to_dict(), ensure_ascii=ensure_ascii, indent=2) と同じ文字列"""
+        encode = encode_basestring_ascii if ensure_ascii else encode_basestring
+        compatibility = self.compatibility
+        return (
+            '{\n'
+            f'  "id": {_json_value(self.id, encode)},\n'
+            f'  "name": {_json_value(self.name, encode)},\n'
+            f'  "cuisine_type": {_json_value(self.cuisine_type, encode)},\n'
+            '  "compatibility": {\n'
+            f'    "sake_min_level": {_json_value(compatibility.sake_min_level)},\n'
+            f'    "sake_max_level": {_json_value(compatibility.sake_max_level)},\n'
+            f'    "acidity_min": {_json_value(compatibility.acidity_min)},\n'
+            f'    "acidity_max": {_json_value(compatibility.acidity_max)},\n'
+            f'    "alcohol_min": {_json_value(compatibility.alcohol_min)},\n'
+            f'    "alcohol_max": {_json_value(compatibility.alcohol_max)}\n'
+            '  },\n'
+            f'  "type_class1": {_json_value(self.type_class1, encode)},\n'
+            f'  "type_class2": {_json_value(self.type_class2, encode)},\n'
+            f'  "match_bonus": {_json_value(self.match_bonus)}\n'
+            '}'
+        )
+
+    def __repr__(self):
+        return f"DishRecord({self.to_dict()!r})"
+
+
+def record_to_json(record, ensure_ascii=False):
+    """レコード・dict のどちらでも json.dumps(record, ensure_ascii=ensure_ascii, indent=2) と同じ文字列にする"""
+    if isinstance(record, _MappingRecord):
+        return record.to_json(ensure_ascii)
+    return json.dumps(record, ensure_ascii=ensure_ascii, indent=2)
+
+
+def iter_grouped_json(groups, ensure_ascii=False):
+    """{キー: [レコード, ...]} を json.dumps(groups, ensure_ascii=ensure_ascii, indent=2) と同じ断片で返す
+
+    全体を1つの文字列にせずに書き出せる。
+    """
+    if not groups:
+        yield '{}'
+        return
+    encode = encode_basestring_ascii if ensure_ascii else encode_basestring
+    for position, (key, records) in enumerate(groups.items()):
+        yield ('{\n  ' if position == 0 else ',\n  ') + encode(key) + ': '
+        if not records:
+            yield '[]'
+            continue
+        for index, record in enumerate(records):
+            yield ('[\n    ' if index == 0 else ',\n    ') + record_to_json(record, ensure_ascii).replace('\n', '\n    ')
+        yield '\n  ]'
+    yield '\n}'
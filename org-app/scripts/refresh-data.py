@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""お酒データと料理相性データをまとめて再生成する
+
+convert-excel-proper.py と extract-cuisine-data.py を同じプロセスで実行し、
+ワークブックの読み込み結果（workbook_loader のキャッシュ）を共有する。
+"""
+import sys
+
+from run_instrumentation import get_logger, instrumented_run, parse_instrumentation_args
+from script_loader import load_script
+from workbook_loader import DEFAULT_EXCEL_FILE, clear_workbook_cache, get_workbook
+
+REFRESH_STAGES = [
+    'convert-excel-proper',
+    'extract-cuisine-data',
+]
+
+logger = get_logger('refresh-data')
+
+
+def refresh_all(excel_file=DEFAULT_EXCEL_FILE, read_only=False, incremental=False, show_diff=False, validate=True):
+    if read_only:
+        # 先に読み取り専用モードのローダーを登録しておき、各段階で共有する
+        get_workbook(excel_file, read_only=True)
+    try:
+        for script_name in REFRESH_STAGES:
+            logger.info(f"##### {script_name} #####")
+            load_script(script_name).main(excel_file, incremental=incremental, show_diff=show_diff, validate=validate)
+    finally:
+        clear_workbook_cache()
+
+
+if __name__ == "__main__":
+    # 計測・ログのオプション（--report FILE など）は2つの段階をまとめた1回の実行として扱う
+    argv, instrumentation_options = parse_instrumentation_args(sys.argv[1:])
+    args = [arg for arg in argv if not arg.startswith('--')]
+    with instrumented_run('refresh-data', **instrumentation_options):
+        refresh_all(args[0] if args else DEFAULT_EXCEL_FILE, read_only='--read-only' in argv,
+                    incremental='--incremental' in argv, show_diff='--diff' in argv,
+                    validate='--no-validate' not in argv)
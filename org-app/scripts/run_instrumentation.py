@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""変換スクリプトの計測（段階ごとの処理時間・件数）とログ出力
+
+各スクリプトは進捗を print で出力していたが、全件の出力は大きな入力では
+それ自体が重く、どこに時間がかかっているかも分からない。
+
+- 段階ごとの処理時間（stage）と件数（count）を記録する。段階が入れ子になった
+  場合は内側の時間を外側から除くので、各段階の時間の合計が実行時間を超えない
+- 記録はチャンク・シート単位で行い、1件ごとには行わない
+- 1件ごとの内容は DEBUG レベルのログにし、既定の INFO では出力しない
+- --profile で cProfile、--trace-memory で tracemalloc の結果をレポートに含める
+- --report FILE で実行レポート（JSON）を保存する
+
+使い方（各スクリプト共通のオプション）:
+    --log-level LEVEL  (DEBUG / INFO / WARNING / ERROR、既定は INFO)
+    --verbose          (--log-level DEBUG と同じ)
+    --quiet            (--log-level WARNING と同じ)
+    --profile
+    --trace-memory
+    --report FILE
+"""
+import contextlib
+import json
+import logging
+import os
+import sys
+import time
+
+LOGGER_NAME = 'org_app'
+PROFILE_TOP_COUNT = 20
+MEMORY_TOP_COUNT = 10
+
+
+def get_logger(name):
+    """スクリプトごとのロガー（org_app.<name>）"""
+    return logging.getLogger(f"{LOGGER_NAME}.{name}")
+
+
+def configure_logging(level='INFO'):
+    """ログをこれまでの print と同じく標準出力にメッセージだけで出力する"""
+    logger = logging.getLogger(LOGGER_NAME)
+    if not logger.handlers:
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+        logger.propagate = False
+    logger.setLevel(level.upper() if isinstance(level, str) else level)
+
+
+class RunInstrumentation:
+    """1回の実行の段階ごとの処理時間と件数を記録する"""
+
+    def __init__(self):
+        self.started_at = time.time()
+        self._started = time.perf_counter()
+        self.stages = {}
+        self.counters = {}
+        self._stack = []
+        self._finished = None
+        self.profile = None
+        self.memory = None
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """with 文の中の処理時間を name の段階に加える（入れ子の段階の時間は除く）"""
+        now = time.perf_counter()
+        if self._stack:
+            parent = self._stack[-1]
+            self.stages[parent[0]]['seconds'] += now - parent[1]
+        entry = self.stages.setdefault(name, {'seconds': 0.0, 'calls': 0})
+        entry['calls'] += 1
+        self._stack.append([name, now])
+        try:
+            yield
+        finally:
+            now = time.perf_counter()
+            _, started = self._stack.pop()
+            entry['seconds'] += now - started
+            if self._stack:
+                self._stack[-1][1] = now
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    @contextlib.contextmanager
+    def profiling(self, profile=False, trace_memory=False):
+        """with 文の中を cProfile・tracemalloc で計測し、結果を report に含める"""
+        profiler = None
+        if trace_memory:
+            import tracemalloc
+            tracemalloc.start()
+        if profile:
+            import cProfile
+            profiler = cProfile.Profile()
+            profiler.enable()
+        try:
+            yield
+        finally:
+            # 計測結果の集計にかかる時間は実行時間に含めない
+            self._finished = time.perf_counter()
+            if profiler is not None:
+                profiler.disable()
+                self.profile = _profile_summary(profiler)
+            if trace_memory:
+                self.memory = _memory_summary()
+                tracemalloc.stop()
+
+    def report(self):
+        """実行レポート（JSONにできる辞書）"""
+        total = (self._finished or time.perf_counter()) - self._started
+        stages = {name: {'seconds': round(entry['seconds'], 6), 'calls': entry['calls']}
+                  for name, entry in self.stages.items()}
+        report = {
+            'started_at': time.strftime('%Y-%m-%dT%H:%M:%S%z', time.localtime(self.started_at)),
+            'argv': sys.argv,
+            'total_seconds': round(total, 6),
+            'stages': stages,
+            'untracked_seconds': round(max(0.0, total - sum(entry['seconds'] for entry in self.stages.values())), 6),
+            'counters': dict(self.counters),
+            'peak_rss_bytes': _peak_rss_bytes(),
+        }
+        if self.profile is not None:
+            report['profile'] = self.profile
+        if self.memory is not None:
+            report['memory'] = self.memory
+        return report
+
+    def write_report(self, report_file, **extra):
+        report = dict(extra, **self.report())
+        with open(report_file, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+            f.write('\n')
+        return report
+
+
+def _profile_summary(profiler):
+    """累積時間の長い関数の上位"""
+    import pstats
+    stats = pstats.Stats(profiler)
+    rows = []
+    for (file_name, line, function), (_, calls, total_time, cumulative_time, _) in stats.stats.items():
+        rows.append({
+            'function': f"{os.path.basename(file_name)}:{line}({function})",
+            'calls': calls,
+            'total_seconds': round(total_time, 6),
+            'cumulative_seconds': round(cumulative_time, 6),
+        })
+    rows.sort(key=lambda row: row['cumulative_seconds'], reverse=True)
+    return rows[:PROFILE_TOP_COUNT]
+
+
+def _memory_summary():
+    """tracemalloc で計測したメモリ使用量と、確保量の多い行の上位"""
+    import tracemalloc
+    current, peak = tracemalloc.get_traced_memory()
+    statistics = tracemalloc.take_snapshot().statistics('lineno')[:MEMORY_TOP_COUNT]
+    return {
+        'current_bytes': current,
+        'peak_bytes': peak,
+        'top': [{'location': str(stat.traceback), 'size_bytes': stat.size, 'count': stat.count} for stat in statistics],
+    }
+
+
+def _peak_rss_bytes():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux はKB単位、macOS はバイト単位
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+_current = RunInstrumentation()
+
+
+def get_instrumentation():
+    return _current
+
+
+def stage(name):
+    """現在の実行の段階として処理時間を記録する（with stage('sheet_parse'): ...）"""
+    return _current.stage(name)
+
+
+def count(name, amount=1):
+    _current.count(name, amount)
+
+
+def parse_options(args, spec, defaults):
+    """コマンドライン引数を (残りの引数, オプション) に分ける（各スクリプト共通）
+
+    spec は「オプション名 → (キー, 変換)」の辞書。変換が関数なら次の引数を変換してキーに入れ
+    （既定値がリストのキーには追加する）、関数でなければその値をキーに入れる（値を取らないオプション）。
+    spec にない引数は残りの引数として順に返す。値がない・変換できない場合はメッセージを出して終了する。
+    """
+    remaining = []
+    options = {key: list(value) if isinstance(value, list) else value for key, value in defaults.items()}
+    args = iter(args)
+    for arg in args:
+        if arg not in spec:
+            remaining.append(arg)
+            continue
+        key, convert = spec[arg]
+        if not callable(convert):
+            options[key] = convert
+            continue
+        value = next(args, None)
+        if value is None:
+            sys.exit(f"{arg} には値を指定してください")
+        try:
+            value = convert(value)
+        except ValueError:
+            sys.exit(f"{arg} の値が正しくありません: {value}")
+        if isinstance(options.get(key), list):
+            options[key].append(value)
+        else:
+            options[key] = value
+    return remaining, options
+
+
+INSTRUMENTATION_OPTIONS = {
+    '--log-level': ('log_level', str.upper),
+    '--verbose': ('log_level', 'DEBUG'),
+    '--quiet': ('log_level', 'WARNING'),
+    '--profile': ('profile', True),
+    '--trace-memory': ('trace_memory', True),
+    '--report': ('report_file', str),
+}
+
+
+def parse_instrumentation_args(args):
+    """計測・ログのオプションを取り除き、(残りの引数, オプション) を返す"""
+    return parse_options(args, INSTRUMENTATION_OPTIONS,
+                         {'log_level': 'INFO', 'profile': False, 'trace_memory': False, 'report_file': None})
+
+
+@contextlib.contextmanager
+def instrumented_run(script_name, log_level='INFO', profile=False, trace_memory=False, report_file=None):
+    """スクリプトの実行全体を計測し、終了時に（指定があれば）実行レポートを保存する"""
+    global _current
+    configure_logging(log_level)
+    _current = RunInstrumentation()
+    logger = get_logger('instrumentation')
+    try:
+        with _current.profiling(profile=profile, trace_memory=trace_memory):
+            yield _current
+    finally:
+        report = _current.report()
+        if logger.isEnabledFor(logging.DEBUG):
+            for name, entry in report['stages'].items():
+                logger.debug(f"[計測] {name}: {entry['seconds']:.3f}秒（{entry['calls']}回）")
+            for name, value in report['counters'].items():
+                logger.debug(f"[計測] {name}: {value}")
+        if report_file:
+            _current.write_report(report_file, script=script_name)
+            logger.info(f"実行レポートを {report_file} に保存しました")
+        elif profile:
+            for row in report['profile']:
+                logger.info(f"{row['cumulative_seconds']:10.3f}秒 {row['calls']:>10} {row['function']}")
+        if trace_memory and not report_file:
+            logger.info(f"メモリ使用量のピーク（tracemalloc）: {report['memory']['peak_bytes'] / 2**20:.1f}MB")
@@ -0,0 +1,20 @@
+#!/usr/bin/env python3
+"""ハイフン区切りの変換スクリプトを他のスクリプトから呼び出すためのヘルパー"""
+import importlib.util
+import os
+import sys
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_script(script_name):
+    """ハイフン区切りのスクリプトをモジュールとして読み込む"""
+    module_name = script_name.replace('-', '_')
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    script_path = os.path.join(SCRIPTS_DIR, f"{script_name}.py")
+    spec = importlib.util.spec_from_file_location(module_name, script_path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+"""解析済みシートのディスクキャッシュ
+
+.xlsx の解析（excel_file.parse）は行数に比例して遅い（10万行で約25秒）ため、
+header=None で読み込んだシートのDataFrameを列ごとのバイナリとして保存しておき、
+次回以降の実行ではメモリマップで開いて解析を省略する。
+
+キャッシュはワークブックごとのディレクトリに置き、ワークブックの指紋（サイズ・更新時刻・
+SHA-256）で有効かどうかを判定する（conversion_manifest と同じく、サイズと更新時刻が
+一致すればハッシュ計算も省略する）。ワークブックが変わっていればキャッシュ全体を破棄する。
+指紋はワークブックを開く前に取り（pin_workbook）、解析中に保存された場合は
+古い内容に新しい指紋を付けないよう、その回はキャッシュに保存しない。
+保存先は環境変数 SAKE_SHEET_CACHE_DIR で変更でき、空文字列にするとキャッシュを使わない。
+
+シートファイルのレイアウト（columnar_format のバイナリ形式と同じ構成）:
+    MAGIC (8バイト) | ヘッダー長 (uint32) | ヘッダーJSON | パディング | データ領域
+数値列はそのままの型付き配列、文字列・混在の列は値の種類・数値・文字列（オフセット + UTF-8）の
+配列で持つ。どの列も行ごとに固定の位置から読めるので、一部の行・列だけを取り出せる。
+"""
+import datetime
+import hashlib
+import json
+import os
+import shutil
+import struct
+
+import numpy as np
+
+from conversion_manifest import source_sha256, source_stat
+from run_instrumentation import count, stage
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SHEET_CACHE_DIR = os.path.join(SCRIPTS_DIR, '..', '.sheet-cache')
+SHEET_CACHE_ENV = 'SAKE_SHEET_CACHE_DIR'
+
+MAGIC = b'ORGSHT01'
+CACHE_VERSION = 1
+ALIGNMENT = 8
+META_FILE = 'meta.json'
+
+# 混在の列の値の種類
+TAG_NONE = 0
+TAG_INT = 1
+TAG_FLOAT = 2
+TAG_BOOL = 3
+TAG_STRING = 4
+TAG_DATETIME = 5
+TAG_TIMESTAMP = 6
+TAG_TIME = 7
+
+
+class UnsupportedSheet(Exception):
+    """キャッシュに保存できない値・型を含むシート"""
+
+
+def resolve_sheet_cache_dir(cache_dir=None):
+    """キャッシュの保存先（None ならキャッシュを使わない）
+
+    cache_dir を省略した場合は環境変数 SAKE_SHEET_CACHE_DIR、なければ org-app/.sheet-cache。
+    """
+    if cache_dir is None:
+        cache_dir = os.environ.get(SHEET_CACHE_ENV, DEFAULT_SHEET_CACHE_DIR)
+    return os.path.abspath(cache_dir) if cache_dir else None
+
+
+def _align(size):
+    return (size + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def _dtype_spec(dtype):
+    """列の型 → JSONにできる表現"""
+    import pandas as pd
+    if isinstance(dtype, pd.StringDtype):
+        return {'string': dtype.storage, 'na': 'NA' if dtype.na_value is pd.NA else 'nan'}
+    if isinstance(dtype, np.dtype):
+        if dtype == object:
+            return {'object': True}
+        if dtype.kind in 'iufbMm':
+            return {'numpy': dtype.str}
+    raise UnsupportedSheet(f"型 {dtype} の列はキャッシュできません")
+
+
+def _dtype_from_spec(spec):
+    import pandas as pd
+    if 'string' in spec:
+        return pd.StringDtype(storage=spec['string'], na_value=pd.NA if spec['na'] == 'NA' else np.nan)
+    if 'object' in spec:
+        return np.dtype(object)
+    return np.dtype(spec['numpy'])
+
+
+def _encode_values(values):
+    """混在の列の値 → (種類, 整数, 浮動小数点数, 文字列のオフセット, 文字列のバイト列)"""
+    tags = np.zeros(len(values), dtype='u1')
+    integers = np.zeros(len(values), dtype='<i8')
+    numbers = np.zeros(len(values), dtype='<f8')
+    lengths = np.zeros(len(values), dtype='<i8')
+    encoded = []
+    for position, value in enumerate(values):
+        if value is None:
+            continue
+        if isinstance(value, (bool, np.bool_)):
+            tags[position], integers[position] = TAG_BOOL, int(value)
+        elif isinstance(value, (int, np.integer)):
+            if not -2 ** 63 <= value < 2 ** 63:
+                raise UnsupportedSheet(f"整数 {value} はキャッシュできません")
+            tags[position], integers[position] = TAG_INT, value
+        elif isinstance(value, (float, np.floating)):
+            tags[position], numbers[position] = TAG_FLOAT, value
+        else:
+            if isinstance(value, str):
+                tag, text = TAG_STRING, value
+            elif type(value).__name__ == 'Timestamp':
+                tag, text = TAG_TIMESTAMP, value.isoformat()
+            elif isinstance(value, datetime.datetime):
+                tag, text = TAG_DATETIME, value.isoformat()
+            elif isinstance(value, datetime.time):
+                tag, text = TAG_TIME, value.isoformat()
+            else:
+                raise UnsupportedSheet(f"{type(value).__name__} の値はキャッシュできません")
+            data = text.encode('utf-8')
+            tags[position], lengths[position] = tag, len(data)
+            encoded.append(data)
+    offsets = np.zeros(len(values) + 1, dtype='<i8')
+    np.cumsum(lengths, out=offsets[1:])
+    return tags, integers, numbers, offsets, np.frombuffer(b''.join(encoded), dtype='u1')
+
+
+def write_sheet_file(frame, output_file):
+    """header=None で読み込んだシートのDataFrameをキャッシュファイルに書き出す"""
+    import pandas as pd
+    if not isinstance(frame.index, pd.RangeIndex) or frame.index.start != 0 or frame.index.step != 1:
+        raise UnsupportedSheet("行番号が0からの連番ではありません")
+    labels = frame.columns.tolist()
+    if labels != list(range(len(labels))):
+        raise UnsupportedSheet("列番号が0からの連番ではありません")
+
+    buffers = []
+    offset = 0
+
+    def add_buffer(array):
+        nonlocal offset
+        array = np.ascontiguousarray(array)
+        entry = {'offset': offset, 'dtype': array.dtype.str, 'length': len(array)}
+        buffers.append((offset, array.tobytes()))
+        offset = _align(offset + array.nbytes)
+        return entry
+
+    columns = []
+    for position in range(len(labels)):
+        series = frame.iloc[:, position]
+        spec = _dtype_spec(series.dtype)
+        column = {'dtype': spec}
+        if 'numpy' in spec:
+            column['data'] = add_buffer(series.to_numpy())
+        else:
+            tags, integers, numbers, offsets, strings = _encode_values(series.to_numpy(dtype=object))
+            column.update({
+                'tags': add_buffer(tags),
+                'integers': add_buffer(integers),
+                'numbers': add_buffer(numbers),
+                'offsets': add_buffer(offsets),
+                'strings': add_buffer(strings),
+            })
+        columns.append(column)
+
+    header_bytes = json.dumps({
+        'version': CACHE_VERSION,
+        'rows': len(frame),
+        'columns': columns,
+    }, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    data_start = _align(len(MAGIC) + 4 + len(header_bytes))
+
+    # 書き込み途中のファイルを読まないよう、一時ファイルに書いてから置き換える
+    temporary_file = f"{output_file}.{os.getpid()}.tmp"
+    with open(temporary_file, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<I', len(header_bytes)))
+        f.write(header_bytes)
+        f.write(b'\0' * (data_start - f.tell()))
+        for buffer_offset, data in buffers:
+            f.write(b'\0' * (data_start + buffer_offset - f.tell()))
+            f.write(data)
+        f.write(b'\0' * (data_start + offset - f.tell()))
+    os.replace(temporary_file, output_file)
+    return data_start + offset
+
+
+class CachedSheet:
+    """メモリマップで開いたキャッシュ済みシート
+
+    to_frame は指定した行・列の範囲だけを復元する（数値列は必要な範囲だけコピーし、
+    文字列は表示する行の分だけ復号する）。
+    """
+
+    def __init__(self, path):
+        raw = np.memmap(path, dtype='u1', mode='r')
+        if raw[:len(MAGIC)].tobytes() != MAGIC:
+            raise ValueError(f"シートキャッシュの形式ではありません: {path}")
+        header_length = struct.unpack('<I', raw[len(MAGIC):len(MAGIC) + 4].tobytes())[0]
+        header_end = len(MAGIC) + 4 + header_length
+        self.header = json.loads(raw[len(MAGIC) + 4:header_end].tobytes().decode('utf-8'))
+        self._buffer = raw[_align(header_end):]
+
+    @property
+    def shape(self):
+        return self.header['rows'], len(self.header['columns'])
+
+    def _array(self, entry, start=0, stop=None):
+        stop = entry['length'] if stop is None else stop
+        itemsize = np.dtype(entry['dtype']).itemsize
+        return np.frombuffer(self._buffer, dtype=entry['dtype'], count=stop - start,
+                             offset=entry['offset'] + start * itemsize)
+
+    def _column_values(self, column, start, stop):
+        spec = column['dtype']
+        if 'numpy' in spec:
+            return self._array(column['data'], start, stop).copy()
+
+        tags = self._array(column['tags'], start, stop)
+        values = np.full(len(tags), None, dtype=object)
+        for tag, source in ((TAG_INT, 'integers'), (TAG_FLOAT, 'numbers'), (TAG_BOOL, 'integers')):
+            mask = tags == tag
+            if mask.any():
+                selected = self._array(column[source], start, stop)[mask]
+                values[mask] = selected.astype(bool).tolist() if tag == TAG_BOOL else selected.tolist()
+
+        text_positions = np.nonzero(tags >= TAG_STRING)[0]
+        if len(text_positions):
+            offsets = self._array(column['offsets'], start, stop + 1)
+            raw = self._array(column['strings'], offsets[0], offsets[-1]).tobytes()
+            base = offsets[0]
+            starts, ends = (offsets[:-1] - base).tolist(), (offsets[1:] - base).tolist()
+            texts = [raw[starts[i]:ends[i]].decode('utf-8') for i in text_positions.tolist()]
+            values[text_positions] = [self._restore_text(tag, text)
+                                      for tag, text in zip(tags[text_positions].tolist(), texts)]
+        return values
+
+    @staticmethod
+    def _restore_text(tag, text):
+        if tag == TAG_STRING:
+            return text
+        if tag == TAG_TIMESTAMP:
+            import pandas as pd
+            return pd.Timestamp(text)
+        if tag == TAG_DATETIME:
+            return datetime.datetime.fromisoformat(text)
+        return datetime.time.fromisoformat(text)
+
+    def to_frame(self, rows=None, columns=None):
+        """行 0〜rows-1・列 0〜columns-1 の範囲のDataFrame（省略した場合は全体）
+
+        全体を取り出した場合は、元の excel_file.parse(header=None) と同じ値・型になる。
+        """
+        import pandas as pd
+        row_count, column_count = self.shape
+        stop = row_count if rows is None else min(rows, row_count)
+        column_stop = column_count if columns is None else min(columns, column_count)
+        data = {}
+        for position in range(column_stop):
+            column = self.header['columns'][position]
+            data[position] = pd.Series(self._column_values(column, 0, stop), dtype=_dtype_from_spec(column['dtype']),
+                                       copy=False)
+        frame = pd.DataFrame(data, index=pd.RangeIndex(stop), columns=pd.Index(range(column_stop), dtype=np.int64))
+        return frame
+
+
+class SheetCache:
+    """1つのワークブックのシートキャッシュ（ディレクトリ）"""
+
+    def __init__(self, excel_file, cache_dir):
+        self.excel_file = os.path.abspath(excel_file)
+        key = hashlib.sha256(self.excel_file.encode('utf-8')).hexdigest()[:16]
+        self.directory = os.path.join(cache_dir, key)
+        self._meta = None
+        self._valid = None
+        self._pinned = None
+
+    def _meta_path(self):
+        return os.path.join(self.directory, META_FILE)
+
+    def _load_meta(self):
+        try:
+            with open(self._meta_path(), encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return meta if meta.get('version') == CACHE_VERSION and meta.get('path') == self.excel_file else None
+
+    def _save_meta(self):
+        os.makedirs(self.directory, exist_ok=True)
+        temporary_file = f"{self._meta_path()}.{os.getpid()}.tmp"
+        with open(temporary_file, 'w', encoding='utf-8') as f:
+            json.dump(self._meta, f, ensure_ascii=False, indent=2)
+        os.replace(temporary_file, self._meta_path())
+
+    def is_valid(self):
+        """キャッシュがワークブックの現在の内容のものか（1つの SheetCache では1度だけ判定する）"""
+        if self._valid is None:
+            self._meta = self._load_meta()
+            self._valid = False
+            if self._meta is not None and os.path.exists(self.excel_file):
+                recorded = self._meta['workbook']
+                size, mtime = source_stat(self.excel_file)
+                if recorded['size'] == size:
+                    if recorded['mtime'] == mtime:
+                        self._valid = True
+                    elif recorded['sha256'] == source_sha256(self.excel_file):
+                        # 内容が同じで更新時刻だけ変わった場合は、次回ハッシュを計算しないよう記録し直す
+                        recorded['mtime'] = mtime
+                        self._save_meta()
+                        self._valid = True
+        return self._valid
+
+    def pin_workbook(self):
+        """ワークブックを開く直前に呼び、これから解析する内容の指紋を記録する"""
+        if self.is_valid():
+            self._pinned = dict(self._meta['workbook'])
+            return
+        size, mtime = source_stat(self.excel_file)
+        digest = source_sha256(self.excel_file)
+        # ハッシュの計算中に保存された場合は、どちらの内容か分からないため記録しない
+        unchanged = source_stat(self.excel_file) == (size, mtime)
+        self._pinned = {'size': size, 'mtime': mtime, 'sha256': digest} if unchanged else None
+
+    def _unchanged_since_pin(self):
+        """開いた時点からワークブックが変わっていないか（変わっていれば解析結果は保存しない）"""
+        if self._pinned is None:
+            return False
+        try:
+            return source_stat(self.excel_file) == (self._pinned['size'], self._pinned['mtime'])
+        except OSError:
+            return False
+
+    def _reset(self):
+        """古いキャッシュを破棄し、開いた時点のワークブックの指紋で作り直す"""
+        shutil.rmtree(self.directory, ignore_errors=True)
+        self._meta = {
+            'version': CACHE_VERSION,
+            'path': self.excel_file,
+            'workbook': dict(self._pinned),
+            'sheetNames': None,
+            'sheets': {},
+        }
+        self._save_meta()
+        self._valid = True
+
+    @property
+    def sheet_names(self):
+        """キャッシュに記録したワークブックのシート名一覧（なければ None）"""
+        return self._meta['sheetNames'] if self.is_valid() else None
+
+    def store_sheet_names(self, sheet_names):
+        if not self._unchanged_since_pin():
+            return
+        if not self.is_valid():
+            self._reset()
+        self._meta['sheetNames'] = list(sheet_names)
+        self._save_meta()
+
+    def load(self, sheet_name):
+        """キャッシュ済みのシート（なければ None）"""
+        if not self.is_valid() or sheet_name not in self._meta['sheets']:
+            return None
+        path = os.path.join(self.directory, self._meta['sheets'][sheet_name])
+        try:
+            with stage('sheet_cache_load'):
+                sheet = CachedSheet(path)
+        except (OSError, ValueError):
+            return None
+        count('sheet_cache_hits')
+        return sheet
+
+    def store(self, sheet_name, frame):
+        """解析したシートを保存する（保存できない型を含む場合や、開いた後にワークブックが変わった場合は False）
+
+        pin_workbook の後にワークブックを開いて解析した結果を渡す。
+        """
+        if not self._unchanged_since_pin():
+            return False
+        if not self.is_valid():
+            self._reset()
+        file_name = f"sheet-{hashlib.sha256(sheet_name.encode('utf-8')).hexdigest()[:16]}.bin"
+        try:
+            with stage('sheet_cache_write'):
+                write_sheet_file(frame, os.path.join(self.directory, file_name))
+        except (UnsupportedSheet, OSError):
+            return False
+        self._meta['sheets'][sheet_name] = file_name
+        self._save_meta()
+        return True
+
+
+def open_sheet_cache(excel_file, cache_dir=None):
+    """ワークブックのシートキャッシュ（キャッシュを使わない設定なら None）"""
+    cache_dir = resolve_sheet_cache_dir(cache_dir)
+    return SheetCache(excel_file, cache_dir) if cache_dir else None
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""味わいが近いお酒（類似酒）の近傍探索
+
+SakeProfile の味わいの数値（甘辛度・コク・さっぱり度・香り・度数・精米歩合）を
+カタログ全体で標準化したベクトルにし、ユークリッド距離の近い順に上位k本を求める。
+
+変換後の値は刻みが粗く、同じベクトルのお酒が多い（10万本の合成カタログで約1.3万通り）。
+そこで同じベクトルを1つの代表にまとめ、代表どうしの距離だけをブロック単位のNumPy演算で
+総当たりする。結果は距離の近い順、同じ距離ならカタログの順（先に出てくるお酒が先）で、
+全件を1本ずつ比べて並べた場合（similar_sakes_reference）と同じになる。
+代表どうしの距離は行列積で近似して候補を絞り、候補だけ正確に計算し直す。
+"""
+import numpy as np
+
+# ベクトルにする SakeProfile の項目
+FLAVOR_FIELDS = ['sweetness', 'richness', 'acidity', 'aroma', 'alcoholContent', 'riceMilling']
+DEFAULT_TOP_K = 5
+# 1ブロックで計算する距離の数（ブロックの行数 × 代表ベクトルの数）
+BLOCK_ELEMENTS = 4_000_000
+
+
+def flavor_matrix(sakes, fields=FLAVOR_FIELDS):
+    """お酒一覧 → 味わいの数値の行列（お酒の数 × 項目数）"""
+    return np.array([[sake[field] for field in fields] for sake in sakes], dtype=float).reshape(len(sakes), len(fields))
+
+
+def _squared_distances(queries, vectors):
+    """クエリ × ベクトルの距離の2乗（項目ごとに順に足すので、同じ組み合わせは常に同じ値になる）"""
+    distances = np.zeros((len(queries), len(vectors)))
+    for field in range(vectors.shape[1]):
+        distances += np.square(queries[:, field, None] - vectors[None, :, field])
+    return distances
+
+
+def _pair_squared_distances(left, right):
+    """行ごとの組み合わせの距離の2乗（_squared_distances と同じ順に足す）"""
+    distances = np.zeros(len(left))
+    for field in range(left.shape[1]):
+        distances += np.square(left[:, field] - right[:, field])
+    return distances
+
+
+def _nearest_vectors(queries, vectors, norms, count):
+    """各クエリに近いベクトル count 個の (位置, 距離の2乗)（近い順、同じ距離なら位置の順）
+
+    行列積で求めた近似の距離で候補を絞り、候補だけ項目ごとの差から距離を計算し直す。
+    候補は近似の誤差より広めに取るので、結果は全件を正確に計算して並べた場合と同じになる。
+    """
+    # |q|^2 は行ごとに同じなので、順位を決めるには |x|^2 - 2 q・x だけでよい
+    approx = norms[None, :] - 2.0 * (queries @ vectors.T)
+    tolerance = 1e-9 * (1.0 + np.square(queries).sum(axis=1, keepdims=True) + norms.max())
+    kth = np.partition(approx, count - 1, axis=1)[:, count - 1:count]
+    rows, columns = np.nonzero(approx <= kth + tolerance)
+    exact = _pair_squared_distances(queries[rows], vectors[columns])
+    order = np.lexsort((columns, exact, rows))
+    rows, columns, exact = rows[order], columns[order], exact[order]
+    # 各行の先頭 count 個（どの行にも count 個以上の候補がある）
+    starts = np.searchsorted(rows, np.arange(len(queries)))
+    keep = np.arange(len(rows)) - starts[rows] < count
+    return columns[keep].reshape(len(queries), count), exact[keep].reshape(len(queries), count)
+
+
+class SimilarSakeIndex:
+    """類似酒の検索インデックス
+
+    from_sakes でカタログから作り、similar（カタログのお酒に近いお酒）・
+    query（任意の味わいに近いお酒）で引く。all_neighbors はカタログ全体の上位k本の表。
+    """
+
+    def __init__(self, ids, vectors, mean, scale, fields=FLAVOR_FIELDS):
+        self.ids = list(ids)
+        self.fields = list(fields)
+        self.mean = mean
+        self.scale = scale
+        self.positions = {sake_id: position for position, sake_id in enumerate(self.ids)}
+
+        # 同じベクトルは最初に出てくるお酒の順に代表へまとめる（代表の順 = カタログ上の最初の位置の順）
+        unique, first, inverse = np.unique(vectors, axis=0, return_index=True, return_inverse=True)
+        order = np.argsort(first)
+        rank = np.empty(len(order), dtype=np.int64)
+        rank[order] = np.arange(len(order))
+        self.vectors = vectors
+        self.unique_vectors = unique[order]
+        self.unique_of = rank[np.asarray(inverse).reshape(-1)]
+        self._unique_norms = np.square(self.unique_vectors).sum(axis=1)
+        by_unique = np.argsort(self.unique_of, kind='stable')
+        self._members = by_unique
+        self._member_starts = np.concatenate([[0], np.cumsum(np.bincount(self.unique_of, minlength=len(order)))])
+
+    @classmethod
+    def from_sakes(cls, sakes, fields=FLAVOR_FIELDS, weights=None):
+        """SakeProfile 形式のお酒一覧から作る
+
+        各項目はカタログ全体の平均・標準偏差で標準化する（全て同じ値の項目は距離に影響しない）。
+        weights（項目名 → 重み）を渡すと、標準化した値に重みを掛ける。
+        """
+        raw = flavor_matrix(sakes, fields)
+        mean = raw.mean(axis=0) if len(raw) else np.zeros(len(fields))
+        scale = raw.std(axis=0) if len(raw) else np.ones(len(fields))
+        scale[scale == 0] = 1.0
+        if weights:
+            scale = scale / np.array([weights.get(field, 1.0) for field in fields])
+        return cls([sake['id'] for sake in sakes], (raw - mean) / scale, mean, scale, fields)
+
+    def normalize(self, profile):
+        """味わいの数値（項目名 → 値の辞書や records.SakeRecord、または FLAVOR_FIELDS 順の並び）を標準化したベクトルにする"""
+        if hasattr(profile, 'keys'):
+            profile = [profile[field] for field in self.fields]
+        return (np.asarray(profile, dtype=float) - self.mean) / self.scale
+
+    def _members_of(self, unique_positions, count):
+        """代表ベクトルごとに、まとめたお酒の位置を先頭から count 本（足りない分は -1）"""
+        starts = self._member_starts[unique_positions]
+        sizes = self._member_starts[unique_positions + 1] - starts
+        offsets = np.arange(count)
+        members = self._members[np.minimum(starts[..., None] + offsets, len(self._members) - 1)]
+        return np.where(offsets < sizes[..., None], members, -1)
+
+    def _nearest(self, queries, count):
+        """各クエリに近いお酒の位置 count 本と距離（近い順、同じ距離ならカタログの順、足りない分は -1 / inf）
+
+        count 本のお酒は、近い代表 count 個にまとめたお酒のうち先頭 count 本ずつの中に必ず含まれる。
+        """
+        unique_count = min(count, len(self.unique_vectors))
+        block_size = max(1, BLOCK_ELEMENTS // max(1, len(self.unique_vectors)))
+        positions = np.full((len(queries), count), -1, dtype=np.int64)
+        distances = np.full((len(queries), count), np.inf)
+        for start in range(0, len(queries), block_size):
+            block = queries[start:start + block_size]
+            nearest, squared = _nearest_vectors(block, self.unique_vectors, self._unique_norms, unique_count)
+            members = self._members_of(nearest, count).reshape(len(block), -1)
+            member_distances = np.where(members >= 0, np.repeat(squared, count, axis=1), np.inf)
+            order = np.lexsort((np.where(members >= 0, members, len(self.ids)), member_distances), axis=1)[:, :count]
+            width = order.shape[1]
+            positions[start:start + len(block), :width] = np.take_along_axis(members, order, axis=1)
+            distances[start:start + len(block), :width] = np.sqrt(np.take_along_axis(member_distances, order, axis=1))
+        return positions, distances
+
+    def _results(self, positions, distances, top_k):
+        return [(self.ids[position], distance)
+                for position, distance in zip(positions[:top_k].tolist(), distances[:top_k].tolist()) if position >= 0]
+
+    def query(self, profile, top_k=DEFAULT_TOP_K):
+        """任意の味わい（normalize と同じ形式）に近いお酒の [(お酒ID, 距離), ...]"""
+        if not self.ids:
+            return []
+        positions, distances = self._nearest(self.normalize(profile)[None, :], top_k)
+        return self._results(positions[0], distances[0], top_k)
+
+    def similar(self, sake_id, top_k=DEFAULT_TOP_K):
+        """カタログのお酒に近い、ほかのお酒の [(お酒ID, 距離), ...]"""
+        position = self.positions[sake_id]
+        positions, distances = self._nearest(self.vectors[position][None, :], top_k + 1)
+        keep = positions[0] != position
+        return self._results(positions[0][keep], distances[0][keep], top_k)
+
+    def all_neighbors(self, top_k=DEFAULT_TOP_K):
+        """カタログ全体について、お酒ごとの上位 top_k 本の (位置, 距離) の配列（お酒の数 × top_k）
+
+        同じベクトルのお酒は結果も（自分自身を除いて）同じなので、代表ベクトルごとに1度だけ探す。
+        """
+        positions, distances = self._nearest(self.unique_vectors, top_k + 1)
+        positions, distances = positions[self.unique_of], distances[self.unique_of]
+        # 自分自身を末尾に回してから先頭 top_k 本を取る
+        is_self = positions == np.arange(len(self.ids))[:, None]
+        order = np.argsort(is_self, axis=1, kind='stable')[:, :top_k]
+        return np.take_along_axis(positions, order, axis=1), np.take_along_axis(distances, order, axis=1)
+
+    def neighbor_table(self, top_k=DEFAULT_TOP_K, digits=4):
+        """お酒ID → {'sakeIds': [...], 'distances': [...]} の表"""
+        positions, distances = self.all_neighbors(top_k)
+        table = {}
+        for sake_id, row, row_distances in zip(self.ids, positions.tolist(), np.round(distances, digits).tolist()):
+            table[sake_id] = {
+                'sakeIds': [self.ids[position] for position in row if position >= 0],
+                'distances': [distance for position, distance in zip(row, row_distances) if position >= 0],
+            }
+        return table
+
+
+def similar_sakes_reference(index, sake_id, top_k=DEFAULT_TOP_K):
+    """全件との距離を1本ずつ並べて求める、類似酒の上位 top_k 本（結果の確認用）"""
+    position = index.positions[sake_id]
+    squared = _squared_distances(index.vectors[position][None, :], index.vectors)[0]
+    order = np.lexsort((np.arange(len(squared)), squared))
+    order = order[order != position][:top_k]
+    return [(index.ids[other], distance) for other, distance in zip(order.tolist(), np.sqrt(squared[order]).tolist())]
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""日本酒度・酸度による辛甘判定の表
+
+判定基準は lib/data/sweetness-rules.json の1か所で定義し、build-sweetness-table.py が
+(日本酒度, 酸度) を step（0.1）刻みにした格子ごとの判定を sweetness-table.json に書き出す。
+TS（lib/utils/sake-sweetness-calculator.ts）とPythonはどちらもこの表を引くので、
+判定は配列の参照1回になり、両者の結果が食い違うこともない。
+
+値は step 単位に切り捨てて格子のマス目にする（1.44 → 1.4 のマス）。判定基準の境界は
+すべて step の倍数なので、マス目の中では判定が変わらず、表は基準の比較と同じ結果になる。
+浮動小数点の誤差（1.4999999 など）は 1/1000 マス未満を丸めてから切り捨てる。
+表の範囲の外は判定が変わらないので、端のマス目を使う。
+"""
+import json
+import math
+import os
+
+import numpy as np
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+RULES_FILE = os.path.join(SCRIPTS_DIR, '..', 'lib', 'data', 'sweetness-rules.json')
+TABLE_FILE = os.path.join(SCRIPTS_DIR, '..', 'lib', 'data', 'sweetness-table.json')
+TABLE_VERSION = 1
+
+# 判定のカテゴリ → コード（recommendation_engine の KARAKUCHI / NEUTRAL / AMAKUCHI と同じ）
+CATEGORY_CODES = {'karakuchi': 1, 'neutral': 0, 'amakuchi': -1}
+# マス目にする前に丸める桁数（1マスの 1/1000）
+QUANTIZE_PRECISION = 1000
+# 表の範囲より十分外にあるマス目の番号（NaN・無限大の値に使う）
+_OUTSIDE_UNIT = 2 ** 31
+
+
+def _grid_units(value, units_per_point):
+    """基準値を格子の単位（整数）にする（step の倍数でなければ表が基準と一致しないのでエラー）"""
+    units = round(value * units_per_point)
+    if abs(value * units_per_point - units) > 1e-9:
+        raise ValueError(f"判定基準の値 {value} が格子の刻み {1 / units_per_point} の倍数ではありません")
+    return units
+
+
+def _first_match(units, thresholds):
+    """上から順に units が基準以上になる最初の位置（どれにも当てはまらなければ基準の数）"""
+    for position, threshold in enumerate(thresholds):
+        if units >= threshold:
+            return position
+    return len(thresholds)
+
+
+def _level_entries(levels):
+    return [{key: entry[key] for key in ('level', 'description', 'category')}
+            for entry in levels['thresholds'] + [levels['default']]]
+
+
+def _encode_cells(indexes):
+    if max(indexes) > 9:
+        raise ValueError("判定の種類が10を超えるため1文字で表せません")
+    return ''.join(str(index) for index in indexes)
+
+
+def build_sweetness_table(rules):
+    """判定基準から格子ごとの判定表（JSONにできる辞書）を作る"""
+    units_per_point = round(1 / rules['step'])
+    if abs(units_per_point * rules['step'] - 1) > 1e-9:
+        raise ValueError(f"格子の刻み {rules['step']} は 1 を割り切る値にしてください")
+
+    acidity_rules = rules['acidityImpact']
+    acidity_thresholds = [_grid_units(entry['min'], units_per_point) for entry in acidity_rules['thresholds']]
+    impacts = [entry['impact'] for entry in acidity_rules['thresholds']] + [acidity_rules['default']]
+    impact_units = [_grid_units(impact, units_per_point) for impact in impacts]
+    matrix_thresholds = [_grid_units(entry['min'], units_per_point) for entry in rules['matrixLevels']['thresholds']]
+    basic_thresholds = [_grid_units(entry['min'], units_per_point) for entry in rules['basicLevels']['thresholds']]
+
+    # 酸度: 最も低い基準の1マス下から最も高い基準のマスまで（その外は影響が変わらない）
+    acidity_min = min(acidity_thresholds) - 1
+    acidity_count = max(acidity_thresholds) - acidity_min + 1
+    acidity_positions = [_first_match(units, acidity_thresholds)
+                         for units in range(acidity_min, acidity_min + acidity_count)]
+
+    # 日本酒度: 酸度の影響を足しても判定が変わらなくなる範囲まで
+    degree_min = min(matrix_thresholds) - max(impact_units) - 1
+    degree_count = max(matrix_thresholds) - min(impact_units) - degree_min + 1
+    matrix_cells = [_first_match(degree + impact_units[position], matrix_thresholds)
+                    for position in acidity_positions
+                    for degree in range(degree_min, degree_min + degree_count)]
+
+    basic_min = min(basic_thresholds) - 1
+    basic_count = max(basic_thresholds) - basic_min + 1
+    basic_cells = [_first_match(degree, basic_thresholds) for degree in range(basic_min, basic_min + basic_count)]
+
+    return {
+        'version': TABLE_VERSION,
+        # 値 × unitsPerPoint を切り捨てた整数がマス目の番号（*MinUnit が先頭のマス）
+        'unitsPerPoint': units_per_point,
+        'levels': _level_entries(rules['matrixLevels']),
+        'basicLevels': _level_entries(rules['basicLevels']),
+        'acidityImpact': {
+            'acidityMinUnit': acidity_min,
+            'acidityCount': acidity_count,
+            'values': [impacts[position] for position in acidity_positions],
+        },
+        # cells[酸度のマス × degreeCount + 日本酒度のマス] が levels の位置
+        'matrix': {
+            'degreeMinUnit': degree_min,
+            'degreeCount': degree_count,
+            'acidityMinUnit': acidity_min,
+            'acidityCount': acidity_count,
+            'cells': _encode_cells(matrix_cells),
+        },
+        'basic': {
+            'degreeMinUnit': basic_min,
+            'degreeCount': basic_count,
+            'cells': _encode_cells(basic_cells),
+        },
+    }
+
+
+def load_sweetness_rules(rules_file=RULES_FILE):
+    with open(rules_file, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def round_half_up(value):
+    """0.5 を切り上げる丸め（TypeScript の Math.round と同じ。round / np.round は偶数丸めなので使わない）
+
+    NumPy の配列にも1つの値にも使える。
+    """
+    floor = np.floor(value) if isinstance(value, np.ndarray) else math.floor(value)
+    return floor + (value - floor >= 0.5)
+
+
+def quantize(values, units_per_point):
+    """値をマス目の番号（整数）にする
+
+    NaN は表の最初のマスにする（基準との比較ではどれにも当てはまらず最後の判定になるのと同じ）。
+    """
+    scaled = round_half_up(np.asarray(values, dtype=float) * (units_per_point * QUANTIZE_PRECISION)) / QUANTIZE_PRECISION
+    scaled = np.nan_to_num(scaled, nan=-_OUTSIDE_UNIT, posinf=_OUTSIDE_UNIT, neginf=-_OUTSIDE_UNIT)
+    return np.floor(np.clip(scaled, -_OUTSIDE_UNIT, _OUTSIDE_UNIT)).astype(np.int64)
+
+
+def quantize_value(value, units_per_point):
+    """quantize の1つの値版（NumPyを使わない）"""
+    if math.isnan(value):
+        return -_OUTSIDE_UNIT
+    if math.isinf(value):
+        return _OUTSIDE_UNIT if value > 0 else -_OUTSIDE_UNIT
+    return math.floor(round_half_up(value * units_per_point * QUANTIZE_PRECISION) / QUANTIZE_PRECISION)
+
+
+def _decode_cells(cells):
+    return np.frombuffer(cells.encode('ascii'), dtype=np.uint8) - ord('0')
+
+
+class SweetnessTable:
+    """sweetness-table.json を引く
+
+    acidity_impact / level_index / category は配列でまとめて、judge / judge_basic は1本ずつ引く。
+    """
+
+    def __init__(self, table):
+        if table.get('version') != TABLE_VERSION:
+            raise ValueError(f"辛甘判定表のバージョンが違います: {table.get('version')}")
+        self.units_per_point = table['unitsPerPoint']
+        self.levels = table['levels']
+        self.basic_levels = table['basicLevels']
+        self._impact_min = table['acidityImpact']['acidityMinUnit']
+        self._impacts = np.array(table['acidityImpact']['values'])
+        matrix = table['matrix']
+        self._degree_min = matrix['degreeMinUnit']
+        self._acidity_min = matrix['acidityMinUnit']
+        self._matrix = _decode_cells(matrix['cells']).reshape(matrix['acidityCount'], matrix['degreeCount'])
+        self._basic_min = table['basic']['degreeMinUnit']
+        self._basic = _decode_cells(table['basic']['cells'])
+        self._category_codes = np.array([CATEGORY_CODES[entry['category']] for entry in self.levels])
+        # 1本ずつ引く場合用（NumPyの配列の参照より速い）
+        self._matrix_rows = [row.tolist() for row in self._matrix]
+        self._basic_list = self._basic.tolist()
+
+    def _cell(self, values, minimum, count):
+        return np.clip(quantize(values, self.units_per_point) - minimum, 0, count - 1)
+
+    def acidity_impact(self, acidity):
+        """酸度による辛口感への影響（getAcidityImpact）"""
+        return self._impacts[self._cell(acidity, self._impact_min, len(self._impacts))]
+
+    def level_index(self, nihonshu_degree, acidity):
+        """judgeSweetnessByMatrix の判定（levels の位置）"""
+        rows = self._cell(acidity, self._acidity_min, self._matrix.shape[0])
+        columns = self._cell(nihonshu_degree, self._degree_min, self._matrix.shape[1])
+        return self._matrix[rows, columns]
+
+    def category(self, nihonshu_degree, acidity):
+        """辛口 1 / 普通 0 / 甘口 -1"""
+        return self._category_codes[self.level_index(nihonshu_degree, acidity)]
+
+    def _value_cell(self, value, minimum, count):
+        return min(max(quantize_value(value, self.units_per_point) - minimum, 0), count - 1)
+
+    def judge(self, nihonshu_degree, acidity):
+        """1本分の判定（level / description / category の辞書）"""
+        row = self._matrix_rows[self._value_cell(acidity, self._acidity_min, len(self._matrix_rows))]
+        return self.levels[row[self._value_cell(nihonshu_degree, self._degree_min, len(row))]]
+
+    def judge_basic(self, nihonshu_degree):
+        """日本酒度だけによる判定（getBasicSweetnessByDegree）"""
+        return self.basic_levels[self._basic_list[self._value_cell(nihonshu_degree, self._basic_min, len(self._basic_list))]]
+
+
+_tables = {}
+
+
+def get_sweetness_table(table_file=TABLE_FILE):
+    """同じプロセス内では表ファイルごとに同じ表を返す"""
+    path = os.path.abspath(table_file)
+    table = _tables.get(path)
+    if table is None:
+        with open(path, encoding='utf-8') as f:
+            table = SweetnessTable(json.load(f))
+        _tables[path] = table
+    return table
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""ベンチマーク用の合成マトリックス（ワークブック・CSV）の生成
+
+お酒データ・料理シートを、実データに近い分布（日本酒度・酸度・度数など）の
+乱数で指定の行数だけ作る。レイアウトは本物のワークブック・lib/data/ のCSVと同じ。
+同じ行数・シードからは同じ内容が生成される。
+"""
+import csv
+import os
+import random
+
+from workbook_loader import CSV_SHEET_FILES, DISH_CSV_HEADER, SAKE_CSV_HEADER
+
+SAKE_SHEET_NAME = "お酒データ"
+CUISINE_SHEET_NAMES = ['和食', '中華', '洋食']
+
+NAME_PREFIXES = ['〇〇', '××', '△△', '']
+NAME_STEMS = ['正宗', '錦', '男山', '鶴', '菊', '泉', '桜', '月', '山', '川']
+CATEGORIES = [
+    ('純米酒', 25), ('純米吟醸', 20), ('純米大吟醸', 10), ('吟醸酒', 10),
+    ('大吟醸', 5), ('本醸造', 15), ('普通酒', 15),
+]
+TYPE_CLASSES = [('A', 25), ('B', 35), ('C', 30), ('D', 10)]
+DISH_STEMS = ['刺身', '煮物', '焼き物', '揚げ物', '鍋', '蒸し物', '炒め物', 'サラダ', 'グリル', 'ロースト']
+
+# 欠損セルの割合（変換時の既定値の処理も計測に含める）
+MISSING_RATE = 0.01
+
+
+def _weighted_choice(rng, choices):
+    values, weights = zip(*choices)
+    return rng.choices(values, weights=weights)[0]
+
+
+def _maybe_missing(rng, value):
+    return None if rng.random() < MISSING_RATE else value
+
+
+def _clip(value, lower, upper):
+    return max(lower, min(upper, value))
+
+
+def generate_sake_rows(count, seed=0):
+    """お酒データのデータ行 [銘柄名, カテゴリー, 日本酒度, 酸度, 度数, 4タイプ分類, 価格帯, 価格] を生成"""
+    rng = random.Random(seed)
+    for i in range(count):
+        name = f"{rng.choice(NAME_PREFIXES)}{rng.choice(NAME_STEMS)} {i + 1}"
+        # 日本酒度は +3 前後（-15〜+20）、酸度は 1.4 前後、度数は 15〜16度が中心
+        nihonshu_do = round(_clip(rng.gauss(3, 4), -15, 20) * 2) / 2
+        acidity = round(_clip(rng.gauss(1.4, 0.25), 0.8, 2.5), 1)
+        alcohol = round(_clip(rng.gauss(15.5, 1.2), 8, 20) * 2) / 2
+        price = int(round(_clip(rng.lognormvariate(7.6, 0.45), 500, 30000), -1))
+        price_range = 'L' if price < 1500 else 'H' if price > 2500 else 'M'
+        yield [
+            name,
+            _weighted_choice(rng, CATEGORIES),
+            _maybe_missing(rng, int(nihonshu_do) if nihonshu_do.is_integer() else nihonshu_do),
+            _maybe_missing(rng, acidity),
+            _maybe_missing(rng, int(alcohol) if alcohol.is_integer() else alcohol),
+            _maybe_missing(rng, _weighted_choice(rng, TYPE_CLASSES)),
+            price_range,
+            _maybe_missing(rng, price),
+        ]
+
+
+def generate_dish_rows(count, sheet_index=0, seed=0):
+    """料理シートのデータ行 [料理名, 日本酒度下限, 上限, 酸度下限, 上限, 度数下限, 上限, 4タイプ分類-1, -2] を生成"""
+    rng = random.Random(seed * 31 + sheet_index + 1)
+    for i in range(count):
+        sake_min = rng.randint(-5, 5)
+        acidity_min = rng.choice([0, 0, 0.5, 1])
+        alcohol_min = rng.choice([10, 10, 12, 15])
+        yield [
+            f"{rng.choice(DISH_STEMS)}{sheet_index + 1}-{i + 1}",
+            sake_min,
+            sake_min + rng.randint(5, 15),
+            acidity_min,
+            acidity_min + rng.choice([1, 1, 2]),
+            alcohol_min,
+            alcohol_min + rng.randint(3, 8),
+            _weighted_choice(rng, TYPE_CLASSES),
+            _maybe_missing(rng, _weighted_choice(rng, TYPE_CLASSES)),
+        ]
+
+
+def _sheet_rows(sake_count, dish_count, seed):
+    """シート名 → (見出し, データ行) を順に返す（料理は dish_count 行を3シートに分ける）"""
+    yield SAKE_SHEET_NAME, SAKE_CSV_HEADER, generate_sake_rows(sake_count, seed)
+    for index, sheet_name in enumerate(CUISINE_SHEET_NAMES):
+        rows = dish_count // len(CUISINE_SHEET_NAMES) + (1 if index < dish_count % len(CUISINE_SHEET_NAMES) else 0)
+        yield sheet_name, DISH_CSV_HEADER, generate_dish_rows(rows, index, seed)
+
+
+def write_synthetic_workbook(output_file, sake_count, dish_count=None, seed=0):
+    """合成データのワークブックを書き出す（1行目タイトル、2行目見出し、B列から）"""
+    import openpyxl
+
+    workbook = openpyxl.Workbook(write_only=True)
+    for sheet_name, header, rows in _sheet_rows(sake_count, sake_count if dish_count is None else dish_count, seed):
+        worksheet = workbook.create_sheet(sheet_name)
+        worksheet.append([sheet_name])
+        worksheet.append([None] + [name or None for name in header])
+        for row in rows:
+            worksheet.append([None] + row)
+    workbook.save(output_file)
+    return output_file
+
+
+def write_synthetic_csv(output_dir, sake_count, dish_count=None, seed=0):
+    """合成データのCSV（BOM付き、lib/data/ と同じファイル名）をディレクトリに書き出す"""
+    os.makedirs(output_dir, exist_ok=True)
+    for sheet_name, header, rows in _sheet_rows(sake_count, sake_count if dish_count is None else dish_count, seed):
+        with open(os.path.join(output_dir, CSV_SHEET_FILES[sheet_name]), 'w', encoding='utf-8-sig', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            for row in rows:
+                writer.writerow(['' if value is None else value for value in row])
+    return output_dir
@@ -0,0 +1,6 @@
+"""scripts/ のモジュールを import できるようにし、テストではシートのキャッシュを使わない"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ['SAKE_SHEET_CACHE_DIR'] = ''
@@ -0,0 +1,56 @@
+import os
+
+import openpyxl
+
+from batch_conversion import RecordMerger, convert_workbooks, sake_identity
+from script_loader import load_script
+from synthetic_matrix import write_synthetic_workbook
+
+
+def _sake(sake_id, name, brewery='酒蔵', price=1500):
+    return {'id': sake_id, 'name': name, 'brewery': brewery, 'price': price,
+            'ecUrl': f"https://example-ec.com/{sake_id}"}
+
+
+def test_same_ids_from_different_catalogs_are_renamed():
+    merger = RecordMerger(sake_identity, ignored_fields=('id', 'ecUrl'))
+    assert merger.add(_sake('sake001', '正宗'), 'a.xlsx:お酒データ', 'a')['id'] == 'sake001'
+    renamed = merger.add(_sake('sake001', '男山'), 'b.xlsx:お酒データ', 'b')
+    assert renamed['id'] == 'sake001-b'
+    assert renamed['ecUrl'] == 'https://example-ec.com/sake001-b'
+    assert merger.renamed == [('sake001', 'sake001-b', 'b.xlsx:お酒データ')]
+    assert merger.conflicts == []
+
+
+def test_same_sake_on_another_row_is_a_duplicate():
+    merger = RecordMerger(sake_identity, ignored_fields=('id', 'ecUrl'))
+    merger.add(_sake('sake001', '正宗'), 'a.xlsx:お酒データ', 'a')
+    assert merger.add(_sake('sake007', '正宗'), 'b.xlsx:お酒データ', 'b') is None
+    assert merger.duplicates == 1
+    assert merger.add(_sake('sake008', '正宗', price=3000), 'b.xlsx:お酒データ', 'b') is None
+    assert merger.conflicts == [('sake001', 'a.xlsx:お酒データ', 'b.xlsx:お酒データ')]
+
+
+def test_two_distributor_catalogs_keep_every_bottle(tmp_path):
+    write_synthetic_workbook(str(tmp_path / 'a.xlsx'), 50, 5, seed=1)
+    write_synthetic_workbook(str(tmp_path / 'b.xlsx'), 50, 5, seed=2)
+    sake_data, _, report = convert_workbooks([str(tmp_path)], max_workers=1)
+    assert len(sake_data) == 100
+    assert len({sake['id'] for sake in sake_data}) == 100
+    assert report['sake']['conflicts'] == []
+
+
+def test_invalid_workbook_stops_batch_conversion(tmp_path):
+    write_synthetic_workbook(str(tmp_path / 'a.xlsx'), 10, 5, seed=1)
+    write_synthetic_workbook(str(tmp_path / 'b.xlsx'), 10, 5, seed=2)
+    workbook = openpyxl.load_workbook(str(tmp_path / 'b.xlsx'))
+    # 3行目（最初のお酒）の日本酒度を数値でない値にする
+    workbook['お酒データ'].cell(row=3, column=4, value='abc')
+    workbook.save(str(tmp_path / 'b.xlsx'))
+    module = load_script('batch-convert')
+    output_dir = tmp_path / 'out'
+    module.main([str(tmp_path / '*.xlsx')], output_dir=str(output_dir), max_workers=1)
+    assert not output_dir.exists()
+    module.main([str(tmp_path / '*.xlsx')], output_dir=str(output_dir), max_workers=1, validate=False)
+    assert sorted(os.listdir(output_dir)) == sorted([module.SAKE_OUTPUT_NAME, module.DISH_JSON_OUTPUT_NAME,
+                                                     module.DISH_TS_OUTPUT_NAME])
@@ -0,0 +1,66 @@
+import json
+
+from conversion_manifest import ConversionManifest
+from name_dictionary import DICTIONARY_ENV, clear_name_dictionary_cache
+from script_loader import load_script
+from synthetic_matrix import write_synthetic_workbook
+from workbook_loader import clear_workbook_cache
+
+
+def _setup(tmp_path, monkeypatch):
+    module = load_script('convert-excel-proper')
+    monkeypatch.setattr(module, 'ConversionManifest', lambda: ConversionManifest(str(tmp_path / 'manifest.json')))
+    excel_file = str(tmp_path / 'matrix.xlsx')
+    write_synthetic_workbook(excel_file, 20, 3, seed=1)
+    return module, excel_file, str(tmp_path / 'sake-data.json')
+
+
+def _run_incremental(module, excel_file, output_file, show_diff=False):
+    # 同じパスのワークブックを書き換えるため、読み込み済みのワークブックは閉じておく
+    clear_workbook_cache()
+    module.convert_incremental(excel_file, output_file, validate=False, show_diff=show_diff)
+    with open(output_file, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def test_workbook_saved_during_conversion_is_converted_again(tmp_path, monkeypatch):
+    module, excel_file, output_file = _setup(tmp_path, monkeypatch)
+    convert = module.convert_excel_to_sake_data
+
+    def convert_and_save(*args, **kwargs):
+        sake_data = convert(*args, **kwargs)
+        write_synthetic_workbook(excel_file, 20, 3, seed=2)
+        return sake_data
+
+    monkeypatch.setattr(module, 'convert_excel_to_sake_data', convert_and_save)
+    before = _run_incremental(module, excel_file, output_file)
+    monkeypatch.setattr(module, 'convert_excel_to_sake_data', convert)
+    after = _run_incremental(module, excel_file, output_file)
+    assert after != before
+    assert after == convert(excel_file)
+    clear_workbook_cache()
+
+
+def test_dictionary_change_is_converted_again(tmp_path, monkeypatch):
+    module, excel_file, output_file = _setup(tmp_path, monkeypatch)
+    dictionary_file = tmp_path / 'dictionary.csv'
+    dictionary_file.write_text('名前,都道府県,酒蔵\n正宗,新潟県,\n', encoding='utf-8')
+    monkeypatch.setenv(DICTIONARY_ENV, str(dictionary_file))
+    before = _run_incremental(module, excel_file, output_file)
+    assert {sake['prefecture'] for sake in before if '正宗' in sake['name']} == {'新潟県'}
+
+    dictionary_file.write_text('名前,都道府県,酒蔵\n正宗,兵庫県,\n', encoding='utf-8')
+    clear_name_dictionary_cache()
+    after = _run_incremental(module, excel_file, output_file)
+    assert {sake['prefecture'] for sake in after if '正宗' in sake['name']} == {'兵庫県'}
+    clear_name_dictionary_cache()
+
+
+def test_record_diff_is_logged(tmp_path, monkeypatch, caplog):
+    module, excel_file, output_file = _setup(tmp_path, monkeypatch)
+    _run_incremental(module, excel_file, output_file)
+    write_synthetic_workbook(excel_file, 21, 3, seed=1)
+    with caplog.at_level('INFO', logger=module.logger.name):
+        _run_incremental(module, excel_file, output_file, show_diff=True)
+    assert 'お酒データ: 追加 1件, 変更 0件, 削除 0件' in caplog.messages
+    assert '  + sake021' in caplog.messages
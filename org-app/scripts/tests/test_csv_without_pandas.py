@@ -0,0 +1,50 @@
+import json
+import os
+import subprocess
+import sys
+
+from script_loader import load_script
+from synthetic_matrix import write_synthetic_csv
+from workbook_loader import clear_workbook_cache
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# pandas を import できない状態で convert-excel-proper.py の main を実行する
+CONVERT_WITHOUT_PANDAS = '''
+import sys
+sys.modules['pandas'] = None
+sys.path.insert(0, sys.argv[1])
+from script_loader import load_script
+module = load_script('convert-excel-proper')
+module.SAKE_OUTPUT_FILE = sys.argv[3]
+module.main(sys.argv[2])
+'''
+
+
+def _convert_without_pandas(csv_dir, output_file):
+    return subprocess.run([sys.executable, '-c', CONVERT_WITHOUT_PANDAS, SCRIPTS_DIR, csv_dir, output_file],
+                          capture_output=True, text=True, env={**os.environ, 'SAKE_SHEET_CACHE_DIR': ''})
+
+
+def test_csv_conversion_runs_without_pandas(tmp_path):
+    csv_dir = write_synthetic_csv(str(tmp_path / 'csv'), 50, 10)
+    output_file = str(tmp_path / 'sake-data.json')
+    result = _convert_without_pandas(csv_dir, output_file)
+    assert result.returncode == 0, result.stderr
+
+    expected = load_script('convert-excel-proper').convert_excel_to_sake_data(csv_dir)
+    clear_workbook_cache()
+    with open(output_file, encoding='utf-8') as f:
+        assert json.load(f) == expected
+
+
+def test_csv_validation_runs_without_pandas(tmp_path):
+    csv_dir = write_synthetic_csv(str(tmp_path / 'csv'), 5, 5)
+    sake_file = os.path.join(csv_dir, 'お酒の商品データマトリックス.csv')
+    with open(sake_file, 'a', encoding='utf-8') as f:
+        f.write('悪い酒,純米,abc,1.2,15,Z,M,3000\n')
+    output_file = str(tmp_path / 'sake-data.json')
+    result = _convert_without_pandas(csv_dir, output_file)
+    assert result.returncode == 0, result.stderr
+    assert '検証エラーが 2件' in result.stderr
+    assert not os.path.exists(output_file)
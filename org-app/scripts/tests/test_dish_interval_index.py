@@ -0,0 +1,30 @@
+import numpy as np
+import openpyxl
+
+from dish_interval_index import DishIntervalIndex, _AxisIndex
+from script_loader import load_script
+from synthetic_matrix import write_synthetic_workbook
+from workbook_loader import clear_workbook_cache
+
+
+def test_segments_match_segment():
+    values = [-3, 0, 0.5, 1, 1.5, 2, 7]
+    for lower, upper in (([0, 1], [2, 2]), ([1], [1]), ([], [])):
+        axis = _AxisIndex.build(lower, upper)
+        assert axis.segments(values).tolist() == [axis.segment(value) for value in values]
+
+
+def test_workbook_without_cuisine_sheets(tmp_path):
+    excel_file = str(tmp_path / 'matrix.xlsx')
+    write_synthetic_workbook(excel_file, 20, 3)
+    workbook = openpyxl.load_workbook(excel_file)
+    for sheet_name in ('和食', '中華', '洋食'):
+        del workbook[sheet_name]
+    workbook.save(excel_file)
+
+    index, pairings = load_script('build-sake-pairings').build_sake_pairings(excel_file)
+    clear_workbook_cache()
+    assert index.dish_ids == []
+    assert len(pairings) == 20
+    assert all(dish_ids == [] for dish_ids in pairings.values())
+    assert DishIntervalIndex.from_dict(index.to_dict()).query(3, 1.4, 15) == []
@@ -0,0 +1,37 @@
+import json
+
+import openpyxl
+
+from conversion_manifest import ConversionManifest
+from script_loader import load_script
+from synthetic_matrix import write_synthetic_workbook
+from workbook_loader import get_workbook
+
+
+def _run_incremental(module, excel_file):
+    # 同じパスのワークブックを書き換えるため、読み込み済みのワークブックは閉じておく
+    get_workbook(excel_file).close()
+    module.extract_incremental(excel_file)
+    with open(module.JSON_OUTPUT_FILE, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def test_removed_cuisine_sheet_empties_its_dishes(tmp_path, monkeypatch):
+    module = load_script('extract-cuisine-data')
+    monkeypatch.setattr(module, 'JSON_OUTPUT_FILE', str(tmp_path / 'dish.json'))
+    monkeypatch.setattr(module, 'TS_OUTPUT_FILE', str(tmp_path / 'dish.ts'))
+    monkeypatch.setattr(module, 'INDEX_OUTPUT_FILE', str(tmp_path / 'index.json'))
+    monkeypatch.setattr(module, 'ConversionManifest', lambda: ConversionManifest(str(tmp_path / 'manifest.json')))
+
+    excel_file = str(tmp_path / 'matrix.xlsx')
+    write_synthetic_workbook(excel_file, 20, 30)
+    before = _run_incremental(module, excel_file)
+    assert before['western']
+
+    workbook = openpyxl.load_workbook(excel_file)
+    del workbook['洋食']
+    workbook.save(excel_file)
+    data = _run_incremental(module, excel_file)
+    assert data['western'] == []
+    assert data['japanese'] == before['japanese']
+    assert 'cuisineType: "western"' not in (tmp_path / 'dish.ts').read_text(encoding='utf-8')
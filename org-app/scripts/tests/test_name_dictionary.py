@@ -0,0 +1,43 @@
+import pytest
+
+from name_dictionary import AhoCorasickMatcher, get_name_dictionary, load_name_dictionary
+
+
+def _write_dictionary(tmp_path, text):
+    path = tmp_path / 'dictionary.csv'
+    path.write_text(text, encoding='utf-8')
+    return str(path)
+
+
+def test_longer_name_beats_earlier_generic_name(tmp_path):
+    dictionary = load_name_dictionary(_write_dictionary(tmp_path, '名前,都道府県,酒蔵\n錦,京都府,\n錦鶴,兵庫県,錦鶴酒造\n'))
+    assert dictionary.resolve('特選 錦鶴 純米') == ('兵庫県', '錦鶴酒造')
+    assert dictionary.resolve('〇〇錦') == ('京都府', '錦酒造')
+
+
+def test_priority_column_and_row_order(tmp_path):
+    dictionary = load_name_dictionary(_write_dictionary(
+        tmp_path, '名前,都道府県,優先度\n錦,京都府,5\n錦鶴,兵庫県,\n山,山形県,\n川,石川県,\n'))
+    assert dictionary.prefecture('錦鶴') == '京都府'
+    # 同じ長さ・優先度なら辞書の上の行
+    assert dictionary.prefecture('川山') == '山形県'
+    assert dictionary.prefecture('桜') == '未設定'
+
+
+def test_invalid_priority(tmp_path):
+    with pytest.raises(ValueError):
+        load_name_dictionary(_write_dictionary(tmp_path, '名前,都道府県,優先度\n錦,京都府,高\n'))
+
+
+def test_matcher_matches_brute_force():
+    patterns = [('ab', 1), ('b', 2), ('abc', 3), ('bc', 4), ('c', None)]
+    matcher = AhoCorasickMatcher(patterns)
+    for text in ['', 'a', 'ab', 'abc', 'xbc', 'cab', 'bcab']:
+        candidates = [(-len(p), i) for i, (p, v) in enumerate(patterns) if v is not None and p in text]
+        expected = patterns[min(candidates)[1]][1] if candidates else None
+        assert matcher.best_match(text) == expected, text
+
+
+def test_bundled_dictionary():
+    dictionary = get_name_dictionary()
+    assert dictionary.resolve('〇〇正宗') == ('新潟県', '正宗酒造')
@@ -0,0 +1,47 @@
+import json
+
+import pytest
+
+from output_writers import atomic_output, write_json_array, write_text_if_changed
+
+
+def test_write_json_array_matches_json_dumps(tmp_path):
+    output_file = tmp_path / 'out.json'
+    records = [{'id': 'sake001', 'name': '正宗', 'tags': ['辛口']}, {'id': 'sake002', 'tags': []}]
+    assert write_json_array(iter(records), str(output_file)) == 2
+    assert output_file.read_text(encoding='utf-8') == json.dumps(records, ensure_ascii=False, indent=2)
+
+
+def test_failed_conversion_keeps_previous_output(tmp_path):
+    output_file = tmp_path / 'out.json'
+    output_file.write_text('[]', encoding='utf-8')
+
+    def failing_records():
+        yield {'id': 'sake001'}
+        raise RuntimeError('変換に失敗')
+
+    with pytest.raises(RuntimeError):
+        write_json_array(failing_records(), str(output_file))
+    assert output_file.read_text(encoding='utf-8') == '[]'
+    assert [path.name for path in tmp_path.iterdir()] == ['out.json']
+
+
+def test_write_text_if_changed(tmp_path):
+    output_file = tmp_path / 'out.ts'
+    assert write_text_if_changed(str(output_file), 'a')
+    assert not write_text_if_changed(str(output_file), 'a')
+    assert write_text_if_changed(str(output_file), 'b')
+    assert output_file.read_text(encoding='utf-8') == 'b'
+    assert [path.name for path in tmp_path.iterdir()] == ['out.ts']
+
+
+def test_binary_output_is_replaced_only_when_complete(tmp_path):
+    output_file = tmp_path / 'out.bin'
+    with atomic_output(str(output_file), binary=True) as f:
+        f.write(b'ORGCOL01')
+    with pytest.raises(RuntimeError):
+        with atomic_output(str(output_file), binary=True) as f:
+            f.write(b'\0' * 16)
+            raise RuntimeError('変換に失敗')
+    assert output_file.read_bytes() == b'ORGCOL01'
+    assert [path.name for path in tmp_path.iterdir()] == ['out.bin']
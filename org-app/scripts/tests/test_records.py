@@ -0,0 +1,68 @@
+import json
+
+import pytest
+
+from output_writers import write_json_array
+from records import DishRecord, SakeRecord, iter_grouped_json, record_to_json
+from script_loader import load_script
+from synthetic_matrix import write_synthetic_workbook
+from workbook_loader import clear_workbook_cache
+
+
+def _sake(**overrides):
+    sake = {
+        "id": "sake001", "name": "獺祭 \"磨き\"\t二割三分", "brewery": "旭酒造", "price": 3000,
+        "alcoholContent": 16.0, "riceMilling": 55, "sweetness": 4, "richness": 5.5, "acidity": 4.2, "aroma": 8,
+        "type": "純米大吟醸", "prefecture": "山口県", "description": "純米大吟醸の特徴を活かした、Aタイプの日本酒です。",
+        "ecUrl": "https://example-ec.com/sake001", "tags": ["辛口", "フルーティー", "華やか"],
+    }
+    sake.update(overrides)
+    return sake
+
+
+@pytest.mark.parametrize('sake', [
+    _sake(),
+    _sake(id="sake1234", ecUrl="https://example-ec.com/sake1234", tags=["おすすめ"]),
+    _sake(id="sake01", ecUrl="https://example-ec.com/sake01"),
+    _sake(id="sake001-b", ecUrl="https://example-ec.com/sake001-b"),
+    _sake(ecUrl="https://shop.example.jp/item/1", sweetness=-0.0, richness=1e-07, price=12345678901234567890),
+    _sake(alcoholContent=float('nan'), richness=float('inf'), tags=[]),
+])
+@pytest.mark.parametrize('ensure_ascii', [False, True])
+def test_sake_record_json_is_byte_identical(sake, ensure_ascii):
+    record = SakeRecord.from_dict(sake)
+    assert json.dumps(record.to_dict()) == json.dumps(sake)
+    assert record_to_json(record, ensure_ascii) == json.dumps(sake, ensure_ascii=ensure_ascii, indent=2)
+
+
+@pytest.fixture
+def cuisine_data(tmp_path):
+    excel_file = str(tmp_path / 'matrix.xlsx')
+    write_synthetic_workbook(excel_file, 10, 60, seed=5)
+    module = load_script('extract-cuisine-data')
+    yield module.extract_cuisine_matrix_data(excel_file), module.extract_cuisine_matrix_data(excel_file, records=True)
+    clear_workbook_cache()
+
+
+@pytest.mark.parametrize('ensure_ascii', [False, True])
+def test_dish_records_json_is_byte_identical(cuisine_data, ensure_ascii):
+    dishes, dish_records = cuisine_data
+    assert sum(map(len, dishes.values())) == 60
+    assert {key: [record.to_dict() for record in records] for key, records in dish_records.items()} == dishes
+    expected = json.dumps(dishes, ensure_ascii=ensure_ascii, indent=2)
+    assert ''.join(iter_grouped_json(dish_records, ensure_ascii)) == expected
+    assert ''.join(iter_grouped_json(dishes, ensure_ascii)) == expected
+
+
+def test_grouped_json_of_empty_groups():
+    for groups in ({}, {'japanese': [], 'chinese': []}):
+        assert ''.join(iter_grouped_json(groups)) == json.dumps(groups, ensure_ascii=False, indent=2)
+
+
+def test_json_array_of_records_matches_json_dump(tmp_path):
+    sakes = [_sake(), _sake(id="sake002", ecUrl="https://example-ec.com/sake002", name="新政")]
+    output_file = str(tmp_path / 'sake-data.json')
+    for records in ([], sakes, [SakeRecord.from_dict(sake) for sake in sakes]):
+        write_json_array(records, output_file)
+        with open(output_file, encoding='utf-8') as f:
+            assert f.read() == json.dumps([dict(sake) for sake in records], ensure_ascii=False, indent=2)
@@ -0,0 +1,37 @@
+import pytest
+
+from run_instrumentation import parse_instrumentation_args, parse_options
+from script_loader import load_script
+
+
+def test_parse_options_splits_inputs_and_options():
+    spec = {'--sheet': ('sheet_names', str), '--top-k': ('top_k', int), '--check': ('check', True)}
+    defaults = {'sheet_names': [], 'top_k': 3, 'check': False}
+    inputs, options = parse_options(['matrix.xlsx', '--sheet', '和食', '--top-k', '5', '--sheet', '中華', '--check'],
+                                    spec, defaults)
+    assert inputs == ['matrix.xlsx']
+    assert options == {'sheet_names': ['和食', '中華'], 'top_k': 5, 'check': True}
+    # 既定値のリストは書き換えない
+    assert defaults['sheet_names'] == []
+
+
+@pytest.mark.parametrize('args, message', [
+    (['matrix.xlsx', '--top-k'], '--top-k には値を指定してください'),
+    (['--top-k', 'three'], '--top-k の値が正しくありません: three'),
+])
+def test_parse_options_exits_with_a_message(args, message):
+    with pytest.raises(SystemExit) as excinfo:
+        parse_options(args, {'--top-k': ('top_k', int)}, {'top_k': 3})
+    assert excinfo.value.code == message
+
+
+def test_script_arguments_with_instrumentation_options():
+    argv, instrumentation_options = parse_instrumentation_args(['data', '--log-level', 'debug', '--workers', '2',
+                                                                '--report', 'run.json'])
+    assert instrumentation_options == {'log_level': 'DEBUG', 'profile': False, 'trace_memory': False,
+                                       'report_file': 'run.json'}
+    patterns, options = load_script('batch-convert').parse_args(argv)
+    assert patterns == ['data']
+    assert options['max_workers'] == 2
+    with pytest.raises(SystemExit):
+        parse_instrumentation_args(['--report'])
@@ -0,0 +1,86 @@
+import json
+from itertools import islice
+
+import openpyxl
+import pytest
+
+from records import record_to_json
+from script_loader import load_script
+from synthetic_matrix import generate_sake_rows, write_synthetic_workbook
+from workbook_loader import clear_workbook_cache, get_workbook
+
+# チャンクの境界で列の中身が偏る行（整数だけの銘柄名・空のカテゴリー・文字列の数値・空の価格）
+EDGE_ROWS = [
+    [1001, None, None, None, None, None, None, None],
+    [1002, None, '2', '1.5', '16', 'B', 'H', None],
+    ['正宗', '純米吟醸', 4, 1.2, 15.5, None, None, 1800.0],
+    [None, None, None, None, None, None, None, None],
+    [1003, None, -2.5, None, 15, 'D', 'L', 2200],
+    ['  ', '本醸造', 1, 1, 15, 'A', 'M', 1000],
+    ['男山', None, True, 1.4, 16.0, 'C', 'M', '2500'],
+]
+
+
+@pytest.fixture(scope='module')
+def module():
+    return load_script('convert-excel-proper')
+
+
+@pytest.fixture
+def excel_file(tmp_path):
+    workbook = openpyxl.Workbook(write_only=True)
+    worksheet = workbook.create_sheet('お酒データ')
+    worksheet.append(['お酒データ'])
+    worksheet.append([None, '銘柄名', 'カテゴリー', '日本酒度', '酸度', '度数', '4タイプ分類', '価格帯', '価格'])
+    for row in [*islice(generate_sake_rows(20, 3), 10), *EDGE_ROWS, *islice(generate_sake_rows(20, 4), 10)]:
+        worksheet.append([None] + row)
+    path = str(tmp_path / 'sakes.xlsx')
+    workbook.save(path)
+    yield path
+    clear_workbook_cache()
+
+
+def _dumps(records):
+    return [record_to_json(record) for record in records]
+
+
+@pytest.mark.parametrize('read_only', [False, True])
+def test_vectorized_matches_row_by_row(module, excel_file, read_only):
+    get_workbook(excel_file, read_only=read_only)
+    expected = module.convert_excel_to_sake_data(excel_file)
+    assert len(expected) == 25
+    assert module.convert_excel_to_sake_data(excel_file, vectorized=True) == expected
+    assert _dumps(module.convert_excel_to_sake_data(excel_file, vectorized=True, records=True)) == _dumps(expected)
+
+
+@pytest.mark.parametrize('chunk_size', [1, 3, 7, 1000])
+@pytest.mark.parametrize('vectorized', [False, True])
+def test_stream_matches_row_by_row_at_any_chunk_size(module, excel_file, chunk_size, vectorized):
+    get_workbook(excel_file, read_only=True)
+    expected = _dumps(module.iter_sake_data(excel_file, chunk_size=1))
+    for records in (False, True):
+        actual = module.iter_sake_data(excel_file, chunk_size=chunk_size, vectorized=vectorized, records=records)
+        assert _dumps(actual) == expected
+
+
+@pytest.mark.parametrize('vectorized', [False, True])
+def test_stream_output_is_byte_identical_to_json_dump(module, excel_file, tmp_path, vectorized):
+    get_workbook(excel_file, read_only=True)
+    sake_data = module.convert_excel_to_sake_data(excel_file)
+    output_file = str(tmp_path / 'sake-data.json')
+    assert module.stream_sake_data(excel_file, output_file, vectorized=vectorized) == len(sake_data)
+    with open(output_file, encoding='utf-8') as f:
+        assert f.read() == json.dumps(sake_data, ensure_ascii=False, indent=2)
+
+
+def test_stream_matches_whole_sheet_conversion(module, tmp_path):
+    # 空欄のない行は、読み取り専用モード（openpyxlの値）でもpandasで解析した場合と同じ結果になる
+    excel_file = str(tmp_path / 'matrix.xlsx')
+    write_synthetic_workbook(excel_file, 200, 3)
+    expected = module.convert_excel_to_sake_data(excel_file, vectorized=True)
+    output_file = str(tmp_path / 'sake-data.json')
+    get_workbook(excel_file, read_only=True)
+    assert module.stream_sake_data(excel_file, output_file, vectorized=True) == 200
+    with open(output_file, encoding='utf-8') as f:
+        assert f.read() == json.dumps(expected, ensure_ascii=False, indent=2)
+    clear_workbook_cache()
@@ -0,0 +1,48 @@
+import os
+
+import pandas as pd
+
+from sheet_cache import SHEET_CACHE_ENV
+from workbook_loader import WorkbookLoader
+
+
+def _write_workbook(path, value):
+    pd.DataFrame([['銘柄', value]]).to_excel(path, sheet_name='お酒データ', header=False, index=False)
+
+
+def _read_value(path):
+    loader = WorkbookLoader(str(path))
+    try:
+        return loader.read_sheet('お酒データ').iat[0, 1]
+    finally:
+        loader.close()
+
+
+def test_cached_sheet_round_trip(tmp_path, monkeypatch):
+    monkeypatch.setenv(SHEET_CACHE_ENV, str(tmp_path / 'cache'))
+    workbook = tmp_path / 'matrix.xlsx'
+    _write_workbook(workbook, 'OLD')
+    assert _read_value(workbook) == 'OLD'
+    assert os.listdir(tmp_path / 'cache')
+    assert _read_value(workbook) == 'OLD'
+
+
+def test_save_during_parse_is_not_cached_with_new_fingerprint(tmp_path, monkeypatch):
+    monkeypatch.setenv(SHEET_CACHE_ENV, str(tmp_path / 'cache'))
+    workbook = tmp_path / 'matrix.xlsx'
+    _write_workbook(workbook, 'OLD')
+
+    original_parse = pd.ExcelFile.parse
+
+    def parse_then_save(self, *args, **kwargs):
+        frame = original_parse(self, *args, **kwargs)
+        # 解析中にワークブックが保存された場合
+        _write_workbook(workbook, 'NEW-CONTENT')
+        os.utime(workbook, (os.path.getmtime(workbook) + 5,) * 2)
+        return frame
+
+    monkeypatch.setattr(pd.ExcelFile, 'parse', parse_then_save)
+    assert _read_value(workbook) == 'OLD'
+    monkeypatch.setattr(pd.ExcelFile, 'parse', original_parse)
+    assert _read_value(workbook) == 'NEW-CONTENT'
+    assert _read_value(workbook) == 'NEW-CONTENT'
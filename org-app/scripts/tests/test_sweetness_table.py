@@ -0,0 +1,40 @@
+import numpy as np
+
+from script_loader import load_script
+from sweetness_table import (CATEGORY_CODES, TABLE_FILE, build_sweetness_table, get_sweetness_table,
+                             load_sweetness_rules, quantize, quantize_value, round_half_up)
+
+
+def test_checked_in_table_is_built_from_rules():
+    module = load_script('build-sweetness-table')
+    rules = load_sweetness_rules()
+    table = build_sweetness_table(rules)
+    with open(TABLE_FILE, encoding='utf-8') as f:
+        assert f.read() == module.dump_sweetness_table(table)
+    assert module.find_mismatches(rules, table) == []
+
+
+def test_single_lookup_matches_array_lookup():
+    table = get_sweetness_table()
+    # 基準の境界付近（1.4999999 など）と表の範囲外も含める
+    degrees = np.concatenate([np.round(np.arange(-20, 20.05, 0.05), 2), [1.4999999, 3.5000001, -1.4, -99, 99, np.nan]])
+    for acidity in [0, 0.95, 0.9999999, 1.0, 1.3, 1.59, 1.6, 1.9, 2.5, 7, np.nan]:
+        acidities = np.full(len(degrees), acidity)
+        categories = table.category(degrees, acidities)
+        levels = [table.levels[index] for index in table.level_index(degrees, acidities)]
+        for degree, category, level in zip(degrees.tolist(), categories.tolist(), levels):
+            judged = table.judge(degree, acidity)
+            assert judged == level
+            assert CATEGORY_CODES[judged['category']] == category
+
+
+def test_rounding_ties_go_up_like_math_round():
+    # Math.round と同じく 0.5 は正の方向に丸める（偶数丸めなら 0.5 → 0, 2.5 → 2, -1.5 → -2）
+    ties = [0.5, 2.5, -0.5, -1.5, 999.5, -1000.5, 0.49999999999999994]
+    expected = [1, 3, 0, -1, 1000, -1000, 0]
+    assert [round_half_up(value) for value in ties] == expected
+    assert round_half_up(np.array(ties)).tolist() == expected
+    # 1マスの 1/1000 のちょうど半分（0.00005 * 10000 = 0.5 など）
+    values = [0.00005, -0.00005, 0.09995, -0.10005, 1.25, -1.25]
+    units_per_point = get_sweetness_table().units_per_point
+    assert [quantize_value(value, units_per_point) for value in values] == quantize(values, units_per_point).tolist()
@@ -0,0 +1,20 @@
+import json
+import os
+
+from script_loader import load_script
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'lib', 'data')
+
+
+def test_checked_in_module_is_generator_output():
+    module = load_script('extract-cuisine-data')
+    with open(os.path.join(DATA_DIR, 'dish-compatibility-matrix.json'), encoding='utf-8') as f:
+        cuisine_data = json.load(f)
+    with open(os.path.join(DATA_DIR, 'dish-compatibility-matrix.ts'), encoding='utf-8') as f:
+        assert f.read() == module.generate_typescript_interface(cuisine_data)
+
+
+def test_empty_cuisine_data():
+    content = load_script('extract-cuisine-data').generate_typescript_interface({'japanese': [], 'chinese': []})
+    assert 'export const dishCompatibilityData: DishCompatibilityDetail[] = [\n];\n' in content
+    assert 'CSVデータより' not in content
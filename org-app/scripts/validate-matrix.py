@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""お酒データ・料理シートを検証し、問題の一覧を出力する
+
+使い方:
+    python validate-matrix.py [ワークブック|CSVディレクトリ] [--sheet シート名 ...] [--output レポート.json]
+                              [--max-issues N] [--strict]
+
+検証の内容は matrix_validation を参照。エラーがあれば終了コード 1 で終了する
+（--strict を付けると警告だけの場合も 1）。--output には問題の一覧をJSONで保存する。
+"""
+import json
+import os
+import sys
+
+from matrix_validation import DEFAULT_MAX_ISSUES, validate_workbook
+from run_instrumentation import get_logger, instrumented_run, parse_instrumentation_args, parse_options
+from workbook_loader import DEFAULT_EXCEL_FILE
+
+logger = get_logger('validate-matrix')
+
+
+def parse_args(args):
+    """コマンドライン引数を (入力, オプション) に分ける"""
+    return parse_options(args, {
+        '--sheet': ('sheet_names', str),
+        '--output': ('output_file', str),
+        '--max-issues': ('max_issues', int),
+        '--strict': ('strict', True),
+    }, {'sheet_names': [], 'output_file': None, 'max_issues': DEFAULT_MAX_ISSUES, 'strict': False})
+
+
+def main(excel_file=DEFAULT_EXCEL_FILE, sheet_names=None, output_file=None, max_issues=DEFAULT_MAX_ISSUES, strict=False):
+    if not os.path.exists(excel_file):
+        logger.error(f"ファイルが見つかりません: {excel_file}")
+        return 1
+    report = validate_workbook(excel_file, sheet_names or None, max_issues=max_issues)
+    report.log_summary(logger)
+    if output_file:
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(report.to_dict(), f, ensure_ascii=False, indent=2)
+        logger.info(f"検証レポートを {output_file} に保存しました")
+    logger.info(f"エラー {report.error_count}件 / 警告 {report.warning_count}件")
+    return 1 if not report.ok or (strict and report.warning_count) else 0
+
+
+if __name__ == "__main__":
+    argv, instrumentation_options = parse_instrumentation_args(sys.argv[1:])
+    inputs, options = parse_args(argv)
+    with instrumented_run('validate-matrix', **instrumentation_options):
+        status = main(inputs[0] if inputs else DEFAULT_EXCEL_FILE, **options)
+    sys.exit(status)
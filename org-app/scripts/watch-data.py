@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""ワークブック・CSVの変更を監視し、変更のあったシートの出力だけを再生成する常駐モード
+
+使い方:
+    python watch-data.py [ワークブック|CSVディレクトリ] [--interval 秒] [--debounce 秒] [--once]
+                         [--log-level LEVEL | --verbose | --quiet]
+
+入力を省略した場合はワークブック、なければ lib/data/ のCSVを監視する。名前辞書
+（sake-name-dictionary.csv）も監視し、更新されたらお酒データを作り直す。
+
+起動時に1度すべての出力を作成し、その後はプロセスを終了せずに
+- pandas・openpyxl などの読み込み済みのライブラリ
+- 変更のないシートの変換結果（料理データはシートごとに保持する）
+を使い回す。エディタは保存時に何度かに分けて書き込むことがあるため、
+最後の変更から --debounce 秒（既定 0.3秒）たってから再生成する。
+内容が変わらない出力ファイルは書き換えない（Next.jsの再ビルドを起こさない）。
+変更のあったシートに検証エラー（matrix_validation）があれば、出力は書き換えない。
+"""
+import json
+import os
+import sys
+import time
+
+from conversion_manifest import hash_rows
+from dish_sake_index import SAKE_SHEET_NAME
+from matrix_validation import validate_workbook
+from name_dictionary import clear_name_dictionary_cache, resolve_dictionary_file
+from output_writers import write_text_if_changed
+from run_instrumentation import configure_logging, get_logger, parse_instrumentation_args, parse_options
+from script_loader import load_script
+from workbook_loader import DEFAULT_EXCEL_FILE, get_workbook, is_csv_source
+
+DEFAULT_CSV_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lib', 'data')
+DEFAULT_INTERVAL = 0.2
+DEFAULT_DEBOUNCE = 0.3
+
+logger = get_logger('watch-data')
+
+
+def default_source():
+    return DEFAULT_EXCEL_FILE if os.path.exists(DEFAULT_EXCEL_FILE) else os.path.abspath(DEFAULT_CSV_DIR)
+
+
+class DataWatcher:
+    """入力ファイルの更新時刻・サイズを定期的に調べ、変更があれば該当する出力を作り直す"""
+
+    def __init__(self, source, interval=DEFAULT_INTERVAL, debounce=DEFAULT_DEBOUNCE, output_files=None):
+        self.source = source
+        self.interval = interval
+        self.debounce = debounce
+        self.converter = load_script('convert-excel-proper')
+        self.extractor = load_script('extract-cuisine-data')
+        self.output_files = {
+            'sake': self.converter.SAKE_OUTPUT_FILE,
+            'dish_json': self.extractor.JSON_OUTPUT_FILE,
+            'dish_ts': self.extractor.TS_OUTPUT_FILE,
+            'index': self.extractor.INDEX_OUTPUT_FILE,
+        }
+        self.output_files.update(output_files or {})
+        self.dictionary_file = resolve_dictionary_file()
+        self._sheet_hashes = {}
+        # 検証エラーで再生成しなかったシート
+        self._blocked_sheets = set()
+        self._cuisine_data = {cuisine_key: [] for cuisine_key in self.extractor.CUISINE_SHEETS.values()}
+
+    def watched_files(self):
+        """監視するファイル（入力のワークブックまたはCSVと、名前辞書）"""
+        if os.path.isdir(self.source):
+            files = [os.path.join(self.source, name) for name in sorted(os.listdir(self.source))
+                     if name.lower().endswith('.csv')]
+        else:
+            files = [self.source]
+        files = [os.path.abspath(path) for path in files]
+        if self.dictionary_file not in files:
+            files.append(self.dictionary_file)
+        return files
+
+    def snapshot(self):
+        """ファイルごとの (サイズ, 更新時刻)（存在しないファイルは None）"""
+        signatures = {}
+        for path in self.watched_files():
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                signatures[path] = None
+            else:
+                signatures[path] = (stat.st_size, stat.st_mtime_ns)
+        return signatures
+
+    def _changed_sheets(self, changed_files):
+        """更新されたファイルから、内容の変わったシートを求める"""
+        workbook = get_workbook(self.source)
+        source_files = None if changed_files is None else [path for path in changed_files if path != self.dictionary_file]
+        candidates = workbook.refresh(source_files) if source_files is None or source_files else []
+        changed = set()
+        for sheet_name in candidates:
+            # 保存し直しただけでシートの内容が同じ場合は作り直さない
+            sheet_hash = hash_rows(workbook.iter_rows(sheet_name)) if workbook.has_sheet(sheet_name) else None
+            if sheet_hash != self._sheet_hashes.get(sheet_name, '') or changed_files is None:
+                self._sheet_hashes[sheet_name] = sheet_hash
+                changed.add(sheet_name)
+        if changed_files is not None and self.dictionary_file in changed_files:
+            clear_name_dictionary_cache()
+            changed.add(SAKE_SHEET_NAME)
+        return changed
+
+    def _write(self, key, content):
+        if write_text_if_changed(self.output_files[key], content):
+            logger.info(f"{self.output_files[key]} を更新しました")
+
+    def rebuild(self, changed_files=None):
+        """変更のあったシートに関係する出力だけを作り直す（changed_files が None なら全部）"""
+        started = time.perf_counter()
+        changed_sheets = self._changed_sheets(changed_files)
+        if not changed_sheets:
+            logger.info("変更なし: シートの内容は変わっていません")
+            return changed_sheets
+        # 前回検証エラーで作り直さなかったシートも合わせて作り直す
+        changed_sheets |= self._blocked_sheets
+        logger.info(f"変更のあったシート: {sorted(changed_sheets)}")
+        workbook = get_workbook(self.source)
+
+        # 検証エラーがあれば出力は前回のままにし、次に変更があったときにまとめて作り直す
+        report = validate_workbook(self.source, sorted(changed_sheets))
+        report.log_summary(logger)
+        if not report.ok:
+            self._blocked_sheets = changed_sheets
+            logger.error(f"検証エラーが {report.error_count}件あるため再生成しません")
+            return changed_sheets
+        self._blocked_sheets = set()
+
+        if SAKE_SHEET_NAME in changed_sheets and workbook.has_sheet(SAKE_SHEET_NAME):
+            sake_data = self.converter.convert_excel_to_sake_data(self.source)
+            if sake_data is not None:
+                self._write('sake', json.dumps(sake_data, ensure_ascii=False, indent=2))
+
+        dish_changed = False
+        for sheet_name, cuisine_key in self.extractor.CUISINE_SHEETS.items():
+            if sheet_name in changed_sheets:
+                dish_changed = True
+                self._cuisine_data[cuisine_key] = (list(self.extractor.iter_dish_data(self.source, sheet_name, cuisine_key))
+                                                   if workbook.has_sheet(sheet_name) else [])
+        if dish_changed:
+            self._write('dish_json', json.dumps(self._cuisine_data, ensure_ascii=False, indent=2))
+            self._write('dish_ts', self.extractor.generate_typescript_interface(self._cuisine_data))
+
+        # 候補インデックスは料理シートとお酒シートの両方に依存する
+        if dish_changed or SAKE_SHEET_NAME in changed_sheets:
+            index_content = self.extractor.generate_dish_sake_index(self.source, self._cuisine_data)
+            if index_content is not None:
+                self._write('index', index_content)
+
+        logger.info(f"再生成しました（{(time.perf_counter() - started) * 1000:.0f}ms）")
+        return changed_sheets
+
+    def run(self):
+        """Ctrl+C で止めるまで監視を続ける"""
+        logger.info(f"監視を開始します: {self.source}")
+        self.rebuild()
+        processed = self.snapshot()
+        pending = processed
+        last_change = None
+        try:
+            while True:
+                time.sleep(self.interval)
+                current = self.snapshot()
+                if current != pending:
+                    # 書き込みが続いている間は待つ
+                    pending = current
+                    last_change = time.monotonic()
+                    continue
+                if last_change is None or time.monotonic() - last_change < self.debounce:
+                    continue
+                last_change = None
+                # 保存途中でファイルが一時的に消えている場合は次の変更を待つ
+                if any(signature is None for path, signature in current.items() if path != self.dictionary_file):
+                    continue
+                changed_files = [path for path in set(current) | set(processed) if current.get(path) != processed.get(path)]
+                processed = current
+                if changed_files:
+                    try:
+                        self.rebuild(changed_files)
+                    except Exception as e:
+                        logger.error(f"エラーが発生しました: {e}")
+        except KeyboardInterrupt:
+            logger.info("監視を終了します")
+
+
+def parse_args(args):
+    """コマンドライン引数を (入力, オプション) に分ける"""
+    return parse_options(args, {
+        '--interval': ('interval', float),
+        '--debounce': ('debounce', float),
+        '--once': ('once', True),
+    }, {'interval': DEFAULT_INTERVAL, 'debounce': DEFAULT_DEBOUNCE, 'once': False})
+
+
+def main(source=None, interval=DEFAULT_INTERVAL, debounce=DEFAULT_DEBOUNCE, once=False):
+    source = os.path.abspath(source or default_source())
+    if not os.path.exists(source):
+        logger.error(f"ファイルが見つかりません: {source}")
+        sys.exit(1)
+    if not is_csv_source(source):
+        # ワークブックの解析に使うライブラリを先に読み込んでおく
+        import openpyxl  # noqa: F401
+        import pandas  # noqa: F401
+    watcher = DataWatcher(source, interval=interval, debounce=debounce)
+    if once:
+        watcher.rebuild()
+    else:
+        watcher.run()
+
+
+if __name__ == "__main__":
+    argv, instrumentation_options = parse_instrumentation_args(sys.argv[1:])
+    configure_logging(instrumentation_options['log_level'])
+    inputs, options = parse_args(argv)
+    main(inputs[0] if inputs else None, **options)
@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""お酒とお料理相性マトリックスの共有ワークブックローダー
+
+各変換スクリプトが同じExcelを個別に開いていたため、1回の実行の中で
+ワークブックを1度だけ開き、読み込んだシートをキャッシュして共有する。
+
+入力にCSVのディレクトリ（lib/data/）またはCSVファイルを渡した場合は、
+Excelを開かずにCSVを直接読み込む（CsvWorkbookLoader）。
+
+.xlsx の解析結果は実行をまたいでディスクにキャッシュし（sheet_cache）、
+ワークブックが変わっていなければ次回以降は解析せずにメモリマップで開く。
+"""
+import csv
+import math
+import os
+import re
+import unicodedata
+from itertools import islice
+
+from run_instrumentation import count, stage
+from sheet_cache import open_sheet_cache
+
+DEFAULT_EXCEL_FILE = "/workspaces/org-app/お酒とお料理相性マトリックス.xlsx"
+
+# Excelの各シートと同じ内容のCSVファイル（lib/data/ に置かれている）
+CSV_SHEET_FILES = {
+    'お酒データ': 'お酒の商品データマトリックス.csv',
+    '和食': '料理（和食）とお酒の相性データマトリックス.csv',
+    '中華': '料理（中華）とお酒の相性データマトリックス.csv',
+    '洋食': '料理（洋食）とお酒の相性データマトリックス.csv',
+}
+
+# CSVの見出し（先頭の名前の列は空欄）。列の並びが違っていても見出しで対応付ける
+SAKE_CSV_HEADER = ['', 'カテゴリー', '日本酒度', '酸度', '度数', '4タイプ分類', '価格帯', '価格']
+DISH_CSV_HEADER = ['', '日本酒度下限', '日本酒度上限', '酸度下限', '酸度上限', '度数下限', '度数上限', '4タイプ分類-1', '4タイプ分類-2']
+CSV_SHEET_HEADERS = {
+    'お酒データ': SAKE_CSV_HEADER,
+    '和食': DISH_CSV_HEADER,
+    '中華': DISH_CSV_HEADER,
+    '洋食': DISH_CSV_HEADER,
+}
+
+_NUMBER_PATTERN = re.compile(r'[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?')
+
+
+def cell_has_value(value):
+    """セルに値があるか（pd.notna と同じ判定をpandasなしで行う）"""
+    return value is not None and not (isinstance(value, float) and math.isnan(value))
+
+
+def is_csv_source(path):
+    """入力がCSV（CSVファイルまたはCSVを置いたディレクトリ）か"""
+    return os.path.isdir(path) or path.lower().endswith('.csv')
+
+
+class WorkbookLoader:
+    """ワークブックを1度だけ開き、シートごとのDataFrameをキャッシュする
+
+    read_only=True の場合はDataFrameを作らず、openpyxlの読み取り専用モードで
+    行を逐次読み出す（巨大なシート向け）。
+
+    header=None で読み込むシートは、シートキャッシュ（sheet_cache）があればそこから開き、
+    なければ解析した結果をキャッシュに保存する。読み取り専用モードの行の逐次読み出しは
+    openpyxl の値そのものを返すため、キャッシュを使わない。
+    """
+
+    def __init__(self, excel_file_path, read_only=False):
+        self.excel_file_path = excel_file_path
+        self.read_only = read_only
+        self._excel_file = None
+        self._openpyxl_book = None
+        self._frames = {}
+        self._sheet_cache = None
+
+    def _get_excel_file(self):
+        if self._excel_file is None:
+            import pandas as pd
+            sheet_cache = self._get_sheet_cache()
+            if sheet_cache is not None:
+                # 開く前の指紋を記録し、解析中に保存された内容をキャッシュしないようにする
+                sheet_cache.pin_workbook()
+            with stage('workbook_open'):
+                self._excel_file = pd.ExcelFile(self.excel_file_path)
+        return self._excel_file
+
+    def _get_openpyxl_book(self):
+        if self._openpyxl_book is None:
+            import openpyxl
+            with stage('workbook_open'):
+                self._openpyxl_book = openpyxl.load_workbook(
+                    self.excel_file_path, read_only=True, data_only=True
+                )
+        return self._openpyxl_book
+
+    def _get_sheet_cache(self):
+        if self._sheet_cache is None:
+            self._sheet_cache = open_sheet_cache(self.excel_file_path) or False
+        return self._sheet_cache or None
+
+    @property
+    def sheet_names(self):
+        """ワークブック内のシート名一覧"""
+        if self.read_only:
+            return self._get_openpyxl_book().sheetnames
+        sheet_cache = self._get_sheet_cache()
+        if sheet_cache is not None and sheet_cache.sheet_names is not None:
+            return sheet_cache.sheet_names
+        sheet_names = self._get_excel_file().sheet_names
+        if sheet_cache is not None:
+            sheet_cache.store_sheet_names(sheet_names)
+        return sheet_names
+
+    def has_sheet(self, sheet_name):
+        return sheet_name in self.sheet_names
+
+    def read_sheet(self, sheet_name, header=None):
+        """シートをDataFrameとして取得（同じシートは2回目以降キャッシュを返す）"""
+        key = (sheet_name, header)
+        if key not in self._frames:
+            if self.read_only:
+                self._frames[key] = self._frame_from_rows(sheet_name, header)
+            else:
+                cached = self._cached_sheet(sheet_name) if header is None else None
+                if cached is not None:
+                    with stage('sheet_cache_load'):
+                        self._frames[key] = cached.to_frame()
+                else:
+                    self._frames[key] = self._parse_sheet(sheet_name, header)
+        return self._frames[key]
+
+    def _parse_sheet(self, sheet_name, header):
+        excel_file = self._get_excel_file()
+        with stage('sheet_parse'):
+            frame = excel_file.parse(sheet_name, header=header)
+        sheet_cache = self._get_sheet_cache()
+        if header is None and sheet_cache is not None:
+            sheet_cache.store(sheet_name, frame)
+        return frame
+
+    def _cached_sheet(self, sheet_name):
+        sheet_cache = self._get_sheet_cache()
+        return sheet_cache.load(sheet_name) if sheet_cache is not None else None
+
+    def sheet_shape(self, sheet_name):
+        """シートの (行数, 列数)（header=None で読み込んだ場合の大きさ）"""
+        if (sheet_name, None) not in self._frames and not self.read_only:
+            cached = self._cached_sheet(sheet_name)
+            if cached is not None:
+                return cached.shape
+        return self.read_sheet(sheet_name).shape
+
+    def preview_sheet(self, sheet_name, rows=None, columns=None):
+        """先頭 rows 行・先頭 columns 列だけのDataFrame（省略した方向は全体）
+
+        シートキャッシュがあれば、その範囲の値だけをメモリマップから取り出す。
+        """
+        if (sheet_name, None) not in self._frames and not self.read_only:
+            cached = self._cached_sheet(sheet_name)
+            if cached is None:
+                # 初回は全体を解析してキャッシュを作る
+                self.read_sheet(sheet_name)
+            else:
+                with stage('sheet_cache_load'):
+                    return cached.to_frame(rows=rows, columns=columns)
+        return self.read_sheet(sheet_name).iloc[:rows, :columns]
+
+    def _frame_from_rows(self, sheet_name, header):
+        # 読み取り専用モードでも既存の変換関数がDataFrameを使えるようにする
+        import pandas as pd
+        with stage('sheet_parse'):
+            rows = list(self.iter_rows(sheet_name))
+        while rows and all(value is None for value in rows[-1]):
+            rows.pop()
+        if header is None:
+            return pd.DataFrame(rows)
+        return pd.DataFrame(rows[header + 1:], columns=rows[header])
+
+    def iter_rows(self, sheet_name, min_row=0):
+        """シートの行を値のタプルとして逐次返す
+
+        読み取り専用モードではDataFrameを作らずにopenpyxlから1行ずつ読み出す。
+        min_row は0始まりの行番号（header=None のDataFrameの行番号と同じ）。
+        """
+        if not self.read_only or (sheet_name, None) in self._frames:
+            df = self.read_sheet(sheet_name)
+            for values in df.iloc[min_row:].itertuples(index=False, name=None):
+                yield values
+            return
+
+        worksheet = self._get_openpyxl_book()[sheet_name]
+        yield from worksheet.iter_rows(min_row=min_row + 1, values_only=True)
+
+    def iter_row_chunks(self, sheet_name, min_row=0, chunk_size=1000):
+        """iter_rows の結果を chunk_size 行ずつのリストにまとめて返す"""
+        rows = self.iter_rows(sheet_name, min_row=min_row)
+        while True:
+            # 読み込みの時間はチャンク単位で計測する（受け取った側の処理時間は含めない）
+            with stage('sheet_parse'):
+                chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                return
+            count('rows_read', len(chunk))
+            yield chunk
+
+    def refresh(self, changed_files=None):
+        """入力ファイルの更新後に呼び、読み直しが必要なシート名の一覧を返す
+
+        ワークブックは1つのファイルなので、全シートを読み直す。
+        """
+        self.close()
+        return list(self.sheet_names)
+
+    def close(self):
+        if self._excel_file is not None:
+            self._excel_file.close()
+            self._excel_file = None
+        if self._openpyxl_book is not None:
+            self._openpyxl_book.close()
+            self._openpyxl_book = None
+        self._frames.clear()
+        # 次に開く際にワークブックの指紋を確かめ直す
+        self._sheet_cache = None
+
+
+def _normalize_name(name):
+    # macOSで保存したファイル名はNFD、全角数字の見出しもあるためNFKCで比較する
+    return unicodedata.normalize('NFKC', name).strip()
+
+
+def _parse_csv_cell(text):
+    """CSVの文字列をExcelから読んだ場合と同じ型の値に変換（空欄は None）"""
+    if text == '':
+        return None
+    if _NUMBER_PATTERN.fullmatch(text):
+        if text.lstrip('+-').isdigit():
+            return int(text)
+        return float(text)
+    return text
+
+
+class CsvWorkbookLoader(WorkbookLoader):
+    """CSVファイルをExcelのワークブックと同じ形で読み込む
+
+    Excelのシートは1行目がタイトル、2行目が見出し、B列が名前なので、
+    CSVの各行を1行・1列ずらして同じ行番号・列番号で値を返す。
+    行の読み出しにはpandasを使わない（read_sheet を呼んだ場合のみ使う）。
+    """
+
+    def __init__(self, csv_path, read_only=False):
+        super().__init__(csv_path, read_only=read_only)
+        self._sheet_files = self._find_sheet_files(csv_path)
+
+    @staticmethod
+    def _find_sheet_files(csv_path):
+        sheet_by_file = {_normalize_name(file_name): sheet_name for sheet_name, file_name in CSV_SHEET_FILES.items()}
+        if os.path.isdir(csv_path):
+            candidates = [os.path.join(csv_path, name) for name in sorted(os.listdir(csv_path))]
+        else:
+            candidates = [csv_path]
+        sheet_files = {}
+        for path in candidates:
+            file_name = _normalize_name(os.path.basename(path))
+            if file_name in sheet_by_file:
+                sheet_files[sheet_by_file[file_name]] = path
+            elif not os.path.isdir(csv_path):
+                # 既知のファイル名でなければファイル名（拡張子なし）をシート名とする
+                sheet_files[os.path.splitext(file_name)[0]] = path
+        # シートの並びはExcelと同じ順にする
+        order = list(CSV_SHEET_FILES)
+        return dict(sorted(sheet_files.items(), key=lambda item: order.index(item[0]) if item[0] in order else len(order)))
+
+    def _get_sheet_cache(self):
+        # CSVは解析が軽いため、シートキャッシュは使わない
+        return None
+
+    @property
+    def sheet_names(self):
+        return list(self._sheet_files)
+
+    def read_sheet(self, sheet_name, header=None):
+        key = (sheet_name, header)
+        if key not in self._frames:
+            self._frames[key] = self._frame_from_rows(sheet_name, header)
+        return self._frames[key]
+
+    @staticmethod
+    def _column_order(sheet_name, header):
+        """見出しが想定と異なる並びの場合に、想定の並びにするための列番号の順番（不要なら None）"""
+        expected = CSV_SHEET_HEADERS.get(sheet_name)
+        names = [_normalize_name(name) for name in header]
+        if expected is None or names == expected or len(set(names)) != len(names) or not set(expected) <= set(names):
+            return None
+        order = [names.index(name) for name in expected]
+        return order + [i for i in range(len(names)) if i not in order]
+
+    def iter_rows(self, sheet_name, min_row=0):
+        if sheet_name not in self._sheet_files:
+            raise KeyError(f"Worksheet {sheet_name} does not exist.")
+        with open(self._sheet_files[sheet_name], encoding='utf-8-sig', newline='') as f:
+            reader = csv.reader(f)
+            header = next(reader, [])
+            order = self._column_order(sheet_name, header)
+            if order is not None:
+                header = [header[i] for i in order]
+
+            # 行0: タイトル行（空）、行1: 見出し、行2以降: データ
+            if min_row <= 0:
+                yield (None,) * (len(header) + 1)
+            if min_row <= 1:
+                yield (None,) + tuple(value or None for value in header)
+            for row_number, row in enumerate(reader, start=2):
+                if row_number < min_row:
+                    continue
+                if order is not None:
+                    row = [row[i] if i < len(row) else '' for i in order]
+                yield (None,) + tuple(_parse_csv_cell(value) for value in row)
+
+    def refresh(self, changed_files=None):
+        """更新されたCSVファイルのシートだけキャッシュを破棄し、そのシート名の一覧を返す
+
+        changed_files を省略した場合は全シートを対象にする。追加・削除されたCSVのシートも含む。
+        """
+        previous = self._sheet_files
+        self._sheet_files = self._find_sheet_files(self.excel_file_path)
+        changed = {os.path.abspath(path) for path in changed_files} if changed_files is not None else None
+        sheet_names = []
+        for sheet_name in set(previous) | set(self._sheet_files):
+            path = self._sheet_files.get(sheet_name)
+            if changed is None or previous.get(sheet_name) != path or os.path.abspath(path) in changed:
+                sheet_names.append(sheet_name)
+                for key in [key for key in self._frames if key[0] == sheet_name]:
+                    del self._frames[key]
+        return sheet_names
+
+    def close(self):
+        self._frames.clear()
+
+
+_loaders = {}
+
+
+def get_workbook(excel_file_path, read_only=None):
+    """同じプロセス内ではパスごとに同じローダーを返す
+
+    read_only を省略した場合は登録済みのローダーのモードをそのまま使う。
+    CSVのディレクトリ・ファイルを渡した場合は CsvWorkbookLoader を返す。
+    """
+    key = os.path.abspath(excel_file_path)
+    loader = _loaders.get(key)
+    if loader is None or (read_only is not None and loader.read_only != read_only):
+        if loader is not None:
+            loader.close()
+        loader_class = CsvWorkbookLoader if is_csv_source(excel_file_path) else WorkbookLoader
+        loader = loader_class(excel_file_path, read_only=bool(read_only))
+        _loaders[key] = loader
+    return loader
+
+
+def clear_workbook_cache():
+    """キャッシュ済みのワークブックをすべて閉じる"""
+    for loader in _loaders.values():
+        loader.close()
+    _loaders.clear()